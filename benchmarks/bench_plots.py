@@ -0,0 +1,64 @@
+# Benchmarks for the analysis and plotting functions in sso_query.plots.
+
+import matplotlib.pyplot as plt
+
+from sso_query import plots
+
+from .common import SCALES, quiet, result_frame
+
+
+class Plots:
+    """
+    Trimming and heat maps of a joined result table.
+    """
+    params = SCALES
+    param_names = ["rows"]
+    timeout = 600
+
+    def setup(self, n_rows):
+        self.df = result_frame(n_rows)
+
+    def teardown(self, n_rows):
+        plt.close("all")
+
+    def time_setup(self, n_rows):
+        plots.setup(self.df)
+
+    def peakmem_setup(self, n_rows):
+        plots.setup(self.df)
+
+    def time_heat_maps(self, n_rows):
+        with quiet():
+            plots.heat_maps(self.df)
+
+    def peakmem_heat_maps(self, n_rows):
+        with quiet():
+            plots.heat_maps(self.df)
+
+
+class Grouping:
+    """
+    Per-object grouping of the observations in a joined result table.
+    """
+    params = SCALES
+    param_names = ["rows"]
+    timeout = 600
+
+    def setup(self, n_rows):
+        self.df = result_frame(n_rows)
+
+    def time_data_grouped_mags(self, n_rows):
+        with quiet():
+            plots.data_grouped_mags(self.df)
+
+    def peakmem_data_grouped_mags(self, n_rows):
+        with quiet():
+            plots.data_grouped_mags(self.df)
+
+    def time_obs_filter(self, n_rows):
+        with quiet():
+            plots.obs_filter(self.df)
+
+    def peakmem_obs_filter(self, n_rows):
+        with quiet():
+            plots.obs_filter(self.df)
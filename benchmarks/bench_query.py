@@ -0,0 +1,86 @@
+# Benchmarks for query building, client-side classification, result conversion and end-to-end runs against the local TAP stand-in.
+
+from sso_query import query
+from sso_query.local_tap import LocalTAPService
+from sso_query.services import clear_services
+from sso_query.synthetic import make_orbits
+
+from .common import SCALES, SEED, quiet, result_table
+
+
+class QueryBuilding:
+    """
+    Writing the ADQL for every orbital class (no schema lookups).
+    """
+
+    def time_make_query(self):
+        for class_name in query.ORBITAL_CLASS_CUTOFFS:
+            query.make_query("dp1", class_name=class_name)
+
+    def time_make_multiclass_query(self):
+        query.make_multiclass_query("dp1")
+
+
+class ClassifyOrbits:
+    """
+    Labelling an MPCORB slice against every orbital class client-side.
+    """
+    params = SCALES
+    param_names = ["rows"]
+    timeout = 600
+
+    def setup(self, n_rows):
+        self.orbits = make_orbits(n_rows, seed=SEED)
+
+    def time_classify_orbits(self, n_rows):
+        query.classify_orbits(self.orbits["q"], self.orbits["e"], self.orbits["incl"])
+
+    def peakmem_classify_orbits(self, n_rows):
+        query.classify_orbits(self.orbits["q"], self.orbits["e"], self.orbits["incl"])
+
+
+class ResultConversion:
+    """
+    Turning a fetched job result into the table run_query returns, per output format.
+    """
+    params = (SCALES, ["pandas", "astropy", "arrow"])
+    param_names = ["rows", "return_format"]
+    timeout = 600
+
+    def setup(self, n_rows, return_format):
+        self.table = result_table(n_rows)
+
+    def time_format_result(self, n_rows, return_format):
+        query._format_result(self.table, "MBA", return_format)
+
+    def peakmem_format_result(self, n_rows, return_format):
+        query._format_result(self.table, "MBA", return_format)
+
+
+class LocalRunQuery:
+    """
+    run_query end to end (async job, fetch, conversion) against a LocalTAPService; n_objects objects with ~20 observations each.
+    """
+    params = [1000, 10000]
+    param_names = ["n_objects"]
+    timeout = 600
+
+    def setup(self, n_objects):
+        LocalTAPService(n_objects=n_objects, catalogs=["dp03_catalogs_10yr"]).install()
+        with quiet():
+            self.query, _ = query.make_query("dp03_catalogs_10yr", class_name="MBA", columns="magnitudes", join="DiaSource")
+
+    def teardown(self, n_objects):
+        clear_services()
+
+    def time_run_query(self, n_objects):
+        with quiet():
+            query.run_query(self.query, "MBA", "dp03_catalogs_10yr", to_pandas=True)
+
+    def time_run_query_partitioned(self, n_objects):
+        with quiet():
+            query.run_query(self.query, "MBA", "dp03_catalogs_10yr", to_pandas=True, partitions=4)
+
+    def peakmem_run_query(self, n_objects):
+        with quiet():
+            query.run_query(self.query, "MBA", "dp03_catalogs_10yr", to_pandas=True)
@@ -0,0 +1,60 @@
+# Module holds the synthetic inputs shared by the benchmarks.
+
+import contextlib
+import io
+import os
+
+import matplotlib
+matplotlib.use("Agg") # plots are drawn but never shown
+from astropy.table import Table
+
+from sso_query.synthetic import make_observations, make_orbits, make_ssobjects
+
+#################### Global ####################
+# number of result rows to benchmark at; set SSO_QUERY_BENCH_SCALES (e.g. "1e4,1e6,1e8") for the large runs
+SCALES = [int(float(scale)) for scale in os.environ.get("SSO_QUERY_BENCH_SCALES", "1e4,1e5,1e6").split(",")]
+OBS_PER_OBJECT = 20.0 # mean DiaSource rows per object in the joined tables
+SEED = 42
+################################################
+
+
+def result_table(n_rows:int, catalog:str = "dp03_catalogs_10yr", join:str = "DiaSource"):
+    """
+    Builds an astropy Table shaped like the raw result of make_query(catalog, ..., join=join), before run_query adds 'a' and 'class_name'.
+    Args:
+        n_rows (int): Approximate number of rows (objects x observations when joined with DiaSource).
+        catalog = "dp03_catalogs_10yr" (str) (optional): Catalog whose join columns to mimic.
+        join = "DiaSource" (str) (optional): Joined table; DiaSource, SSObject or None.
+    Returns:
+        table (astropy Table): Columns 'incl', 'q', 'e', 'ssObjectID', 'mpcDesignation' and the join columns.
+    """
+    per_object = OBS_PER_OBJECT if join == "DiaSource" else 1.0
+    orbits = make_orbits(max(int(n_rows / per_object), 1), seed=SEED)
+    table = orbits[["incl", "q", "e", "ssObjectId", "mpcDesignation"]]
+    if join == "DiaSource":
+        observations = make_observations(orbits, catalog=catalog, obs_per_object=OBS_PER_OBJECT, seed=SEED)
+        table = table.merge(observations.drop(columns=["diaSourceId", "midpointMjdTai"]), on="ssObjectId")
+    elif join == "SSObject":
+        table = table.merge(make_ssobjects(orbits, catalog=catalog, seed=SEED), on="ssObjectId")
+    return Table.from_pandas(table.rename(columns={"ssObjectId": "ssObjectID"}))
+
+
+def result_frame(n_rows:int, catalog:str = "dp03_catalogs_10yr", join:str = "DiaSource"):
+    """
+    Returns result_table() as the Pandas dataframe run_query(..., to_pandas=True) would give, with 'a' and 'class_name' columns.
+    'class_name' holds the class each synthetic orbit was drawn from.
+    """
+    orbits = make_orbits(max(int(n_rows / (OBS_PER_OBJECT if join == "DiaSource" else 1.0)), 1), seed=SEED)
+    df = result_table(n_rows, catalog, join).to_pandas()
+    df["a"] = df["q"] / (1.0 - df["e"])
+    df["class_name"] = orbits.set_index("ssObjectId")["class_name"].reindex(df["ssObjectID"].to_numpy()).to_numpy()
+    return df
+
+
+@contextlib.contextmanager
+def quiet():
+    """
+    Context manager that swallows the tables the plotting and counting functions print.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        yield
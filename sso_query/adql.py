@@ -0,0 +1,398 @@
+# Module holds a small ADQL expression tree and the builder that turns orbital cutoffs into canonical, index-friendly conditions.
+
+from dataclasses import dataclass
+from decimal import ROUND_CEILING, ROUND_FLOOR, Decimal
+import functools
+import operator
+
+import numpy as np
+import pyarrow.compute as pc
+
+#################### Global ####################
+BOUND_DECIMALS = Decimal("1e-6") # derived bounds are rounded outwards to this precision
+PRECEDENCE = {"+": 1, "-": 1, "*": 2, "/": 2}
+OPERATORS = {
+    "+": np.add, "-": np.subtract, "*": np.multiply, "/": np.divide,
+    ">": np.greater, ">=": np.greater_equal, "<": np.less, "<=": np.less_equal
+}
+FUNCTIONS = {"COS": np.cos, "RADIANS": np.radians, "SQRT": np.sqrt, "LOG10": np.log10, "FLOOR": np.floor}
+ARROW_OPERATORS = {
+    "+": pc.add, "-": pc.subtract, "*": pc.multiply, "/": pc.divide,
+    ">": pc.greater, ">=": pc.greater_equal, "<": pc.less, "<=": pc.less_equal
+}
+ARROW_FUNCTIONS = {"COS": pc.cos, "RADIANS": lambda x: pc.multiply(x, np.pi / 180), "SQRT": pc.sqrt, "LOG10": pc.log10, "FLOOR": pc.floor}
+################################################
+
+
+class Expr:
+    """
+    Base of the ADQL expression nodes. Arithmetic and comparison operators build new nodes, and str() gives the ADQL text.
+    Nodes are immutable and compare by structure, so equal expressions always print the same.
+    """
+    precedence = 3 # atoms never need parentheses
+
+    def __add__(self, other):
+        return BinaryOp("+", self, _expr(other))
+
+    def __radd__(self, other):
+        return BinaryOp("+", _expr(other), self)
+
+    def __sub__(self, other):
+        return BinaryOp("-", self, _expr(other))
+
+    def __rsub__(self, other):
+        return BinaryOp("-", _expr(other), self)
+
+    def __mul__(self, other):
+        return BinaryOp("*", self, _expr(other))
+
+    def __rmul__(self, other):
+        return BinaryOp("*", _expr(other), self)
+
+    def __truediv__(self, other):
+        return BinaryOp("/", self, _expr(other))
+
+    def __rtruediv__(self, other):
+        return BinaryOp("/", _expr(other), self)
+
+    def __gt__(self, other):
+        return Comparison(">", self, _expr(other))
+
+    def __ge__(self, other):
+        return Comparison(">=", self, _expr(other))
+
+    def __lt__(self, other):
+        return Comparison("<", self, _expr(other))
+
+    def __le__(self, other):
+        return Comparison("<=", self, _expr(other))
+
+    def between(self, low, high):
+        return Between(self, _expr(low), _expr(high))
+
+    def __str__(self):
+        return self.to_adql()
+
+    def evaluate(self, values:dict):
+        """
+        Evaluates the expression with NumPy, the client-side counterpart of running it on the server.
+        Args:
+            values (dict): Arrays for the columns (keyed by Column). Evaluated sub-expressions are added to it, so expressions
+                that share parts (e.g. 1 - mpc.e) only compute them once.
+        Returns:
+            result (ndarray): Values of the expression; conditions give booleans, with NaN inputs failing every comparison.
+        """
+        if self not in values:
+            values[self] = self._evaluate(values)
+        return values[self]
+
+    def to_arrow(self):
+        """
+        Returns the expression as a pyarrow.compute.Expression over the bare column names (the table alias is dropped), for filtering
+        local Arrow/Parquet datasets. Simple comparisons of a column with a literal can be checked against Parquet statistics.
+        """
+        return self._to_arrow()
+
+
+@dataclass(frozen=True, eq=True)
+class Column(Expr):
+    name: str
+    table: str = "mpc"
+
+    def to_adql(self):
+        return f"{self.table}.{self.name}"
+
+    def _evaluate(self, values):
+        raise KeyError(f"No values given for column {self.to_adql()}.")
+
+    def _to_arrow(self):
+        return pc.field(self.name)
+
+
+@dataclass(frozen=True, eq=True)
+class Literal(Expr):
+    value: object
+
+    def to_adql(self):
+        value = self.value
+        if isinstance(value, (bool, np.bool_)):
+            return "1" if value else "0"
+        if isinstance(value, (int, np.integer)):
+            return str(int(value))
+        if isinstance(value, (float, np.floating)):
+            return repr(float(value)) # shortest text that reads back as the same double
+        return f"'{value}'"
+
+    def _evaluate(self, values):
+        return self.value
+
+    def _to_arrow(self):
+        value = self.value
+        if isinstance(value, (int, np.integer)) and not isinstance(value, (bool, np.bool_)):
+            value = float(value) # Arrow divides integers as integers
+        return pc.scalar(value)
+
+
+@dataclass(frozen=True, eq=True)
+class Function(Expr):
+    name: str
+    args: tuple
+
+    def to_adql(self):
+        return f"{self.name}({', '.join(arg.to_adql() for arg in self.args)})"
+
+    def _evaluate(self, values):
+        return FUNCTIONS[self.name](*(arg.evaluate(values) for arg in self.args))
+
+    def _to_arrow(self):
+        return ARROW_FUNCTIONS[self.name](*(arg._to_arrow() for arg in self.args))
+
+
+@dataclass(frozen=True, eq=True)
+class BinaryOp(Expr):
+    op: str
+    left: Expr
+    right: Expr
+
+    @property
+    def precedence(self):
+        return PRECEDENCE[self.op]
+
+    def to_adql(self):
+        left = self.left.to_adql()
+        if self.left.precedence < self.precedence:
+            left = f"({left})"
+        right = self.right.to_adql()
+        # a - (b + c) and a / (b * c) keep their parentheses; a + (b + c) and a * (b * c) do not need them
+        if self.right.precedence < self.precedence or (self.right.precedence == self.precedence and self.op in "-/"):
+            right = f"({right})"
+        return f"{left} {self.op} {right}"
+
+    def _evaluate(self, values):
+        return OPERATORS[self.op](self.left.evaluate(values), self.right.evaluate(values))
+
+    def _to_arrow(self):
+        return ARROW_OPERATORS[self.op](self.left._to_arrow(), self.right._to_arrow())
+
+
+@dataclass(frozen=True, eq=True)
+class Comparison(Expr):
+    op: str
+    left: Expr
+    right: Expr
+
+    def to_adql(self):
+        return f"{self.left.to_adql()} {self.op} {self.right.to_adql()}"
+
+    def _evaluate(self, values):
+        return OPERATORS[self.op](self.left.evaluate(values), self.right.evaluate(values))
+
+    def _to_arrow(self):
+        return ARROW_OPERATORS[self.op](self.left._to_arrow(), self.right._to_arrow())
+
+
+@dataclass(frozen=True, eq=True)
+class Between(Expr):
+    expr: Expr
+    low: Expr
+    high: Expr
+
+    def to_adql(self):
+        return f"{self.expr.to_adql()} BETWEEN {self.low.to_adql()} AND {self.high.to_adql()}"
+
+    def _evaluate(self, values):
+        expr = self.expr.evaluate(values)
+        return (expr >= self.low.evaluate(values)) & (expr <= self.high.evaluate(values))
+
+    def _to_arrow(self):
+        expr = self.expr._to_arrow()
+        return (expr >= self.low._to_arrow()) & (expr <= self.high._to_arrow())
+
+
+@dataclass(frozen=True, eq=True)
+class And(Expr):
+    terms: tuple
+
+    def to_adql(self):
+        return " AND ".join(_wrap(term, Or) for term in self.terms)
+
+    def _evaluate(self, values):
+        return np.logical_and.reduce([term.evaluate(values) for term in self.terms])
+
+    def _to_arrow(self):
+        return functools.reduce(operator.and_, (term._to_arrow() for term in self.terms))
+
+
+@dataclass(frozen=True, eq=True)
+class Or(Expr):
+    terms: tuple
+
+    def to_adql(self):
+        return " OR ".join(_wrap(term, (And, Or)) for term in self.terms)
+
+    def _evaluate(self, values):
+        return np.logical_or.reduce([term.evaluate(values) for term in self.terms])
+
+    def _to_arrow(self):
+        return functools.reduce(operator.or_, (term._to_arrow() for term in self.terms))
+
+
+def all_of(*terms):
+    """
+    Returns the AND of the given conditions, flattening nested ANDs and dropping repeated conditions (first occurrence kept).
+    """
+    flat = []
+    for term in terms:
+        for part in (term.terms if isinstance(term, And) else (term,)):
+            if part not in flat:
+                flat.append(part)
+    return flat[0] if len(flat) == 1 else And(tuple(flat))
+
+
+def any_of(*terms):
+    """
+    Returns the OR of the given conditions, flattening nested ORs and dropping repeated conditions (first occurrence kept).
+    """
+    flat = []
+    for term in terms:
+        for part in (term.terms if isinstance(term, Or) else (term,)):
+            if part not in flat:
+                flat.append(part)
+    return flat[0] if len(flat) == 1 else Or(tuple(flat))
+
+
+def _expr(value):
+    return value if isinstance(value, Expr) else Literal(value)
+
+
+def _wrap(term, wrapped_types):
+    text = term.to_adql()
+    return f"({text})" if isinstance(term, wrapped_types) else text
+
+
+#################### Orbital cutoffs ####################
+Q = Column("q")
+E = Column("e")
+INCL = Column("incl")
+TISSERAND = 5.204 * (1 - E) / Q + 2 * Function("COS", (Function("RADIANS", (INCL,)),)) * Function("SQRT", (Q * (1 - E) / (5.204 * (1 + E)),))
+
+
+def cutoff_conditions(cutoffs:dict):
+    """
+    Builds the conditions on the MPCORB table (aliased 'mpc') for a cutoffs dict, written so the server can use plain ranges on q and e.
+        1. a = q/(1-e) limits are multiplied out: a > X becomes e < 1 AND q > X * (1 - e) (the two are equivalent, since a > X > 0
+           needs a bound orbit), and a < X becomes q < X * (1 - e) when e < 1 is already required.
+        2. Ranges on q and e alone that follow from the a limits (e.g. q < X for a < X) are added, rounded outwards so no row is lost.
+        3. Only the tightest lower and upper bound on each of q and e is kept, and the conditions are written in a fixed order
+           (q, e, a limits, Tisserand), so equivalent cutoffs always give the same ADQL.
+    The rewrites assume q > 0 and e >= 0, which holds for every orbit in MPCORB.
+    Args:
+        cutoffs (dict): Orbital constraints, with the keys of query.DEFAULT_CUTOFFS. Missing or None values are unconstrained.
+    Returns:
+        conditions (list): Condition expressions (Expr), to be AND-ed.
+    """
+    cutoffs = {key: (None if value is None else float(value)) for key, value in cutoffs.items()}
+    q_range = _Range()
+    e_range = _Range()
+    if cutoffs.get("q_min") is not None:
+        q_range.add_lower(cutoffs["q_min"], strict=True)
+    if cutoffs.get("q_max") is not None:
+        q_range.add_upper(cutoffs["q_max"], strict=True)
+    if cutoffs.get("e_min") is not None:
+        e_range.add_lower(cutoffs["e_min"], strict=True)
+    if cutoffs.get("e_max") is not None:
+        e_range.add_upper(cutoffs["e_max"], strict=True)
+
+    a_min, a_max = cutoffs.get("a_min"), cutoffs.get("a_max")
+    tisserand = cutoffs.get("tj_min") is not None and cutoffs.get("tj_max") is not None
+    if tisserand:
+        # SQRT((q * (1 - e)) / (5.204 * (1 + e))) needs a non-negative argument, i.e. e <= 1 for q > 0
+        e_range.add_upper(1.0, strict=False)
+
+    a_conditions = []
+    if a_min is not None:
+        if a_min > 0:
+            e_range.add_upper(1.0, strict=True)
+            a_conditions.append(Q > a_min * (1 - E))
+        else:
+            a_conditions.append(Q / (1 - E) > a_min)
+    if a_max is not None:
+        if a_max > 0 and e_range.requires_bound_orbit():
+            a_conditions.append(Q < a_max * (1 - E))
+        else:
+            a_conditions.append(Q / (1 - E) < a_max)
+
+    # ranges on e from the a limits and the q range, then ranges on q from the a limits and the (now tighter) e range
+    if a_max is not None and a_max > 0 and e_range.requires_bound_orbit() and q_range.lower is not None:
+        e_range.add_upper(_bound_on_e(a_max, q_range.lower[0], upper=True), strict=True)
+    if a_min is not None and a_min > 0 and q_range.upper is not None:
+        e_lower = _bound_on_e(a_min, q_range.upper[0], upper=False)
+        if e_lower > 0:
+            e_range.add_lower(e_lower, strict=True)
+    if a_max is not None and a_max > 0 and e_range.requires_bound_orbit():
+        q_range.add_upper(a_max, strict=True) # q < a_max * (1 - e) <= a_max for e >= 0
+    if a_min is not None and a_min > 0 and e_range.upper is not None:
+        q_lower = _round_bound(a_min * (1 - e_range.upper[0]), upper=False) # q > a_min * (1 - e) >= a_min * (1 - e_max)
+        if q_lower > 0:
+            q_range.add_lower(q_lower, strict=True)
+
+    conditions = q_range.conditions(Q) + e_range.conditions(E) + a_conditions
+    if tisserand:
+        conditions.append(TISSERAND.between(cutoffs["tj_min"], cutoffs["tj_max"]))
+    return conditions
+
+
+class _Range:
+    """
+    Tightest lower and upper bound seen on one column, each as (value, strict).
+    """
+
+    def __init__(self):
+        self.lower = None
+        self.upper = None
+
+    def add_lower(self, value, strict):
+        if self.lower is None or value > self.lower[0] or (value == self.lower[0] and strict):
+            self.lower = (value, strict)
+
+    def add_upper(self, value, strict):
+        if self.upper is None or value < self.upper[0] or (value == self.upper[0] and strict):
+            self.upper = (value, strict)
+
+    def requires_bound_orbit(self):
+        """
+        True if the upper bound rules out e >= 1 (for the e range).
+        """
+        return self.upper is not None and (self.upper[0] < 1 or (self.upper[0] == 1 and self.upper[1]))
+
+    def conditions(self, column):
+        conditions = []
+        if self.lower is not None:
+            conditions.append(column > self.lower[0] if self.lower[1] else column >= self.lower[0])
+        if self.upper is not None:
+            conditions.append(column < self.upper[0] if self.upper[1] else column <= self.upper[0])
+        return conditions
+
+
+def _round_bound(value, upper):
+    """
+    Rounds a derived bound outwards (up for upper bounds, down for lower bounds) to BOUND_DECIMALS, so the bound stays implied.
+    """
+    rounded = Decimal(repr(value)).quantize(BOUND_DECIMALS, rounding=ROUND_CEILING if upper else ROUND_FLOOR)
+    return float(rounded)
+
+
+def _bound_on_e(a_limit, q_limit, upper):
+    """
+    Returns the e bound implied by an a limit and the opposite q limit, rounded outwards: for upper=True (a < a_limit, q > q_limit)
+    the smallest E with a_limit * (1 - E) <= q_limit, so no row has e >= E; for upper=False (a > a_limit, q < q_limit) the largest
+    E with a_limit * (1 - E) >= q_limit, so no row has e <= E. The check is done in floating point, as the server evaluates it.
+    """
+    bound = _round_bound(1 - q_limit / a_limit, upper)
+    if upper:
+        while a_limit * (1 - bound) > q_limit:
+            bound = float(Decimal(repr(bound)) + BOUND_DECIMALS)
+    else:
+        while a_limit * (1 - bound) < q_limit:
+            bound = float(Decimal(repr(bound)) - BOUND_DECIMALS)
+    return bound
@@ -0,0 +1,388 @@
+# Module holds the local caches used to avoid repeated round-trips to the RSP TAP services.
+
+import hashlib
+import json
+import os
+import socket
+import threading
+import time
+
+import pandas as pd
+
+from sso_query.services import get_service
+
+#################### Global ####################
+SCHEMA_TTL = 7 * 24 * 3600 # seconds; TAP_SCHEMA only changes between data releases
+RESULT_TTL = 30 * 24 * 3600 # seconds
+RESULT_CACHE_MAX_BYTES = 2 * 1024**3
+JOB_JOURNAL_TTL = 2 * 24 * 3600 # seconds; older journal entries are treated as abandoned (UWS servers destroy jobs after a few days)
+################################################
+
+
+def get_cache_dir():
+    """
+    Returns the directory used for on-disk caches, creating it if needed. Set the SSO_QUERY_CACHE_DIR
+    environment variable to override the default (~/.cache/sso_query).
+    Returns:
+        cache_dir (str): Path to the cache directory.
+    """
+    cache_dir = os.getenv("SSO_QUERY_CACHE_DIR") or os.path.join(os.path.expanduser("~"), ".cache", "sso_query")
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
+
+
+class SchemaCache:
+    """
+    Caches the column names of RSP tables (from TAP_SCHEMA.columns) in memory and on disk, keyed by
+    catalog and table. Entries older than ttl seconds are looked up again; invalidate() drops them early.
+    Args:
+        path = None (str) (optional): JSON file backing the cache. Default is schema.json in get_cache_dir().
+        ttl = SCHEMA_TTL (float) (optional): Lifetime of an entry in seconds.
+    """
+
+    def __init__(self, path:str = None, ttl:float = SCHEMA_TTL):
+        self.path = path
+        self.ttl = ttl
+        self._entries = None
+        self._lock = threading.Lock()
+
+    def _file(self):
+        if self.path is None:
+            self.path = os.path.join(get_cache_dir(), "schema.json")
+        return self.path
+
+    def _load(self):
+        if self._entries is None:
+            try:
+                with open(self._file()) as f:
+                    self._entries = json.load(f)
+            except (OSError, ValueError):
+                self._entries = {}
+        return self._entries
+
+    def _save(self):
+        path = self._file()
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, path) # atomic, so concurrent readers never see a partial file
+
+    def get_columns(self, catalog:str, table:str, refresh:bool = False):
+        """
+        Returns the column names of catalog.table, querying TAP_SCHEMA only if the entry is missing or expired.
+        Args:
+            catalog (str): Name of RSP catalog.
+            table (str): Name of table within the catalog, e.g. DiaSource, SSObject.
+            refresh = False (bool) (optional): Ignore any cached entry and look the columns up again.
+        Returns:
+            columns (list): Column names of the table.
+        """
+        key = f"{catalog}.{table}"
+        with self._lock:
+            entry = self._load().get(key)
+            if not refresh and entry is not None and time.time() - entry["fetched"] < self.ttl:
+                return list(entry["columns"])
+
+        service = get_service(catalog)
+        results = service.search(f"SELECT column_name from TAP_SCHEMA.columns WHERE table_name = '{key}'")
+        columns = results.to_table().to_pandas()['column_name'].tolist()
+
+        if columns: # an empty answer is more likely a hiccup than a real table, so don't keep it
+            with self._lock:
+                self._load()[key] = {"fetched": time.time(), "columns": columns}
+                self._save()
+        return columns
+
+    def invalidate(self, catalog:str = None, table:str = None):
+        """
+        Function drops cached entries. With no arguments the whole cache is cleared.
+        Args:
+            catalog = None (str) (optional): Only drop entries for this catalog.
+            table = None (str) (optional): Only drop entries for this table.
+        """
+        with self._lock:
+            entries = self._load()
+            for key in list(entries):
+                key_catalog, key_table = key.rsplit(".", 1)
+                if (catalog is None or key_catalog == catalog) and (table is None or key_table == table):
+                    del entries[key]
+            self._save()
+
+
+schema_cache = SchemaCache()
+
+
+class ResultCache:
+    """
+    On-disk cache of query results, keyed by a hash of the catalog and the normalized query string.
+    Results are stored as Parquet files; once the cache grows past max_bytes the least recently used
+    results are evicted, and results older than ttl seconds are treated as missing.
+    Args:
+        path = None (str) (optional): Directory holding the cached results. Default is results/ in get_cache_dir().
+        max_bytes = RESULT_CACHE_MAX_BYTES (int) (optional): Size cap for all cached results together.
+        ttl = RESULT_TTL (float) (optional): Lifetime of a cached result in seconds. None keeps results until evicted.
+    """
+
+    def __init__(self, path:str = None, max_bytes:int = RESULT_CACHE_MAX_BYTES, ttl:float = RESULT_TTL):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._index = None
+        self._lock = threading.Lock()
+
+    def _dir(self):
+        if self.path is None:
+            self.path = os.path.join(get_cache_dir(), "results")
+        os.makedirs(self.path, exist_ok=True)
+        return self.path
+
+    def _load(self):
+        if self._index is None:
+            try:
+                with open(os.path.join(self._dir(), "index.json")) as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index
+
+    def _save(self):
+        path = os.path.join(self._dir(), "index.json")
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._index, f)
+        os.replace(tmp_path, path)
+
+    def _remove(self, key):
+        entry = self._index.pop(key)
+        try:
+            os.remove(os.path.join(self._dir(), entry["file"]))
+        except OSError:
+            pass
+
+    @staticmethod
+    def key(query_string:str, catalog:str):
+        """
+        Returns the cache key for a query: a SHA-256 of the catalog and the query with whitespace
+        runs collapsed and any trailing ';' removed, so reformatted copies of a query share a key.
+        Args:
+            query_string (str): ADQL query.
+            catalog (str): Name of RSP catalog the query runs against.
+        Returns:
+            key (str): Hex digest identifying the query.
+        """
+        normalized = " ".join(query_string.split()).rstrip(";").strip()
+        return hashlib.sha256(f"{catalog}\n{normalized}".encode()).hexdigest()
+
+    def get(self, query_string:str, catalog:str):
+        """
+        Returns the cached result for a query, or None (counted as a miss) if there is no fresh copy.
+        Args:
+            query_string (str): ADQL query.
+            catalog (str): Name of RSP catalog the query runs against.
+        Returns:
+            result (Pandas dataframe): Cached raw query result, or None.
+        """
+        key = self.key(query_string, catalog)
+        with self._lock:
+            entry = self._load().get(key)
+            if entry is not None and self.ttl is not None and time.time() - entry["created"] > self.ttl:
+                self._remove(key)
+                self._save()
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            try:
+                result = pd.read_parquet(os.path.join(self._dir(), entry["file"]))
+            except OSError:
+                self._remove(key) # file removed behind our back
+                self._save()
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self._save()
+            self.hits += 1
+        return result
+
+    def put(self, query_string:str, catalog:str, result:pd.DataFrame, watermark:dict = None):
+        """
+        Function stores a raw query result, then evicts least recently used results until the cache fits in max_bytes.
+        Args:
+            query_string (str): ADQL query.
+            catalog (str): Name of RSP catalog the query ran against.
+            result (Pandas dataframe): Raw query result.
+            watermark = None (dict) (optional): Refresh watermark of the result (see query.refresh_query), kept with the entry.
+        """
+        key = self.key(query_string, catalog)
+        file_name = f"{key}.parquet"
+        with self._lock:
+            index = self._load()
+            path = os.path.join(self._dir(), file_name)
+            result.to_parquet(f"{path}.tmp", index=False)
+            os.replace(f"{path}.tmp", path)
+            now = time.time()
+            index[key] = {"file": file_name, "bytes": os.path.getsize(path), "created": now, "last_used": now,
+                          "catalog": catalog}
+            if watermark is not None:
+                index[key]["watermark"] = watermark
+
+            total = sum(entry["bytes"] for entry in index.values())
+            for old_key in sorted(index, key=lambda k: index[k]["last_used"]):
+                if total <= self.max_bytes:
+                    break
+                total -= index[old_key]["bytes"]
+                self._remove(old_key)
+                self.evictions += 1
+            self._save()
+
+    def watermark(self, query_string:str, catalog:str):
+        """
+        Returns the refresh watermark stored with a cached result, or None if the result has none or is not cached.
+        Args:
+            query_string (str): ADQL query.
+            catalog (str): Name of RSP catalog the query runs against.
+        Returns:
+            watermark (dict): 'column' and 'value' of the watermark, or None.
+        """
+        with self._lock:
+            entry = self._load().get(self.key(query_string, catalog))
+            return None if entry is None else entry.get("watermark")
+
+    def clear(self):
+        """
+        Function removes every cached result.
+        """
+        with self._lock:
+            for key in list(self._load()):
+                self._remove(key)
+            self._save()
+
+    def stats(self):
+        """
+        Function returns the hit/miss statistics and current size of the cache.
+        Returns:
+            stats (dict): 'hits', 'misses', 'evictions', 'entries' and 'bytes'.
+        """
+        with self._lock:
+            index = self._load()
+            return {"hits": self.hits, "misses": self.misses, "evictions": self.evictions,
+                    "entries": len(index), "bytes": sum(entry["bytes"] for entry in index.values())}
+
+
+result_cache = ResultCache()
+
+
+class JobJournal:
+    """
+    On-disk journal of the async TAP jobs in flight, keyed like ResultCache (a hash of the catalog and the normalized query), so a
+    query interrupted by a dead kernel or batch worker can reattach to its job on the server instead of running it again.
+    Each entry records the process (pid and host) waiting on the job, and only jobs whose owner is gone are handed to another
+    caller, so identical queries running at the same time never share (and delete) each other's jobs. Entries are removed once
+    the result has been fetched.
+    Args:
+        path = None (str) (optional): JSON file backing the journal. Default is jobs.json in get_cache_dir().
+    """
+
+    def __init__(self, path:str = None):
+        self.path = path
+        self._entries = None
+        self._active = set() # URLs of the jobs this process is waiting on
+        self._lock = threading.Lock()
+
+    def _file(self):
+        if self.path is None:
+            self.path = os.path.join(get_cache_dir(), "jobs.json")
+        return self.path
+
+    def _load(self):
+        # always re-read, since other processes (batch workers) share the file
+        try:
+            with open(self._file()) as f:
+                self._entries = json.load(f)
+        except (OSError, ValueError):
+            self._entries = {}
+        return self._entries
+
+    def _save(self):
+        path = self._file()
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self._entries, f)
+        os.replace(tmp_path, path)
+
+    def get(self, query_string:str, catalog:str):
+        """
+        Returns the journal entry of a query ('url', 'catalog', 'submitted' epoch seconds and the owner's 'pid' and 'host'), or None.
+        """
+        with self._lock:
+            return self._load().get(ResultCache.key(query_string, catalog))
+
+    def record(self, query_string:str, catalog:str, url:str, submitted:float = None):
+        """
+        Function records the URL of the job submitted for a query, owned by this process until release(url).
+        Args:
+            query_string (str): ADQL query.
+            catalog (str): Name of RSP catalog the query runs against.
+            url (str): URL of the async job.
+            submitted = None (float) (optional): Epoch seconds the job was submitted at, when taking over an older job. Default is now.
+        """
+        with self._lock:
+            self._load()[ResultCache.key(query_string, catalog)] = {
+                "url": url, "catalog": catalog, "submitted": time.time() if submitted is None else submitted,
+                "pid": os.getpid(), "host": socket.gethostname()}
+            self._save()
+            self._active.add(url)
+
+    def release(self, url:str):
+        """
+        Function marks a job as no longer waited on by this process, so a later call may reattach to it if it is still journaled.
+        """
+        with self._lock:
+            self._active.discard(url)
+
+    def owner_alive(self, entry:dict):
+        """
+        True if the process that journaled a job may still be waiting on it: a thread of this process, or another process on this
+        host that is still running. Owners on other hosts can't be checked and count as alive.
+        """
+        pid = entry.get("pid")
+        if pid is None:
+            return False
+        if entry.get("host") != socket.gethostname():
+            return True
+        if pid == os.getpid():
+            with self._lock:
+                return entry["url"] in self._active
+        try:
+            os.kill(pid, 0) # signal 0 only checks that the process exists
+        except ProcessLookupError:
+            return False
+        except PermissionError: # exists, but belongs to another user
+            return True
+        return True
+
+    def remove(self, query_string:str = None, catalog:str = None, key:str = None, url:str = None):
+        """
+        Function removes the entry of a query (or the entry with the given key), if there is one. With a url, the entry is only
+        removed while it is still for that job, and not once another caller has journaled a job of its own for the same query.
+        """
+        key = key if key is not None else ResultCache.key(query_string, catalog)
+        with self._lock:
+            entries = self._load()
+            entry = entries.get(key)
+            if entry is not None and (url is None or entry["url"] == url):
+                del entries[key]
+                self._save()
+
+    def entries(self):
+        """
+        Function returns a copy of every entry, keyed by query hash.
+        """
+        with self._lock:
+            return dict(self._load())
+
+
+job_journal = JobJournal()
@@ -0,0 +1,244 @@
+# Module holds a local stand-in for the RSP TAP services, backed by SQLite and synthetic data, for offline runs and benchmarks.
+
+from datetime import datetime, timezone
+import itertools
+import math
+import re
+import sqlite3
+import threading
+import time
+from types import SimpleNamespace
+
+from astropy.table import Table
+import pandas as pd
+from pyvo.dal import DALQueryError
+
+from sso_query.services import CATALOG_SERVICES, register_service
+from sso_query.synthetic import make_observations, make_orbits, make_ssobjects
+
+
+class LocalTAPService:
+    """
+    Answers the ADQL written by make_query / make_multiclass_query (COS, RADIANS, SQRT, BETWEEN, CASE, INNER JOIN, LIMIT,
+    TAP_SCHEMA.columns lookups) from an in-memory SQLite database holding synthetic MPCORB, DiaSource and SSObject tables for
+    each catalog. It exposes the parts of pyvo.dal.TAPService that the query functions use: search() and submit_job().
+    Args:
+        n_objects = 10000 (int) (optional): Number of synthetic objects per catalog.
+        obs_per_object = 20.0 (float) (optional): Mean number of DiaSource rows per object.
+        catalogs = None (list) (optional): Catalogs to create. Default is every catalog in CATALOG_SERVICES.
+        latency = 0.0 (float) (optional): Seconds each async job spends queued before executing, to mimic server overhead.
+        seed = 0 (int) (optional): Seed for the synthetic data.
+    """
+
+    def __init__(self, n_objects:int = 10000, obs_per_object:float = 20.0, catalogs:list = None, latency:float = 0.0, seed:int = 0):
+        self.catalogs = list(CATALOG_SERVICES) if catalogs is None else list(catalogs)
+        self.latency = latency
+        self.tables = {} # (catalog, table) -> Pandas dataframe that was loaded
+        self._lock = threading.Lock() # one connection, shared by job threads
+        self._job_ids = itertools.count(1)
+
+        self.connection = sqlite3.connect(":memory:", check_same_thread=False)
+        for name, function in (("COS", math.cos), ("RADIANS", math.radians), ("SQRT", _sqrt), ("LOG10", _log10), ("FLOOR", _floor)):
+            self.connection.create_function(name, 1, _null_safe(function), deterministic=True)
+        self.connection.execute("ATTACH DATABASE ':memory:' AS TAP_SCHEMA")
+        self.connection.execute("CREATE TABLE TAP_SCHEMA.columns (table_name TEXT, column_name TEXT, datatype TEXT)")
+
+        for offset, catalog in enumerate(self.catalogs):
+            orbits = make_orbits(n_objects, seed=seed + offset)
+            observations = make_observations(orbits, catalog=catalog, obs_per_object=obs_per_object, seed=seed + offset)
+            ssobjects = make_ssobjects(orbits, observations, catalog=catalog, seed=seed + offset)
+            self.connection.execute(f"ATTACH DATABASE ':memory:' AS {catalog}")
+            self.load_table(catalog, "MPCORB", orbits.drop(columns="class_name"))
+            self.load_table(catalog, "DiaSource", observations)
+            self.load_table(catalog, "SSObject", ssobjects)
+
+    def load_table(self, catalog:str, table:str, data:pd.DataFrame):
+        """
+        Function (re)creates catalog.table from a pandas table, indexes its ssObjectId column and registers its columns in TAP_SCHEMA.
+        Args:
+            catalog (str): Name of the catalog (an attached SQLite schema).
+            table (str): Name of the table, e.g. MPCORB.
+            data (Pandas dataframe): Rows of the table.
+        """
+        types = {column: _sql_type(dtype) for column, dtype in data.dtypes.items()}
+        with self._lock:
+            self.connection.execute(f"DROP TABLE IF EXISTS {catalog}.{table}")
+            self.connection.execute(f"CREATE TABLE {catalog}.{table} ({', '.join(f'{column} {types[column]}' for column in data.columns)})")
+            rows = data.astype(object).where(data.notna(), None).itertuples(index=False, name=None)
+            self.connection.executemany(f"INSERT INTO {catalog}.{table} VALUES ({', '.join('?' * len(data.columns))})", rows)
+            if "ssObjectId" in data.columns:
+                self.connection.execute(f"CREATE INDEX {catalog}.{table}_ssObjectId ON {table} (ssObjectId)")
+            self.connection.execute("DELETE FROM TAP_SCHEMA.columns WHERE table_name = ?", (f"{catalog}.{table}",))
+            self.connection.executemany("INSERT INTO TAP_SCHEMA.columns VALUES (?, ?, ?)",
+                                        [(f"{catalog}.{table}", column, types[column]) for column in data.columns])
+            self.connection.commit()
+        self.tables[(catalog, table)] = data
+
+    def install(self):
+        """
+        Function registers this service as the client for each of its catalogs, so make_query, run_query etc. use it instead of the RSP.
+        Call services.clear_services() to go back to the real services.
+        Returns:
+            self (LocalTAPService): This service.
+        """
+        for catalog in self.catalogs:
+            register_service(catalog, self)
+        return self
+
+    def execute(self, query:str):
+        """
+        Runs an ADQL query against the local database.
+        Args:
+            query (str): ADQL query string.
+        Returns:
+            result (LocalTAPResults): Query results.
+        """
+        with self._lock:
+            cursor = self.connection.execute(query.strip().rstrip(";"))
+            columns = _select_names(query, [description[0] for description in cursor.description])
+            rows = cursor.fetchall()
+        data = pd.DataFrame.from_records(rows, columns=columns)
+        return LocalTAPResults(Table.from_pandas(data))
+
+    def search(self, query:str, **kwargs):
+        """
+        Runs a query synchronously, like TAPService.search.
+        """
+        try:
+            return self.execute(query)
+        except sqlite3.Error as e:
+            raise DALQueryError(str(e))
+
+    def run_sync(self, query:str, **kwargs):
+        return self.search(query, **kwargs)
+
+    def submit_job(self, query:str, **kwargs):
+        """
+        Creates an async job for a query, like TAPService.submit_job. The job runs in a background thread once run() is called.
+        """
+        return LocalAsyncJob(self, query, next(self._job_ids))
+
+
+class LocalTAPResults:
+    """
+    Query results of a LocalTAPService, with the len()/to_table() parts of pyvo.dal.TAPResults.
+    """
+
+    def __init__(self, table:Table):
+        self._table = table
+
+    def __len__(self):
+        return len(self._table)
+
+    def to_table(self):
+        return self._table
+
+
+class LocalAsyncJob:
+    """
+    Async job of a LocalTAPService, following the UWS phases PENDING -> QUEUED -> EXECUTING -> COMPLETED / ERROR / ABORTED.
+    """
+
+    def __init__(self, service, query, job_id):
+        self.service = service
+        self.query = query
+        self.job_id = str(job_id)
+        self.url = f"local://tap/async/{job_id}"
+        self.phase = "PENDING"
+        self.job = SimpleNamespace(creationtime=datetime.now(timezone.utc), starttime=None, endtime=None) # UWS job summary times
+        self._result = None
+        self._error = None
+        self._thread = None
+
+    def run(self):
+        self.phase = "QUEUED"
+        self._thread = threading.Thread(target=self._execute, daemon=True)
+        self._thread.start()
+        return self
+
+    def _execute(self):
+        time.sleep(self.service.latency)
+        if self.phase == "ABORTED":
+            return
+        self.job.starttime = datetime.now(timezone.utc)
+        self.phase = "EXECUTING"
+        try:
+            result = self.service.execute(self.query)
+        except sqlite3.Error as e:
+            self._error = str(e)
+            result = None
+        self.job.endtime = datetime.now(timezone.utc)
+        if self.phase == "ABORTED": # aborted while executing
+            return
+        self._result = result
+        self.phase = "ERROR" if self._error is not None else "COMPLETED"
+
+    def wait(self, phases=None, timeout=600.0):
+        if self._thread is not None:
+            self._thread.join(timeout)
+        return self
+
+    def raise_if_error(self):
+        if self.phase in ("ERROR", "ABORTED"):
+            raise DALQueryError(self._error or f"Job {self.job_id} is {self.phase}")
+
+    def fetch_result(self):
+        self.raise_if_error()
+        return self._result
+
+    def abort(self):
+        if self.phase not in ("COMPLETED", "ERROR"):
+            self.phase = "ABORTED"
+
+    def delete(self):
+        self.abort()
+        self._result = None
+
+
+def _select_names(query, columns):
+    """
+    Returns the result column names as the RSP reports them: as written in the select list ('mpc.ssObjectID' -> 'ssObjectID'),
+    where SQLite would report the declared name ('ssObjectId').
+    """
+    match = re.match(r"\s*SELECT\s+(.*?)\s+FROM\s", query, flags=re.IGNORECASE | re.DOTALL)
+    if match is None:
+        return columns
+    items, depth, start = [], 0, 0
+    select = match.group(1)
+    for position, character in enumerate(select):
+        depth += {"(": 1, ")": -1}.get(character, 0)
+        if character == "," and depth == 0:
+            items.append(select[start:position].strip())
+            start = position + 1
+    items.append(select[start:].strip())
+    if len(items) != len(columns):
+        return columns
+    return [item.split(".", 1)[1] if re.fullmatch(r"\w+\.\w+", item) else column for item, column in zip(items, columns)]
+
+
+def _sql_type(dtype):
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_integer_dtype(dtype):
+        return "INTEGER"
+    if pd.api.types.is_float_dtype(dtype):
+        return "REAL"
+    return "TEXT"
+
+
+def _null_safe(function):
+    def wrapped(value):
+        if value is None:
+            return None
+        return function(value)
+    return wrapped
+
+
+def _sqrt(value):
+    return math.sqrt(value) if value >= 0 else None # NULL instead of an error, as on the RSP
+
+
+def _log10(value):
+    return math.log10(value) if value > 0 else None
+
+
+def _floor(value):
+    return math.floor(value)
@@ -0,0 +1,184 @@
+# Module holds the job lifecycle metrics recorded by the query functions and the hooks they are reported to.
+
+from dataclasses import asdict, dataclass, field
+from datetime import timezone
+import json
+import logging
+import threading
+import time
+import warnings
+
+#################### Global ####################
+logger = logging.getLogger("sso_query")
+################################################
+
+_hooks = []
+_hooks_lock = threading.Lock()
+
+
+@dataclass
+class JobMetrics:
+    """
+    Lifecycle of one TAP job. timestamps holds epoch seconds for the events seen: 'submitted', 'run', 'completed' and 'fetched'
+    on the client, and 'created', 'started' and 'ended' as reported by the server (UWS creationTime, startTime, endTime).
+    """
+    query: str
+    job_url: str = None
+    phase: str = None
+    timestamps: dict = field(default_factory=dict)
+    rows: int = None
+    bytes: int = None # size of the downloaded VOTable, None if the client does not expose it
+    download_seconds: float = 0.0
+    parse_seconds: float = 0.0
+    error: str = None
+    reattached: bool = False # picked up from the job journal instead of submitted
+    sync: bool = False # run on the sync endpoint (one request, no UWS job); download_seconds then covers the whole request
+
+    def _span(self, start, end):
+        if start in self.timestamps and end in self.timestamps:
+            return max(self.timestamps[end] - self.timestamps[start], 0.0)
+        return None
+
+    @property
+    def queued_seconds(self):
+        """
+        Time between the job being created and starting to execute on the server (client-side times if the server gives none).
+        """
+        span = self._span("created", "started")
+        return span if span is not None else self._span("submitted", "run")
+
+    @property
+    def executing_seconds(self):
+        """
+        Time the server spent executing the job (client-side times if the server gives none).
+        """
+        span = self._span("started", "ended")
+        return span if span is not None else self._span("run", "completed")
+
+
+@dataclass
+class QueryMetrics:
+    """
+    Metrics of one run_query / run_queries call: the TAP jobs it ran (several for partitioned queries), whether the result came
+    from the cache, and the time spent converting the result into the returned table.
+    """
+    query: str
+    catalog: str = None
+    started: float = field(default_factory=time.time)
+    jobs: list = field(default_factory=list)
+    cache_hit: bool = False
+    convert_seconds: float = 0.0
+    total_seconds: float = None
+    rows: int = None
+
+    def finish(self, rows:int = None):
+        """
+        Function records the total time of the call and the number of rows returned.
+        """
+        self.total_seconds = time.time() - self.started
+        self.rows = rows if rows is not None else sum(job.rows or 0 for job in self.jobs)
+
+    def breakdown(self):
+        """
+        Function splits the time of the call by stage. Job stages are summed over jobs, so they can exceed total for parallel jobs.
+        Returns:
+            breakdown (dict): Seconds spent 'queued', 'executing', 'download', 'parse' and 'convert', and the 'total'.
+        """
+        return {
+            "queued": sum(job.queued_seconds or 0.0 for job in self.jobs),
+            "executing": sum(job.executing_seconds or 0.0 for job in self.jobs),
+            "download": sum(job.download_seconds for job in self.jobs),
+            "parse": sum(job.parse_seconds for job in self.jobs),
+            "convert": self.convert_seconds,
+            "total": self.total_seconds
+        }
+
+    def as_dict(self):
+        """
+        Function returns the metrics as plain JSON-serializable values, with the breakdown and the byte count of all jobs.
+        """
+        metrics = asdict(self)
+        for job, record in zip(self.jobs, metrics["jobs"]):
+            record["queued_seconds"] = job.queued_seconds
+            record["executing_seconds"] = job.executing_seconds
+        known = [job.bytes for job in self.jobs if job.bytes is not None]
+        metrics["bytes"] = sum(known) if known else None
+        metrics["breakdown"] = self.breakdown()
+        return metrics
+
+
+def add_hook(hook):
+    """
+    Function registers a hook called with the QueryMetrics of every finished query, e.g. log_metrics, a JsonLinesHook or any callable.
+    Args:
+        hook (callable): Function taking one QueryMetrics. Exceptions it raises are turned into warnings.
+    """
+    with _hooks_lock:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """
+    Function unregisters a hook added with add_hook.
+    """
+    with _hooks_lock:
+        _hooks.remove(hook)
+
+
+def clear_hooks():
+    """
+    Function unregisters every hook.
+    """
+    with _hooks_lock:
+        _hooks.clear()
+
+
+def emit(metrics:QueryMetrics):
+    """
+    Function reports metrics to every registered hook. A failing hook never fails the query.
+    """
+    with _hooks_lock:
+        hooks = list(_hooks)
+    for hook in hooks:
+        try:
+            hook(metrics)
+        except Exception as e:
+            warnings.warn(f"Metrics hook {hook!r} failed: {e}")
+
+
+def log_metrics(metrics:QueryMetrics, level:int = logging.INFO):
+    """
+    Hook that logs a one-line timing breakdown to the 'sso_query' logger.
+    """
+    breakdown = ", ".join(f"{stage} {seconds:.3f}s" for stage, seconds in metrics.breakdown().items() if seconds is not None)
+    source = "cache" if metrics.cache_hit else f"{len(metrics.jobs)} job(s)"
+    logger.log(level, f"{metrics.catalog}: {metrics.rows} rows from {source}; {breakdown}")
+
+
+class JsonLinesHook:
+    """
+    Hook that appends the metrics of each query to a file as one JSON object per line, for collecting metrics across batch runs.
+    Args:
+        path (str): File to append to.
+    """
+
+    def __init__(self, path:str):
+        self.path = path
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics:QueryMetrics):
+        line = json.dumps(metrics.as_dict())
+        with self._lock:
+            with open(self.path, "a") as f:
+                f.write(line + "\n")
+
+
+def epoch_seconds(value):
+    """
+    Returns a UWS timestamp (a datetime, naive ones taken as UTC) as epoch seconds, or None.
+    """
+    if value is None:
+        return None
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.timestamp()
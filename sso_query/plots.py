@@ -1,46 +1,96 @@
-from astropy.time import Time
 import itertools
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 import numpy as np
 import pandas as pd
+from pandas.api.types import union_categoricals
 import seaborn as sns
 
+from sso_query.query import CATEGORICAL_COLUMNS, compact_frame, run_histogram2d
+from sso_query.session import as_session
+
+#################### Global ####################
+AXIS_LABELS = {"a": "Semi-major Axis (AU)", "q": "Perihelion Distance (AU)", "e": "Eccentricity", "incl": "Inclination (deg)"}
+AXIS_TITLES = {"a": "a", "q": "q", "e": "e", "incl": "i"}
+RASTER_THRESHOLD = 200000 # scatter_plots / color_plot draw density images above this many rows
+RASTER_SIZE = (600, 450) # pixels (x, y) of each density image
+################################################
+
+
+def class_groups(df, column:str = "class_name", sort:bool = False):
+    """
+    Function groups the rows of a table by class in a single pass (see AnalysisSession.class_groups); with a session the groups
+    are computed once and shared by every plot.
+    Args:
+        df (Pandas dataframe or AnalysisSession): Table with a class column.
+        column = "class_name" (str) (optional): Name of the class column.
+        sort = False (bool) (optional): Order the classes by name instead of by first appearance.
+    Returns:
+        groups (dict): Array of row positions (for .iloc or NumPy arrays) per class, in increasing order. Rows without a class are left out.
+    """
+    return as_session(df).class_groups(column, sort)
+
+
+def scatter_classes(ax, x, y, groups, colors = None, **kwargs):
+    """
+    Function draws one scatter per class from the row positions in groups, skipping rows where x or y is NaN.
+    Args:
+        ax (Matplotlib axes): Axes to draw on.
+        x, y (array-like): Values to plot, one per row of the table the groups were made from.
+        groups (dict): Row positions per class, as returned by class_groups.
+        colors = None (dict) (optional): Color per class. Default uses the Matplotlib color cycle.
+        **kwargs: Passed on to ax.scatter (e.g. s, alpha).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    for class_type, rows in groups.items():
+        rows = rows[valid[rows]]
+        ax.scatter(x[rows], y[rows], label=class_type, color=colors[class_type] if colors is not None else None, **kwargs)
+
 
 def setup(df):
-    if type(df) != pd.DataFrame:
-        df = df.to_pandas()
-    
-    a_min, a_max = np.percentile(df['a'], [0.5, 99.5])
-    e_min, e_max = np.percentile(df['e'], [0.5, 99.5])
-    i_min, i_max = np.percentile(df['incl'], [0.5, 99.5])
-    
-    df_trimmed = df[(df['a'] >= a_min) & (df['a'] <= a_max) & (df['e'] >= e_min) & (df['e'] <= e_max) & (df['incl'] >= i_min) & (df['incl'] <= i_max)]
-    
-    return df_trimmed
+    """
+    Function drops the rows with a, e or incl outside their 0.5-99.5 percentile range. Pass an AnalysisSession (or use
+    session.trimmed) to compute the trimmed rows only once across plots.
+    Args:
+        df (Pandas dataframe, Astropy table or AnalysisSession): Results from query.
+    Returns:
+        df_trimmed (Pandas dataframe): Rows inside the percentile ranges.
+    """
+    return as_session(df).trimmed.df
 
 
-def scatter_plots(df):
+def scatter_plots(df, rasterize:bool = None):
     """
     Function that creates  a vs. e, a vs. i scatter plots using the returned data table from the original query -- can handle objects from multiple classes.
     Args:
-        df (Pandas dataframe): Results from query. 
+        df (Pandas dataframe or AnalysisSession): Results from query. 
+        rasterize = None (bool) (optional): Draw each panel as one density image (see _raster_panel) instead of a marker per row.
+            Default is to rasterize above RASTER_THRESHOLD rows.
     """
+    session = as_session(df)
+    df = session.df
+    if rasterize is None:
+        rasterize = len(df) > RASTER_THRESHOLD
     fig, axs = plt.subplots(1, 2, figsize=(12, 5))
     palette = sns.color_palette("colorblind")
-    color_cycle = {cls: palette[i] for i, cls in enumerate(sorted(df['class_name'].dropna().unique()))}
+    groups = session.class_groups()
+    color_cycle = {cls: palette[i] for i, cls in enumerate(sorted(groups))}
+    colors = {cls: color_cycle[cls] for cls in groups} # drawing order: first appearance
 
     # Plot a vs. e
     if 'a' in df.columns and 'e' in df.columns:
-        valid_ae = df[['a', 'e']].dropna()
+        valid_ae = session.valid(['a', 'e'])
         if valid_ae.empty:
             print("No valid data for a vs. e plot — all values are NaN.")
         else:
             if (len(df) - len(valid_ae)) > 0:
                 print(f"Plotting orbital data ({len(valid_ae)} valid values, {len(df) - len(valid_ae)} NaNs skipped).")
-        for class_type in df["class_name"].dropna().unique():
-            class_data = df[(df["class_name"] == class_type) & df["a"].notna() & df["e"].notna()]
-            axs[0].scatter(class_data["a"], class_data["e"], s=1, alpha=0.5, label=class_type, color=color_cycle[class_type])
+        if rasterize:
+            _raster_panel(axs[0], df["a"], df["e"], df["class_name"], colors)
+        else:
+            scatter_classes(axs[0], df["a"], df["e"], groups, colors, s=1, alpha=0.5)
         axs[0].set_xlabel('Semi-major Axis (AU)')
         axs[0].set_ylabel('Eccentricity')
         axs[0].set_title('a vs. e')
@@ -49,15 +99,16 @@ def scatter_plots(df):
 
     # Plot a vs. incl
     if 'a' in df.columns and 'incl' in df.columns:
-        valid_ai = df[['a', 'incl']].dropna()
+        valid_ai = session.valid(['a', 'incl'])
         if valid_ai.empty:
             print("No valid data for a vs. incl plot — all values are NaN.")
         else:
             if (len(df) - len(valid_ai)) > 0:
                 print(f"Plotting orbital data ({len(valid_ai)} valid values, {len(df) - len(valid_ai)} NaNs skipped).")
-        for class_type in df["class_name"].dropna().unique():
-            class_data = df[(df["class_name"] == class_type) & df["a"].notna() & df["incl"].notna()]
-            axs[1].scatter(class_data["a"], class_data["incl"], s=1, alpha=0.5, label=class_type, color=color_cycle[class_type])
+        if rasterize:
+            _raster_panel(axs[1], df["a"], df["incl"], df["class_name"], colors)
+        else:
+            scatter_classes(axs[1], df["a"], df["incl"], groups, colors, s=1, alpha=0.5)
         axs[1].set_xlabel('Semi-major Axis (AU)')
         axs[1].set_ylabel('Inclination (deg)')
         axs[1].set_title('a vs. i')
@@ -68,24 +119,25 @@ def scatter_plots(df):
     plt.tight_layout(rect=[0, 0, 1, 0.95])
     plt.show()
 
-def run_scatter_plots(df):
-    df_trimmed = setup(df)
-    return scatter_plots(df_trimmed)
+def run_scatter_plots(df, rasterize:bool = None):
+    return scatter_plots(as_session(df).trimmed, rasterize=rasterize)
 
 
 def heat_maps(df, log_scale:bool = False, bins:int = 200):
     """
     Function that creates a vs. e, a vs. i heat map plots using the returned data table from the original query -- meant for objects of one class.
     Args:
-        df (Pandas DataFrame): Results from query.
+        df (Pandas DataFrame or AnalysisSession): Results from query.
         log_scale (bool): If True, apply log scale to colorbar (not axes). Default is False.
         bins (int): Number of bins along each axis. Default is 200.
     """
+    session = as_session(df)
+    df = session.df
     fig, axs = plt.subplots(1, 2, figsize=(12, 5))
     norm = LogNorm() if log_scale else None
     
     if 'a' in df.columns and 'e' in df.columns and 'incl' in df.columns:
-        valid = df[['a', 'e', 'incl']].dropna()
+        valid = session.valid(['a', 'e', 'incl'])
         if valid.empty:
             print("No valid orbital data — all values are NaN.")
         else:
@@ -113,22 +165,80 @@ def heat_maps(df, log_scale:bool = False, bins:int = 200):
     plt.show()     
 
 def run_heat_maps(df, log_scale:bool = False, bins:int = 200):
-    df_trimmed = setup(df)
-    return heat_maps(df_trimmed, log_scale=log_scale, bins=bins)
+    return heat_maps(as_session(df).trimmed, log_scale=log_scale, bins=bins)
+
+
+def heat_map_counts(counts, x_edges, y_edges, x:str = "a", y:str = "e", log_scale:bool = False, ax = None):
+    """
+    Function draws a heat map from precomputed bin counts (e.g. from query.run_histogram2d), styled like heat_maps.
+    Args:
+        counts (ndarray): Number of objects per bin, of shape (x bins, y bins).
+        x_edges (ndarray): Bin edges along x.
+        y_edges (ndarray): Bin edges along y.
+        x = "a" (str) (optional): Quantity along x, for the labels. a, q, e, incl
+        y = "e" (str) (optional): Quantity along y, for the labels.
+        log_scale (bool): If True, apply log scale to colorbar (not axes). Default is False.
+        ax = None (matplotlib Axes) (optional): Axes to draw on. Default is a new figure, which is shown.
+    Returns:
+        mesh (QuadMesh): The drawn heat map.
+    """
+    show = ax is None
+    if show:
+        fig, ax = plt.subplots(figsize=(6, 5))
+    norm = LogNorm() if log_scale else None
+
+    # empty bins are left blank, like hist2d(..., cmin=1)
+    mesh = ax.pcolormesh(x_edges, y_edges, np.ma.masked_less(counts, 1).T, cmap='plasma', norm=norm)
+    ax.figure.colorbar(mesh, ax=ax, label='Number of objects (log scale)' if log_scale else 'Number of objects')
+    ax.set_xlabel(AXIS_LABELS.get(x, x))
+    ax.set_ylabel(AXIS_LABELS.get(y, y))
+    ax.set_title(f"{AXIS_TITLES.get(x, x)} vs. {AXIS_TITLES.get(y, y)}")
+    ax.grid(True, ls="--", lw=0.5)
+    if show:
+        plt.tight_layout()
+        plt.show()
+    return mesh
+
+
+def run_binned_heat_maps(catalog:str, class_name:str, log_scale:bool = False, bins:int = 200, cache = False):
+    """
+    Function draws the a vs. e and a vs. i heat maps of heat_maps for a whole orbital class, binned server-side with
+    query.run_histogram2d, so the objects themselves are never downloaded.
+    Args:
+        catalog (str): Name of RSP catalog to query.
+        class_name (str): Name of orbital class.
+        log_scale (bool): If True, apply log scale to colorbar (not axes). Default is False.
+        bins (int): Number of bins along each axis. Default is 200.
+        cache = False (bool or ResultCache) (optional): Reuse counts stored on local disk, as in run_query.
+    """
+    fig, axs = plt.subplots(1, 2, figsize=(12, 5))
+    for ax, y in zip(axs, ["e", "incl"]):
+        counts, x_edges, y_edges = run_histogram2d(catalog, class_name, x="a", y=y, bins=bins, cache=cache)
+        heat_map_counts(counts, x_edges, y_edges, x="a", y=y, log_scale=log_scale, ax=ax)
+
+    plt.suptitle("Dynamical Constraints Heat Maps")
+    plt.tight_layout(rect=[0, 0, 1, 0.95])
+    plt.show()
         
 
-def color_plot(df):
+def color_plot(df, rasterize:bool = None):
     """
     Function that creates f-r vs. r-i color plot if data is available from original query.
     Args:
-        df (Pandas DataFrame): Results from query.
+        df (Pandas DataFrame or AnalysisSession): Results from query.
+        rasterize = None (bool) (optional): Draw the plot as one density image (see _raster_panel) instead of a marker per row.
+            Default is to rasterize above RASTER_THRESHOLD rows.
     """
+    session = as_session(df)
+    df = session.df
+    if rasterize is None:
+        rasterize = len(df) > RASTER_THRESHOLD
     palette = sns.color_palette("colorblind")
     color_cycle = itertools.cycle(palette)
 
     # Plot color
     if 'g_r_color' in df.columns and 'r_i_color' in df.columns:
-        valid_color = df[['g_r_color', 'r_i_color']].dropna()
+        valid_color = session.valid(['g_r_color', 'r_i_color'])
         if valid_color.empty:
             print("No valid data for g‒r vs. r‒i plot — all values are NaN.")
         else:
@@ -136,9 +246,12 @@ def color_plot(df):
                 print(f"Plotting color distributions ({len(valid_color)} valid values, {len(df) - len(valid_color)} NaNs skipped).")
         
         plt.figure(figsize=(7, 5))
-        for class_type in df["class_name"].unique():
-            class_data = df[(df["class_name"] == class_type) & df["g_r_color"].notna() & df["r_i_color"].notna()]
-            plt.scatter(class_data['g_r_color'], class_data['r_i_color'], s=1, alpha=0.5, label=class_type, color=next(color_cycle))
+        groups = session.class_groups()
+        colors = {class_type: next(color_cycle) for class_type in groups}
+        if rasterize:
+            _raster_panel(plt.gca(), df['g_r_color'], df['r_i_color'], df["class_name"], colors, extent=(-5, 5, -5, 5))
+        else:
+            scatter_classes(plt.gca(), df['g_r_color'], df['r_i_color'], groups, colors, s=1, alpha=0.5)
         plt.xlim(-5, 5)
         plt.ylim(-5, 5)
         plt.xlabel("g‒r")
@@ -151,23 +264,72 @@ def color_plot(df):
     else:
         print("Columns do not exist in this table.")
 
-def run_color_plot(df):
-    df_trimmed = setup(df)
-    return color_plot(df_trimmed)
+def run_color_plot(df, rasterize:bool = None):
+    return color_plot(as_session(df).trimmed, rasterize=rasterize)
+
+
+def _raster_panel(ax, x, y, labels, colors:dict, extent = None, size = RASTER_SIZE, alpha:float = 0.5):
+    """
+    Draws x vs. y for several classes as a single image, so drawing time and output size do not depend on the number of points.
+    Points are counted per class on a pixel grid with NumPy; a pixel holding n points of a class gets the opacity of n overlapping
+    markers of that alpha, and the class layers are composited in the order of colors. Empty, labelled scatters keep the legend.
+    Args:
+        ax (matplotlib Axes): Axes to draw on.
+        x, y (array-like): Coordinates of the points; NaNs are skipped.
+        labels (array-like): Class of each point.
+        colors (dict): Color of each class to draw, in drawing order.
+        extent = None ((xmin, xmax, ymin, ymax)) (optional): Area covered by the image. Default is the extent of the points plus 5% margins.
+        size = RASTER_SIZE ((int, int)) (optional): Number of pixels along x and y.
+        alpha = 0.5 (float) (optional): Opacity of a single point.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    codes = pd.Categorical(np.asarray(labels, dtype=object), categories=list(colors)).codes
+    valid = np.isfinite(x) & np.isfinite(y) & (codes >= 0)
+    if extent is None:
+        if not valid.any():
+            return
+        x_low, x_high, y_low, y_high = x[valid].min(), x[valid].max(), y[valid].min(), y[valid].max()
+        x_pad, y_pad = 0.05 * (x_high - x_low) or 0.5, 0.05 * (y_high - y_low) or 0.5 # matplotlib's default margins
+        extent = (x_low - x_pad, x_high + x_pad, y_low - y_pad, y_high + y_pad)
+    x_min, x_max, y_min, y_max = extent
+    valid &= (x >= x_min) & (x <= x_max) & (y >= y_min) & (y <= y_max)
+
+    # one bincount over (class, row, column) counts every class at once
+    nx, ny = size
+    ix = np.minimum(((x[valid] - x_min) / (x_max - x_min) * nx).astype(np.int64), nx - 1)
+    iy = np.minimum(((y[valid] - y_min) / (y_max - y_min) * ny).astype(np.int64), ny - 1)
+    counts = np.bincount((codes[valid].astype(np.int64) * ny + iy) * nx + ix, minlength=len(colors) * ny * nx)
+    counts = counts.reshape(len(colors), ny, nx)
+
+    # "over" compositing of the class layers, with premultiplied colors
+    rgb = np.zeros((ny, nx, 3))
+    coverage = np.zeros((ny, nx))
+    for layer, color in zip(counts, colors.values()):
+        opacity = 1.0 - (1.0 - alpha) ** layer
+        rgb = np.asarray(color[:3])[None, None, :] * opacity[..., None] + rgb * (1.0 - opacity[..., None])
+        coverage = opacity + coverage * (1.0 - opacity)
+    image = np.dstack([rgb / np.where(coverage > 0, coverage, 1.0)[..., None], coverage])
+
+    ax.imshow(image, extent=(x_min, x_max, y_min, y_max), origin="lower", aspect="auto", interpolation="nearest")
+    for class_type, color in colors.items():
+        ax.scatter([], [], s=1, alpha=alpha, label=class_type, color=color)
 
     
 def ssobject_plots(df):
     """
     Function that plots new vs. known objects if data is available from original query.
     Args:
-        df (Pandas DataFrame): Results from query.
+        df (Pandas DataFrame or AnalysisSession): Results from query.
     """
+    session = as_session(df)
+    df = session.df
     palette = sns.color_palette("colorblind")
     color_cycle = itertools.cycle(palette)
 
     # Plot new vs. known objects
     if 'discoverySubmissionDate' in df.columns and 'numObs' in df.columns:
-        valid_time = df[['discoverySubmissionDate', 'numObs']].dropna()
+        valid_time = session.valid(['discoverySubmissionDate', 'numObs'])
         if valid_time.empty:
             print("No valid timing data for new vs. known plots — all values are NaN.")
         else:
@@ -182,7 +344,8 @@ def ssobject_plots(df):
         
         if 'a' in df.columns and 'e' in df.columns and 'incl' in df.columns:
             
-            for class_name, class_df in df.groupby('class_name'):
+            for class_name, rows in session.class_groups(sort=True).items():
+                class_df = df.iloc[rows]
                 valid_class = class_df[['a', 'e', 'incl']].dropna()
                 if valid_class.empty:
                     print(f"No valid orbital data for class '{class_name}' — skipping plot.")
@@ -232,16 +395,18 @@ def ssobject_plots(df):
         print("Columns do not exist in this table.")
 
 def run_ssobject_plots(df):
-    df_trimmed = setup(df)
-    return ssobject_plots(df_trimmed)
+    return ssobject_plots(as_session(df).trimmed)
 
 
-def combine_tables(*dfs: pd.DataFrame) -> pd.DataFrame:
+def combine_tables(*dfs: pd.DataFrame, compact = False) -> pd.DataFrame:
     """
     Vertically concatenates multiple pandas DataFrames. Useful for combining data tables of different types.
 
     Args:
         *dfs (pd.DataFrame): Any number of dataframes to concatenate.
+        compact = False (bool or str) (optional): Shrink the dtypes with compact_frame (categorical 'class_name' and 'band', Arrow
+            strings, smallest integers) before concatenating, so the combined table is never held at full size, and report the
+            memory saved. "float32" also stores the orbital elements, fluxes and magnitudes as float32.
 
     Returns:
         pd.DataFrame: Combined dataframe. 
@@ -252,7 +417,19 @@ def combine_tables(*dfs: pd.DataFrame) -> pd.DataFrame:
             converted.append(df)
         else:
             converted.append(df.to_table().to_pandas())
+    if not compact:
+        return pd.concat(converted, axis=0, ignore_index=True)
+
+    before = sum(df.memory_usage(deep=True).sum() for df in converted)
+    converted = [compact_frame(df, float32=compact == "float32", report=False) for df in converted]
+    # concat only keeps categoricals whose categories match, so give every table the union of them
+    for column in CATEGORICAL_COLUMNS:
+        if all(column in df.columns for df in converted):
+            categories = union_categoricals([df[column].array for df in converted]).categories
+            converted = [df.assign(**{column: df[column].cat.set_categories(categories)}) for df in converted]
     vertical_concat = pd.concat(converted, axis=0, ignore_index=True)
+    after = vertical_concat.memory_usage(deep=True).sum()
+    print(f"Compact dtypes: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({before / max(after, 1):.1f}x smaller)")
     return vertical_concat
 
 
@@ -260,16 +437,11 @@ def obs_type_counts(data_table):
     """
     Function returns the number of observations per class type. 
     Args:
-        data_table: Table of data with 'class_name' parameter. Can be pandas table or Astropy table. 
+        data_table: Table of data with 'class_name' parameter. Can be pandas table, Astropy table or AnalysisSession. 
     Returns:
         counts: Pandas series containing counts of each unique value in 'class_name'. 
     """
-    if isinstance(data_table, pd.DataFrame): #checks if the data table passed to counts is pandas
-        counts = data_table['class_name'].value_counts()
-        
-    else:
-        df = data_table.to_pandas()
-        counts = df['class_name'].value_counts()
+    counts = as_session(data_table).df['class_name'].value_counts()
     print(counts)
     return counts
 
@@ -278,15 +450,16 @@ def obs_unique_obj_counts(data_table):
     """
     Function returns the number of observations per unique object.
     Args:
-        data_table: Table of data with 'ssObjectID' and 'class_name' parameters. Can be pandas table or Astropy table. 
+        data_table: Table of data with 'ssObjectID' and 'class_name' parameters, one row per observation or aggregated server-side
+            (make_query(..., aggregate=...), with an 'obs_count' column). Can be pandas table, Astropy table or AnalysisSession. 
     Returns:
         counts: Pandas series containing counts of each unique value in 'ssObjectID'.  
     """
-    if isinstance(data_table, pd.DataFrame):
-        counts = data_table.groupby('ssObjectID')["class_name"].value_counts().reset_index(name="obs_count")
+    df = as_session(data_table).df
+    if "obs_count" in df.columns: # already counted server-side, per object or per object and band
+        counts = df.groupby(['ssObjectID', 'class_name'], observed=True)["obs_count"].sum().reset_index()
     else:
-        df = data_table.to_pandas()
-        counts = df.groupby('ssObjectID')["class_name"].value_counts().reset_index(name="obs_count")
+        counts = df.groupby(['ssObjectID', 'class_name'], observed=True).size().reset_index(name="obs_count")
     print(counts)
     return counts
 
@@ -295,15 +468,12 @@ def type_counts(data_table):
     """
     Function returns number of unique objects per class type.
     Args:
-        data_table: Pandas Dataframe containing all dp1 data. 
+        data_table: Pandas Dataframe (or AnalysisSession) containing all dp1 data, one row per observation or aggregated server-side
+            (make_query(..., aggregate=...)). 
     Returns:
         counts: Dictionary containing object count per class type. 
     """
-    if isinstance(data_table, pd.DataFrame):
-        counts = data_table.groupby("class_name")["ssObjectID"].nunique().reset_index(name="object_count")
-    else:
-        df = data_table.to_pandas()
-        counts = df.groupby("class_name")["ssObjectID"].nunique().reset_index(name="object_count")
+    counts = as_session(data_table).df.groupby("class_name", observed=True)["ssObjectID"].nunique().reset_index(name="object_count")
     print(counts)
     return counts
 
@@ -313,26 +483,21 @@ def discovery_cutoff_counts(df, discovery_cutoff):
     Count unique objects discovered since the given cutoff date, grouped by class_name.
 
     Args:
-        df: pandas DataFrame or Astropy table joined with SSObject (need 'discoverySubmissionDate' and 'numObs' columns).
+        df: pandas DataFrame, Astropy table or AnalysisSession joined with SSObject (need 'discoverySubmissionDate' and 'numObs' columns).
+            With a session the MJDs are converted to dates only once.
         discovery_cutoff: string or pd.Timestamp, cutoff date (inclusive).
     
     Returns:
         pandas DataFrame with columns ['class_name', 'object_count'].
     """
-    if not isinstance(df, pd.DataFrame):
-        df = df.to_pandas()
+    session = as_session(df)
+    df = session.df
 
     if 'discoverySubmissionDate' in df.columns and 'numObs' in df.columns:
-        df = df.copy()
-        mask = df['discoverySubmissionDate'].notna()
-        mjd_values = df.loc[mask, 'discoverySubmissionDate'].astype(float)
-        converted_times = Time(mjd_values, format='mjd').to_datetime()
-        df['discoverySubmissionDate'] = pd.to_datetime(df['discoverySubmissionDate'], errors='coerce')
-        df.loc[mask, 'discoverySubmissionDate'] = pd.to_datetime(converted_times)
         discovery_cutoff = pd.Timestamp(discovery_cutoff)
-        filtered_df = df[df['discoverySubmissionDate'] >= discovery_cutoff] 
+        filtered_df = df[(session.discovery_dates >= discovery_cutoff).to_numpy()]
         
-        counts = filtered_df.groupby("class_name")["ssObjectID"].nunique().reset_index(name="object_count")
+        counts = filtered_df.groupby("class_name", observed=True)["ssObjectID"].nunique().reset_index(name="object_count")
 
     else:
         print("Columns do not exist in this table.")
@@ -344,15 +509,20 @@ def data_grouped_mags(df):
     """
     Function groups everything by class name, observations by unique object, gets min/max mags
     Args:
-        df (Pandas Dataframe): Results data with columns 'class_name', 'ssObjectID'
+        df (Pandas Dataframe or AnalysisSession): Results data with columns 'class_name', 'ssObjectID' and 'magTrueVband' or 'apFlux'
+            (one row per observation; see AnalysisSession.magnitudes), or 'mag_min', 'mag_max', 'mag_mean' and 'mag_count' (aggregated
+            server-side by make_query(..., aggregate=...)).
     Returns:
         sorted_filt_lrg_ranges (Pandas df): Original dataframe grouped by class name and unique observation, added min/max/mean/range magnitude columns,
             filtered by 2 std deviation criterion in mag range, in a descending order according to mag range column.
     """
-    if not isinstance(df, pd.DataFrame):
-        df = df.to_pandas()
+    if df is None:
+        print("No values found.")
+        return pd.DataFrame()
+    session = as_session(df)
+    df = session.df
 
-    if df is None or df.empty:
+    if df.empty:
         print("No values found.")
         return pd.DataFrame()
     
@@ -363,11 +533,22 @@ def data_grouped_mags(df):
         raise KeyError("ssObjectID is not a column.")
     
     # 1. Group observations by class name, by ssObjectID, get the min/max/mean magnitudes
-    grouped_obs_data = df.groupby(['class_name', 'ssObjectID']).agg(
-        mag_min = ('magTrueVband', 'min'), 
-        mag_max = ('magTrueVband', 'max'), 
-        mag_mean = ('magTrueVband', 'mean')
-    )
+    if "mag_min" in df.columns: # aggregated server-side; per-band rows still need combining per object
+        df = df.assign(mag_sum = df['mag_mean'] * df['mag_count'])
+        grouped_obs_data = df.groupby(['class_name', 'ssObjectID'], observed=True).agg(
+            mag_min = ('mag_min', 'min'),
+            mag_max = ('mag_max', 'max'),
+            mag_sum = ('mag_sum', 'sum'),
+            mag_count = ('mag_count', 'sum')
+        )
+        grouped_obs_data['mag_mean'] = grouped_obs_data.pop('mag_sum') / grouped_obs_data.pop('mag_count')
+    else:
+        mags = session.magnitudes
+        grouped_obs_data = mags.groupby([df['class_name'], df['ssObjectID']], observed=True).agg(
+            mag_min = 'min', 
+            mag_max = 'max', 
+            mag_mean = 'mean'
+        )
     grouped_obs_data = grouped_obs_data.reset_index() # groupby turns 'class_name' and 'ssObjectID' into indeces, this turns them back into columns
     # print(grouped_obs_data) # degbugging
     
@@ -401,23 +582,31 @@ def obs_filter(df):
     """
     Function returns pandas data frame with data grouped by observations and filter.
     Args:
-        df (Pandas dataframe): Dataframe with 'ssObjectID' and 'band' columns. 
+        df (Pandas dataframe or AnalysisSession): Dataframe with 'ssObjectID' and 'band' columns, one row per observation or aggregated
+            server-side (make_query(..., aggregate="band"), with an 'obs_count' column). 
     Returns:
         observations_by_object_filter: Dataframe containing counts of all observations by unique ssO_id and filter.
     """
+    df = as_session(df).df
     if df.get('band') is None:
         raise KeyError("No 'band' column. Check that query joined with DiaSource.")
     if df.get('ssObjectID') is None:
         raise KeyError("No 'ssObjectID' column. Check query fields.")
 
-    # need to count observations for each unique object in SSO_id
-    observations_by_object = df['ssObjectID'].value_counts()
-    
-    # unique observations within each filter
-    observations_by_filter = df['band'].value_counts()
-    
-    # count of unique observations for each unique object in SSO_id within each filter
-    observations_by_object_filter = df.groupby(['ssObjectID', 'band']).size().reset_index(name='obs_filter_count')
+    if 'obs_count' in df.columns: # already counted server-side per object and band
+        observations_by_object = df.groupby('ssObjectID', observed=True)['obs_count'].sum().sort_values(ascending=False).rename('count')
+        observations_by_filter = df.groupby('band', observed=True)['obs_count'].sum().sort_values(ascending=False).rename('count')
+        observations_by_object_filter = df[['ssObjectID', 'band', 'obs_count']].rename(columns={'obs_count': 'obs_filter_count'})
+        observations_by_object_filter = observations_by_object_filter.sort_values(['ssObjectID', 'band'], ignore_index=True)
+    else:
+        # need to count observations for each unique object in SSO_id
+        observations_by_object = df['ssObjectID'].value_counts()
+
+        # unique observations within each filter
+        observations_by_filter = df['band'].value_counts()
+
+        # count of unique observations for each unique object in SSO_id within each filter
+        observations_by_object_filter = df.groupby(['ssObjectID', 'band'], observed=True).size().reset_index(name='obs_filter_count')
 
     # print statements
     print(f"# of observations by Object:", observations_by_object)
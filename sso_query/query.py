@@ -1,13 +1,27 @@
+from astropy.io.votable import parse as votableparse
 from astropy.table import Table
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+from functools import partial
 from IPython.display import display
-from lsst.rsp import get_tap_service
 import matplotlib.pyplot as plt
 from matplotlib.colors import LogNorm
 import numpy as np
 import pandas as pd
+import pyarrow as pa
+from pyvo.dal import DALServiceError
+from pyvo.dal.tap import AsyncTAPJob, TAPResults
+import json
+import random
+import re
+import requests
+import threading
+import time
+import warnings
 
-service = get_tap_service("ssotap")
-assert service is not None
+from sso_query.adql import E, INCL, Q, Function, all_of, any_of, cutoff_conditions
+from sso_query.cache import JOB_JOURNAL_TTL, job_journal, result_cache, schema_cache
+from sso_query.metrics import JobMetrics, QueryMetrics, emit, epoch_seconds
+from sso_query.services import CATALOG_SERVICES, get_service
 
 #################### Global ####################
 ORBITAL_CLASS_CUTOFFS = {
@@ -20,9 +34,40 @@ ORBITAL_CLASS_CUTOFFS = {
     "Jtrojan": {"a_min": 4.8, "a_max": 5.4, "e_max": 0.3},
     "JFC": {"tj_min": 2.0, "tj_max": 3.0}
 }
+REQUIRED_COLUMNS = ("q", "e") # run_query derives 'a' from these
+JOIN_ALIASES = {"DiaSource": "dias", "SSObject": "sso"}
+COLUMN_PRESETS = { # minimal projections for the plots.py consumers
+    "heatmap": ["q", "e", "incl"], # heat_maps, scatter_plots
+    "color": ["q", "e", "incl", "g_r_color", "r_i_color"], # color_plot
+    "ssobject": ["q", "e", "incl", "ssObjectID", "discoverySubmissionDate", "numObs"], # ssobject_plots, discovery_cutoff_counts
+    "counts": ["q", "e", "ssObjectID"], # type_counts, obs_type_counts, obs_unique_obj_counts
+    "observations": ["q", "e", "ssObjectID", "band"], # obs_filter
+    "magnitudes": ["q", "e", "ssObjectID", "magTrueVband", "apFlux", "band"] # data_grouped_mags
+}
+AGGREGATIONS = {"object": [], "band": ["dias.band"]} # aggregate -> extra GROUP BY fields on top of the MPCORB ones
+MAGNITUDE_FIELDS = { # per-observation magnitude in the DiaSource join; dp1 uses calc_magnitude, with NULL for non-positive fluxes
+    "dp03_catalogs_10yr": ("magTrueVband", "dias.magTrueVband"),
+    "dp1": ("apFlux", "CASE WHEN dias.apFlux > 0 THEN -2.5 * LOG10(dias.apFlux) + 31.4 END")
+}
+RETURN_FORMATS = ("pandas", "astropy", "arrow", "numpy-structured")
+Q_BINS_PER_DEX = 20 # resolution of the log10(q) histogram used to balance partitioned queries
+HISTOGRAM_AXES = {"a": Q / (1 - E), "q": Q, "e": E, "incl": INCL} # run_histogram2d axis -> ADQL expression on MPCORB
+CLASSIFY_CHUNK_SIZE = 2 ** 16 # rows classified at a time by classify_orbits
+CATEGORICAL_COLUMNS = ("class_name", "band") # few distinct values repeated on every row; compact_frame stores them as categoricals
+JOB_RETRIES = 4 # retries of each job request after a transient HTTP failure
+JOB_BACKOFF = 1.0 # seconds before the first retry, doubled for each further one
+TRANSIENT_STATUS_CODES = (429, 500, 502, 503, 504)
+POLL_MIN = 0.2 # seconds between the first status polls of a submit_query job
+POLL_MAX = 30.0 # longest wait between polls, reached by jobs running for a few minutes
+POLL_FRACTION = 0.1 # polls wait this fraction of the time the job has run so far, between POLL_MIN and POLL_MAX
+SYNC_ROW_LIMIT = 5000 # queries returning at most this many rows run on the sync endpoint, skipping the async job round trips
+FINAL_PHASES = ("COMPLETED", "ERROR", "ABORTED")
+WATERMARKS = {"ssObjectId": "mpc.ssObjectId", "discoverySubmissionDate": "sso.discoverySubmissionDate"} # refresh_query watermark -> field
+DEFAULT_CUTOFFS = {'q_min': None, 'q_max': None, 'e_min': None, 'e_max': None, 'a_min': None, 'a_max': None, 'tj_min': None, 'tj_max': None}
 ################################################
 
-def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str = None, limit:int = None):
+def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str = None, limit:int = None, columns = None,
+               exclude:list = None, aggregate:str = None):
     """
     Creates an MPCORB table query from the catalog based on either a class_name or cutoffs dict.
     Creates a query from MPCORB 10-year table using the specificed catalog and class name OR cutoffs. Can join the MPCORB table with DiaSource or SSObject.
@@ -33,6 +78,15 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
         join = None (str) (optional): Table to join with MPCORB table. 
             DiaSource, SSObject
         limit (int) (optional): Row limit on query.
+        columns = None (list or str) (optional): Names of the columns to select (e.g. ["q", "e", "incl"]), or the name of a preset in
+            COLUMN_PRESETS (e.g. "heatmap"). Default is all of the standard MPCORB and join columns. Other columns of MPCORB or the joined
+            table are checked against the cached table schema. 'q' and 'e' are always selected since run_query derives 'a' from them.
+        exclude = None (list) (optional): Names of columns to leave out of the selection.
+        aggregate = None (str) (optional): Reduce the DiaSource join server-side (join must be "DiaSource"), returning one row per
+            group with 'obs_count' and the 'mag_min', 'mag_max', 'mag_mean' and 'mag_count' (observations with a magnitude) columns;
+            for dp1 magnitudes are computed from apFlux as in calc_magnitude. Used by data_grouped_mags, obs_filter,
+            obs_unique_obj_counts and type_counts instead of one row per observation.
+            "object" (one row per ssObjectID), "band" (one row per ssObjectID and band)
     Returns:
         query (str): Query string for the specified constraints.
         class_name (str): Name of orbital class. Useful if orbital cutoff parameters provided. 
@@ -46,20 +100,12 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
     if (class_name is not None and cutoffs is not None): # Both class name and cutoffs provided
         raise ValueError("Provide exactly one of: 'class_name', 'cutoffs'.")
 
-    default_cutoffs = {'q_min': None, 'q_max': None, 'e_min': None, 'e_max': None, 'a_min': None, 'a_max': None, 'tj_min': None, 'tj_max': None}
-
-    if catalog == "dp03_catalogs_10yr":
-        service = get_tap_service("ssotap") # 'tap' for DP03
-    elif catalog == "dp1":
-        service = get_tap_service("tap") # 'tap' for DP1
-    else:
+    if catalog not in CATALOG_SERVICES:
         raise ValueError("Please enter a valid catalog.")
 
-    assert service is not None
-
     # Classification #
     if cutoffs is not None: # given parameters, find object type #
-        cutoffs = {**default_cutoffs, **cutoffs} # user inputs cutoffs overlay default cutoffs
+        cutoffs = {**DEFAULT_CUTOFFS, **cutoffs} # user inputs cutoffs overlay default cutoffs
         for class_type, cutoff_dict in ORBITAL_CLASS_CUTOFFS.items(): # each "value" is a dictionary
             match = True
             for parameter, value in cutoff_dict.items(): # Ex: parameter = a_min, value = 50.0
@@ -86,11 +132,81 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
         else:
             raise ValueError("Invalid class_name.")
             
-    cutoffs = {**default_cutoffs, **cutoffs}
+    cutoffs = {**DEFAULT_CUTOFFS, **cutoffs}
 
     
     ### Join ###
     select_fields = ["mpc.incl", "mpc.q", "mpc.e", "mpc.ssObjectID", "mpc.mpcDesignation"]
+    join_clause, join_fields = _join_fields(catalog, join)
+    group_by = None
+    if aggregate is not None:
+        select_fields, group_by = _aggregate_fields(catalog, join, select_fields, join_fields, aggregate, columns, exclude)
+    else:
+        select_fields += join_fields
+        select_fields = _project_fields(catalog, join, select_fields, columns, exclude)
+
+    ### Cutoff conditions ###
+    conditions = _cutoff_conditions(cutoffs)
+
+    ### Writing Query ###
+    query = _write_query(catalog, select_fields, join_clause, " AND ".join(conditions), limit, group_by)
+
+    return query, class_name
+
+
+def make_multiclass_query(catalog:str, classes:list = None, join:str = None, limit:int = None, columns = None, exclude:list = None):
+    """
+    Creates a single MPCORB table query covering several orbital classes, with class membership computed server-side.
+    Rows matching any of the classes are returned once, with a 'class_name' column (the first matching class, in the order given)
+    and an 'is_<class>' 0/1 column per class, so overlapping classes (e.g. Ntrojan within the TNO/Centaur bounds) are not fetched twice.
+    Args:
+        catalog (str): Name of RSP catalog to query.
+        classes = None (list) (optional): Names of orbital classes from ORBITAL_CLASS_CUTOFFS. Default is all classes.
+        join = None (str) (optional): Table to join with MPCORB table. 
+            DiaSource, SSObject
+        limit (int) (optional): Row limit on query.
+        columns = None (list or str) (optional): Names of the columns (or preset) to select, as in make_query.
+        exclude = None (list) (optional): Names of columns to leave out of the selection.
+    Returns:
+        query (str): Query string for the specified classes.
+        classes (list): Names of the orbital classes in the query.
+    """
+    if catalog not in CATALOG_SERVICES:
+        raise ValueError("Please enter a valid catalog.")
+    if classes is None:
+        classes = list(ORBITAL_CLASS_CUTOFFS)
+    if len(classes) == 0:
+        raise ValueError("Please provide at least one class name.")
+    for class_name in classes:
+        if class_name not in ORBITAL_CLASS_CUTOFFS:
+            raise ValueError(f"Invalid class_name: {class_name}.")
+
+    select_fields = ["mpc.incl", "mpc.q", "mpc.e", "mpc.ssObjectID", "mpc.mpcDesignation"]
+    join_clause, join_fields = _join_fields(catalog, join)
+    select_fields += join_fields
+    select_fields = _project_fields(catalog, join, select_fields, columns, exclude)
+
+    # one (AND-ed) membership condition per class
+    class_conditions = {class_name: all_of(*cutoff_conditions(ORBITAL_CLASS_CUTOFFS[class_name])) for class_name in classes}
+
+    # first matching class labels the row; the is_<class> flags keep overlapping memberships
+    label = " ".join(f"WHEN {condition} THEN '{class_name}'" for class_name, condition in class_conditions.items())
+    select_fields.append(f"CASE {label} END AS class_name")
+    for class_name, condition in class_conditions.items():
+        select_fields.append(f"CASE WHEN {condition} THEN 1 ELSE 0 END AS is_{class_name}")
+
+    where = any_of(*class_conditions.values()).to_adql()
+    query = _write_query(catalog, select_fields, join_clause, where, limit)
+
+    return query, list(classes)
+
+
+def _join_fields(catalog, join):
+    """
+    Builds the JOIN clause and the extra select fields for joining MPCORB with DiaSource or SSObject.
+    Only fields present in the table schema (from the schema cache) are selected.
+    """
+    select_fields = []
     join_clause = ""
 
     if join:
@@ -99,9 +215,7 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
             join_clause = f"""
     INNER JOIN {catalog}.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId"""
             try:
-                sso_results = service.search(f"SELECT column_name from TAP_SCHEMA.columns WHERE table_name = '{catalog}.DiaSource'")
-                sso_table = sso_results.to_table().to_pandas()
-                available_fields = sso_table['column_name'].tolist()
+                available_fields = schema_cache.get_columns(catalog, "DiaSource") # TAP_SCHEMA lookup, cached after first use
 
                 if catalog == "dp03_catalogs_10yr":
                     desired_fields = ["dias.magTrueVband", "dias.band"]
@@ -121,9 +235,7 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
             join_clause = f"""
     INNER JOIN {catalog}.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId"""
             try:
-                sso_results = service.search(f"SELECT column_name from TAP_SCHEMA.columns WHERE table_name = '{catalog}.SSObject'")
-                sso_table = sso_results.to_table().to_pandas()
-                available_fields = sso_table['column_name'].tolist()
+                available_fields = schema_cache.get_columns(catalog, "SSObject") # TAP_SCHEMA lookup, cached after first use
 
                 if catalog == "dp03_catalogs_10yr":
                     desired_fields = ["sso.g_H", "sso.r_H", "sso.i_H", "sso.discoverySubmissionDate", "sso.numObs"]
@@ -143,97 +255,1300 @@ def make_query(catalog:str, class_name:str = None, cutoffs:dict = None, join:str
             except Exception as e:
                 print(f"{catalog} query failed, no schema of interest in catalog: {e}")
 
-    ### Cutoff conditions ###
-    conditions = []
-
-    if cutoffs['q_min'] is not None:
-        conditions.append(f"mpc.q > {cutoffs['q_min']}")
-    if cutoffs['q_max'] is not None:
-        conditions.append(f"mpc.q < {cutoffs['q_max']}")
-    if cutoffs['e_min'] is not None:
-        conditions.append(f"mpc.e > {cutoffs['e_min']}")
-    if cutoffs['e_max'] is not None:
-        conditions.append(f"mpc.e < {cutoffs['e_max']}")
-    if cutoffs['a_min'] is not None:
-        conditions.append(f"mpc.q/(1-mpc.e) > {cutoffs['a_min']}")
-    if cutoffs['a_max'] is not None:
-        conditions.append(f"mpc.q/(1-mpc.e) < {cutoffs['a_max']}")
-    if cutoffs['tj_min'] is not None and cutoffs['tj_max'] is not None:
-        conditions.append(f"(mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0")
-        conditions.append(f"(5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN {cutoffs['tj_min']} AND {cutoffs['tj_max']}")
+    return join_clause, select_fields
 
 
-    ### Writing Query ###
+def _aggregate_fields(catalog, join, select_fields, join_fields, aggregate, columns, exclude):
+    """
+    Returns the select fields and GROUP BY fields reducing the DiaSource join to one row per object (or per object and band):
+    the MPCORB fields, observation counts and, if the catalog has them, magnitude statistics.
+    """
+    if aggregate not in AGGREGATIONS:
+        raise ValueError(f"aggregate must be one of {list(AGGREGATIONS)}.")
+    if join != "DiaSource":
+        raise ValueError("Aggregation needs join='DiaSource'.")
+    if columns is not None or exclude is not None:
+        raise ValueError("columns and exclude cannot be used with aggregate.")
+
+    group_by = select_fields + AGGREGATIONS[aggregate]
+    fields = list(group_by) + ["COUNT(*) AS obs_count"]
+    magnitude_column, magnitude = MAGNITUDE_FIELDS[catalog]
+    if f"dias.{magnitude_column}" in join_fields: # only if the schema has it
+        fields += [f"MIN({magnitude}) AS mag_min", f"MAX({magnitude}) AS mag_max", f"AVG({magnitude}) AS mag_mean",
+                   f"COUNT({magnitude}) AS mag_count"]
+    return fields, group_by
+
+
+def _project_fields(catalog, join, select_fields, columns, exclude):
+    """
+    Narrows select_fields to the requested columns (list or COLUMN_PRESETS name) minus exclude. Columns that are not among the
+    standard fields are looked up in the cached schema of MPCORB, then of the joined table.
+    """
+    if columns is None and exclude is None:
+        return select_fields
+
+    standard = {_field_name(field).lower(): field for field in select_fields}
+    if isinstance(columns, str):
+        if columns not in COLUMN_PRESETS:
+            raise ValueError(f"Unknown column preset '{columns}', choose from {list(COLUMN_PRESETS)}.")
+        names = [name for name in COLUMN_PRESETS[columns] if name.lower() in standard] # presets skip what this catalog/join lacks
+    elif columns is None:
+        names = [_field_name(field) for field in select_fields]
+    else:
+        names = list(columns)
+
+    fields = []
+    for name in names:
+        field = standard.get(name.lower()) or _schema_field(catalog, join, name)
+        if field not in fields:
+            fields.append(field)
+
+    for name in exclude or []:
+        if name.lower() in REQUIRED_COLUMNS:
+            raise ValueError(f"Column '{name}' is always selected, it is needed to compute 'a'.")
+        matching = [field for field in fields if _field_name(field).lower() == name.lower()]
+        if len(matching) == 0:
+            raise ValueError(f"Cannot exclude '{name}', it is not selected.")
+        fields.remove(matching[0])
+
+    missing = [standard[name] for name in REQUIRED_COLUMNS if standard[name] not in fields]
+    return missing + fields
+
+
+def _field_name(field):
+    """
+    Returns the output column name of a select field, e.g. 'q' for 'mpc.q' and 'g_r_color' for '(sso.g_H - sso.r_H) AS g_r_color'.
+    """
+    if " AS " in field:
+        return field.rsplit(" AS ", 1)[1].strip()
+    return field.rsplit(".", 1)[-1]
+
+
+def _schema_field(catalog, join, name):
+    """
+    Returns the select field for a non-standard column, checked against the cached schema of MPCORB and then the joined table.
+    """
+    tables = [("MPCORB", "mpc")]
+    if join in JOIN_ALIASES:
+        tables.append((join, JOIN_ALIASES[join]))
+    for table, alias in tables:
+        for column in schema_cache.get_columns(catalog, table):
+            if column.lower() == name.lower():
+                return f"{alias}.{column}"
+    raise ValueError(f"Column '{name}' not found in {' or '.join(f'{catalog}.{table}' for table, _ in tables)}.")
+
+
+def _cutoff_conditions(cutoffs):
+    """
+    Returns the list of ADQL conditions on the MPCORB table (aliased 'mpc') for a cutoffs dict, in the canonical, index-friendly
+    form built by adql.cutoff_conditions.
+    """
+    return [condition.to_adql() for condition in cutoff_conditions({**DEFAULT_CUTOFFS, **cutoffs})]
+
+
+def _write_query(catalog, select_fields, join_clause, where, limit = None, group_by = None):
+    """
+    Assembles the final ADQL query string on the MPCORB table.
+    """
     query_start = f"SELECT {', '.join(select_fields)} FROM {catalog}.MPCORB AS mpc{join_clause}"
     query_WHERE = f"""
     WHERE"""
-    query = query_start + query_WHERE + " " + " AND ".join(conditions)
+    query = query_start + query_WHERE + " " + where
+    if group_by is not None:
+        query = query + f"""
+    GROUP BY {', '.join(group_by)}"""
     if limit is not None:
         query_limit = f"""
     LIMIT """ + str(limit)
         query = query + query_limit
     query = query + ";"
-
-    return query, class_name
-
+    return query
 
 
-def run_query(query_string, class_name, catalog = "dp1", to_pandas = False):
+def run_query(query_string, class_name, catalog = "dp1", to_pandas = False, cache = False, partitions:int = 1, max_jobs:int = 4,
+              return_format:str = None, compact = False, sync_threshold:int = None):
     """
     Function runs SSOtap using query_string. Default returns data in the form of an AstroPy Table. Returns with 'a' and 'class_name' columns.
     Args:
         query_string (str): String representing query to pass to SSOtap.
-        class_name (str): Name of class of objects within query. 
+        class_name (str): Name of class of objects within query. Ignored if the query labels rows itself (make_multiclass_query).
         catalog = "dp1" (str)(optional): String representing which catalog is being queried. 
         to_pandas = False (bool) (optional): Boolean representing whether or not to convert job results to pandas table. Default is an AstroPy table.
+        cache = False (bool or ResultCache) (optional): Reuse results of identical earlier queries stored on local disk. True uses the shared
+            result_cache; a ResultCache instance uses that cache instead.
+        partitions = 1 (int) (optional): Split the query into this many disjoint ranges of mpc.q holding about the same number of rows
+            (from a COUNT preflight) and run them as separate jobs, up to max_jobs at once. The query must not have a LIMIT.
+        max_jobs = 4 (int) (optional): Maximum number of partition jobs running at once.
+        return_format = None (str) (optional): Type of the returned table, overriding to_pandas.
+            "pandas", "astropy", "arrow" (pyarrow Table), "numpy-structured" (structured ndarray)
+        compact = False (bool or str) (optional): Shrink the dtypes of the returned pandas table with compact_frame and report the memory
+            saved. "float32" also stores the orbital elements, fluxes and magnitudes as float32.
+        sync_threshold = None (int) (optional): Run the query on the synchronous endpoint (service.search, one round trip) if it returns
+            at most this many rows, judged from its LIMIT or else, for single-table queries, a COUNT preflight; larger queries and
+            joins without a LIMIT run as async jobs. Default is SYNC_ROW_LIMIT; 0 always runs an async job. Partitioned queries always
+            run as async jobs.
     Returns: 
-        unique_objects: Data table with the job results. 
+        unique_objects: Data table with the job results. Its timing breakdown (QueryMetrics.as_dict()) is attached as
+            table.attrs["metrics"] (pandas), table.meta["metrics"] (astropy) or the b"sso_query.metrics" schema metadata (arrow),
+            and the QueryMetrics are passed to the hooks registered with metrics.add_hook.
     """
-    
-    # getting the Rubin tap service client 
-    if catalog == "dp03_catalogs_10yr":
-        service = get_tap_service("ssotap") # 'tap' for DP03
-    elif catalog == "dp1":
-        service = get_tap_service("tap") # 'tap' for DP1
-    else:
-        raise ValueError("Please enter a valid catalog.")
+    table = _run_query(query_string, class_name, catalog, to_pandas, cache, partitions, max_jobs, return_format, compact,
+                       sync_threshold)
+    if table is None or len(table) == 0:
+        return table
 
-    assert service is not None
+    if isinstance(table, pd.DataFrame):
+        display(table.head(20))  # Show just the first 20 rows
+    elif isinstance(table, pa.Table):
+        print(table.slice(0, 20))
+    else: #AstroPy table or structured array
+        print(table[0:20]) # print first 20 rows 
+    
+    return table
 
-    # running the job
-    job = service.submit_job(query_string)
-    job.run()
-    job.wait(phases=['COMPLETED', 'ERROR'])
-    print('Job phase is', job.phase)
-    if job.phase == 'ERROR':
-        job.raise_if_error()
 
-    assert job.phase == 'COMPLETED'
-    result = job.fetch_result()
+def _run_query(query_string, class_name, catalog, to_pandas, cache, partitions, max_jobs, return_format, compact,
+               sync_threshold = None, handle = None):
+    """
+    Runs a query as in run_query (or a submit_query handle, whose jobs are polled and can be cancelled) and returns the table.
+    """
+    return_format = _resolve_format(to_pandas, return_format)
+    if compact and return_format != "pandas":
+        raise ValueError("compact applies to pandas tables; pass to_pandas=True.")
+    
+    # running the job (or loading its earlier result)
+    metrics = QueryMetrics(query_string, catalog)
+    try:
+        result = _cached_run_job(query_string, catalog, cache, partitions, max_jobs, metrics=metrics, sync_threshold=sync_threshold,
+                                 handle=handle)
+    except Exception:
+        metrics.finish()
+        emit(metrics)
+        raise
 
     # Errors for table #
     # Check if table has no values or is None
     if result is None or len(result) == 0:
         print("ValueError: Results table is empty or None. Check input cutoffs.")
+        metrics.finish(0)
+        emit(metrics)
+        return result
+
+    start = time.perf_counter()
+    table = _format_result(result, class_name, return_format)
+    if compact:
+        table = compact_frame(table, float32=compact == "float32")
+    metrics.convert_seconds = time.perf_counter() - start
+    metrics.finish(len(table))
+    table = _attach_metrics(table, metrics)
+    emit(metrics)
+    return table
+
+
+def run_queries(queries, catalog = "dp1", to_pandas = False, max_jobs:int = 4, cache = False, return_format:str = None,
+                sync_threshold:int = None):
+    """
+    Function runs several queries at once, e.g. one per orbital class. Each query is submitted as its own TAP job
+    and up to max_jobs of them run on the server at the same time, so the total wait is close to that of the slowest query.
+    Args:
+        queries (list): (query_string, class_name) pairs, as returned by make_query.
+        catalog = "dp1" (str)(optional): String representing which catalog is being queried. 
+        to_pandas = False (bool) (optional): Boolean representing whether or not to convert job results to pandas tables. Default is AstroPy tables.
+        max_jobs = 4 (int) (optional): Maximum number of jobs running at once.
+        cache = False (bool or ResultCache) (optional): Reuse results of identical earlier queries stored on local disk, as in run_query.
+        return_format = None (str) (optional): Type of the returned tables, overriding to_pandas, as in run_query.
+        sync_threshold = None (int) (optional): Run each query on the synchronous endpoint if it returns at most this many rows, as in
+            run_query; 0 runs every query as an async job.
+    Returns:
+        results (dict): Data table with the job results for each query, keyed by class_name. Empty results are kept as returned by the service.
+    """
+    return_format = _resolve_format(to_pandas, return_format)
+    class_names = [class_name for _, class_name in queries]
+    if len(set(class_names)) != len(class_names):
+        raise ValueError("Each query needs a unique class_name.")
+    if max_jobs < 1:
+        raise ValueError("max_jobs must be at least 1.")
+    if len(queries) == 0:
+        return {}
+
+    def run_one(query_string, class_name):
+        metrics = QueryMetrics(query_string, catalog)
+        try:
+            result = _cached_run_job(query_string, catalog, cache, metrics=metrics, sync_threshold=sync_threshold)
+            if result is None or len(result) == 0:
+                metrics.finish(0)
+                return result
+            start = time.perf_counter()
+            table = _format_result(result, class_name, return_format)
+            metrics.convert_seconds = time.perf_counter() - start
+            metrics.finish(len(table))
+            return _attach_metrics(table, metrics)
+        finally:
+            if metrics.total_seconds is None: # failed
+                metrics.finish()
+            emit(metrics)
+
+    with ThreadPoolExecutor(max_workers=min(max_jobs, len(queries))) as executor:
+        futures = {class_name: executor.submit(run_one, query_string, class_name) for query_string, class_name in queries}
+        results = {class_name: future.result() for class_name, future in futures.items()}
+
+    for class_name, table in results.items():
+        print(f"{class_name}: {0 if table is None else len(table)} rows")
+    return results
+
+
+def submit_query(query_string, class_name, catalog = "dp1", to_pandas = False, cache = False, partitions:int = 1, max_jobs:int = 4,
+                 return_format:str = None, compact = False, sync_threshold:int = None, progress = None):
+    """
+    Function starts a query in the background and returns at once, so other work (local analysis, further queries) can go on
+    while the TAP job runs. The job's status is polled less and less often as it runs (see POLL_FRACTION).
+    Args:
+        query_string, class_name, catalog, to_pandas, cache, partitions, max_jobs, return_format, compact, sync_threshold: As in
+            run_query. Queries run on the sync endpoint can't be aborted, but are small by construction.
+        progress = None (callable) (optional): Called after every status poll with the job's phase and the seconds since it was
+            submitted, e.g. lambda phase, elapsed: print(phase, elapsed). Called from a background thread.
+    Returns:
+        handle (QueryHandle): Handle with done(), result(timeout) and cancel(). result() returns what run_query would.
+    """
+    if compact and _resolve_format(to_pandas, return_format) != "pandas": # invalid arguments fail here, not in the background
+        raise ValueError("compact applies to pandas tables; pass to_pandas=True.")
+    handle = QueryHandle(query_string, progress)
+    thread = threading.Thread(target=handle._run, args=(_run_query, query_string, class_name, catalog, to_pandas, cache, partitions,
+                                                        max_jobs, return_format, compact, sync_threshold), daemon=True)
+    thread.start()
+    return handle
+
+
+class QueryHandle:
+    """
+    Future-like handle of a query started with submit_query.
+    Args:
+        query_string (str): Query being run.
+        progress = None (callable) (optional): Progress callback, as in submit_query.
+    """
+
+    def __init__(self, query_string:str, progress = None):
+        self.query = query_string
+        self.phase = None # last phase polled
+        self.elapsed = 0.0 # seconds since the job was submitted, at the last poll
+        self._progress = progress
+        self._jobs = []
+        self._done_callbacks = []
+        self._lock = threading.Lock()
+        self._cancel_event = threading.Event()
+        self._done_event = threading.Event()
+        self._result = None
+        self._error = None
+
+    def __repr__(self):
+        state = "cancelled" if self.cancelled() else "done" if self.done() else self.phase or "submitting"
+        return f"<QueryHandle {state}>"
+
+    def done(self):
+        """
+        Returns True once the query has finished, failed or been cancelled.
+        """
+        return self._done_event.is_set()
+
+    def cancelled(self):
+        """
+        Returns True if the query was cancelled.
+        """
+        return self._cancel_event.is_set()
+
+    def result(self, timeout:float = None):
+        """
+        Function waits for the query and returns its table.
+        Args:
+            timeout = None (float) (optional): Seconds to wait. Default waits until the query is done.
+        Returns:
+            table: As returned by run_query.
+        Raises:
+            TimeoutError if the query is still running after timeout, CancelledError if it was cancelled, or the query's own error.
+        """
+        if not self._done_event.wait(timeout):
+            raise TimeoutError(f"Query still running after {timeout} s (phase {self.phase})")
+        if self.cancelled():
+            raise CancelledError("Query was cancelled")
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def cancel(self):
+        """
+        Function cancels the query, aborting its running jobs on the server so they stop holding server slots.
+        Returns:
+            cancelled (bool): False if the query had already finished, else True.
+        """
+        with self._lock:
+            if self.done():
+                return False
+            self._cancel_event.set()
+            jobs = list(self._jobs)
+        for job in jobs:
+            _abort_job(job)
+        self._finish()
+        return True
+
+    def add_done_callback(self, callback):
+        """
+        Function registers callback to be called with the handle once the query is done (at once if it already is).
+        """
+        with self._lock:
+            if not self.done():
+                self._done_callbacks.append(callback)
+                return
+        callback(self)
+
+    def _run(self, function, *args):
+        try:
+            result = function(*args, handle=self)
+            with self._lock:
+                self._result = result
+        except Exception as e:
+            with self._lock:
+                self._error = e
+        self._finish()
+
+    def _finish(self):
+        with self._lock:
+            if self.done():
+                return
+            self._done_event.set()
+            callbacks, self._done_callbacks = self._done_callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                warnings.warn(f"Done callback {callback!r} failed: {e}")
+
+    def _add_job(self, job):
+        with self._lock:
+            self._jobs.append(job)
+            cancelled = self.cancelled()
+        if cancelled: # cancelled between submission and the first poll
+            _abort_job(job)
+
+    def _remove_job(self, job):
+        with self._lock:
+            self._jobs.remove(job)
+
+    def _report(self, phase, elapsed):
+        self.phase = phase
+        self.elapsed = elapsed
+        if self._progress is not None:
+            try:
+                self._progress(phase, elapsed)
+            except Exception as e:
+                warnings.warn(f"Progress callback {self._progress!r} failed: {e}")
+
+
+def _abort_job(job):
+    """
+    Aborts a job on the server (best effort; it may have just finished).
+    """
+    try:
+        job.abort()
+    except Exception:
+        pass
+
+
+def iter_query(query_string, class_name, catalog = "dp1", chunk_size:int = 100000):
+    """
+    Generator that runs query_string in pages of at most chunk_size rows and yields each page as a pandas table with 'a' and
+    'class_name' columns, so only one page is held in memory at a time. Pages are cut on mpc.ssObjectId (keyset pagination), and
+    never split the observations of one object between pages.
+    Args:
+        query_string (str): Query from make_query or make_multiclass_query, without a LIMIT.
+        class_name (str): Name of class of objects within query.
+        catalog = "dp1" (str)(optional): String representing which catalog is being queried. 
+        chunk_size = 100000 (int) (optional): Maximum number of rows fetched per page.
+    Yields:
+        chunk (Pandas dataframe): Next page of job results, in increasing ssObjectId order.
+    """
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1.")
+    if re.search(r"\bLIMIT\b", query_string, flags=re.IGNORECASE):
+        raise ValueError("iter_query sets its own LIMIT per page; build the query without a limit.")
+
+    service = get_service(catalog)
+    after_id = None # ids >= after_id still to fetch
+    while True:
+        result = _run_job(service, _page_query(query_string, f"mpc.ssObjectId >= {after_id}" if after_id is not None else None, chunk_size),
+                          catalog=catalog)
+        if result is None or len(result) == 0:
+            return
+        chunk = _format_result(result, class_name, "pandas")
+        if len(chunk) < chunk_size: # last page
+            yield chunk
+            return
+
+        # the last object in a full page may continue on the next one, so hold its rows back
+        ids = chunk[_id_column(chunk)]
+        last_id = ids.iloc[-1]
+        complete = chunk[ids < last_id]
+        if len(complete) == 0: # one object fills the whole page, fetch all of its rows on their own
+            result = _run_job(service, _page_query(query_string, f"mpc.ssObjectId = {last_id}", None), catalog=catalog)
+            yield _format_result(result, class_name, "pandas")
+            after_id = last_id + 1
+        else:
+            yield complete.reset_index(drop=True)
+            after_id = last_id
+
+
+def refresh_query(query_string, class_name, catalog = "dp1", to_pandas = False, cache = True, watermark:str = None,
+                  return_format:str = None):
+    """
+    Function brings a stored query result up to date by fetching only the rows past its watermark (the largest value of the watermark
+    column seen so far) and merging them in, so the cost of a refresh scales with what changed rather than with the catalog size.
+    The first call runs the whole query. Rows of every ssObjectID in the delta replace the stored rows of that object, so objects
+    fetched again (e.g. at the watermark itself) are never duplicated. With the discoverySubmissionDate watermark, rows without a
+    discovery date (objects known before the survey) are tracked on mpc.ssObjectId instead. Rows changed without moving past the watermark are not picked
+    up; clear the cache entry to pull the whole result again.
+    Args:
+        query_string (str): Query from make_query or make_multiclass_query, without a LIMIT.
+        class_name (str): Name of class of objects within query.
+        catalog = "dp1" (str)(optional): String representing which catalog is being queried. 
+        to_pandas = False (bool) (optional): Boolean representing whether or not to convert job results to pandas table. Default is an AstroPy table.
+        cache = True (bool or ResultCache) (optional): Where the result and its watermark are stored. True uses the shared result_cache.
+            An entry that expires (the cache's ttl) or is evicted is pulled again in full.
+        watermark = None (str) (optional): Column to track, a key of WATERMARKS. Default is "discoverySubmissionDate" for queries
+            joined with SSObject and "ssObjectId" otherwise.
+        return_format = None (str) (optional): Type of the returned table, overriding to_pandas, as in run_query.
+    Returns:
+        table: Data table with the whole refreshed result, with 'a' and 'class_name' columns.
+    """
+    return_format = _resolve_format(to_pandas, return_format)
+    if cache is True:
+        cache = result_cache
+    elif cache is False or cache is None:
+        raise ValueError("refresh_query keeps its result in a ResultCache; pass cache=True or a ResultCache.")
+    if re.search(r"\bLIMIT\b", query_string, flags=re.IGNORECASE):
+        raise ValueError("refresh_query fetches every row past the watermark; build the query without a limit.")
+    if watermark is None:
+        from_clause = _split_query(query_string)[1]
+        watermark = "discoverySubmissionDate" if re.search(r"\bSSObject\b", from_clause) else "ssObjectId"
+    if watermark not in WATERMARKS:
+        raise ValueError(f"watermark must be one of {list(WATERMARKS)}.")
+
+    service = get_service(catalog)
+    stored = cache.get(query_string, catalog)
+    mark = cache.watermark(query_string, catalog) if stored is not None else None
+    if stored is None:
+        merged = _run_job(service, query_string, catalog=catalog)
+        if merged is None or len(merged) == 0:
+            print("ValueError: Results table is empty or None. Check input cutoffs.")
+            return merged
+        merged = _to_dataframe(merged)
+        print(f"Fetched the full result ({len(merged)} rows)")
+    else:
+        if mark is None or mark["column"] != watermark or (watermark != "ssObjectId" and "undated_id" not in mark):
+            mark = _watermark(stored, watermark) # stored by run_query, or tracked on another column
+        condition = _watermark_condition(mark)
+        delta = _run_job(service, _page_query(query_string, condition, None), catalog=catalog)
+        merged = stored
+        if delta is not None and len(delta) > 0:
+            delta = _to_dataframe(delta)
+            id_column = _id_column(stored)
+            kept = stored[~stored[id_column].isin(delta[_id_column(delta)])]
+            merged = pd.concat([kept, delta], ignore_index=True)
+        n_new = len(merged) - len(stored)
+        print(f"Fetched {0 if delta is None else len(delta)} rows past {condition} ({n_new} new rows)")
+
+    cache.put(query_string, catalog, merged, watermark=_watermark(merged, watermark))
+    return _format_result(merged, class_name, return_format)
+
+
+def _watermark(table, watermark):
+    """
+    Returns the refresh watermark of a result table: the largest value of the watermark column ('value') and, for a date watermark,
+    the largest ssObjectID among the rows without a date ('undated_id'), since NULL dates never pass a date comparison.
+    """
+    mark = {"column": watermark, "value": _watermark_value(table, watermark)}
+    if watermark != "ssObjectId":
+        undated = table[_column(table, watermark)].isna()
+        mark["undated_id"] = _watermark_value(table[undated.to_numpy()], "ssObjectId")
+    return mark
+
+
+def _watermark_condition(mark):
+    """
+    Returns the ADQL condition selecting the rows at or past a watermark from _watermark, or None if every row is past it.
+    """
+    field = WATERMARKS[mark["column"]]
+    if mark["column"] == "ssObjectId":
+        return None if mark["value"] is None else f"{field} >= {mark['value']!r}"
+    dated = f"{field} IS NOT NULL" if mark["value"] is None else f"{field} >= {mark['value']!r}"
+    undated = f"{field} IS NULL"
+    if mark["undated_id"] is not None:
+        undated = f"({undated} AND {WATERMARKS['ssObjectId']} >= {mark['undated_id']!r})"
+    return f"({dated} OR {undated})"
+
+
+def _watermark_value(table, watermark):
+    """
+    Returns the largest value of the watermark column in a result table as a plain Python number, or None if it has no values.
+    """
+    value = table[_column(table, watermark)].max()
+    return None if pd.isna(value) else value.item() if hasattr(value, "item") else value
+
+
+def _column(table, name):
+    """
+    Returns the column of a result table matching name case-insensitively (the services differ in ssObjectId / ssObjectID).
+    """
+    for column in table.columns:
+        if column.lower() == name.lower():
+            return column
+    raise KeyError(f"No '{name}' column to track. Select it in the query to refresh it incrementally.")
+
+
+def run_histogram2d(catalog:str, class_name:str = None, x:str = "a", y:str = "e", bins = 200, range = None, cutoffs:dict = None,
+                    cache = False):
+    """
+    Function counts the objects of a class in a 2D grid of bins server-side (an ADQL FLOOR((expr - lo) / width) GROUP BY query), so
+    only one row per non-empty bin is transferred instead of one per object. Counts follow numpy.histogram2d: bins are half-open
+    except the last one along each axis, and objects outside the range are left out.
+    Args:
+        catalog (str): Name of RSP catalog to query.
+        class_name = None (str) (optional): Name of orbital class.
+        x = "a" (str) (optional): Quantity along the first axis, a key of HISTOGRAM_AXES.
+            a, q, e, incl
+        y = "e" (str) (optional): Quantity along the second axis, a key of HISTOGRAM_AXES.
+        bins = 200 (int or [int, int]) (optional): Number of bins along both axes, or along x and y. Must be positive.
+        range = None ([[xmin, xmax], [ymin, ymax]]) (optional): Limits of the grid, each max above its min. Default is the full extent
+            of the class, from a MIN/MAX query run first; an axis on which every object has the same value is widened by 0.5 on
+            either side, as in numpy.histogram2d.
+        cutoffs = None (dict) (optional): Orbital constraints to use instead of class_name, as in make_query.
+        cache = False (bool or ResultCache) (optional): Reuse the counts of an identical earlier query stored on local disk, as in run_query.
+    Returns:
+        counts (ndarray): Number of objects per bin, of shape (x bins, y bins).
+        x_edges (ndarray): Bin edges along x.
+        y_edges (ndarray): Bin edges along y.
+    """
+    for axis in (x, y):
+        if axis not in HISTOGRAM_AXES:
+            raise ValueError(f"Histogram axes must be among {list(HISTOGRAM_AXES)}.")
+    x_bins, y_bins = (bins, bins) if np.ndim(bins) == 0 else bins
+    if int(x_bins) < 1 or int(y_bins) < 1:
+        raise ValueError("bins must be positive.")
+    query_string, class_name = make_query(catalog, class_name = class_name, cutoffs = cutoffs)
+    _, from_clause, where, _ = _split_query(query_string)
+    x_expr, y_expr = HISTOGRAM_AXES[x], HISTOGRAM_AXES[y]
+
+    if range is None:
+        range = _histogram_range(catalog, from_clause, where, x_expr, y_expr)
+    (x_min, x_max), (y_min, y_max) = range
+    if not (x_max > x_min and y_max > y_min):
+        raise ValueError("Each axis of range needs its max above its min.")
+    x_edges = np.linspace(x_min, x_max, int(x_bins) + 1)
+    y_edges = np.linspace(y_min, y_max, int(y_bins) + 1)
+
+    x_bin = Function("FLOOR", ((x_expr - float(x_min)) / ((float(x_max) - float(x_min)) / int(x_bins)),))
+    y_bin = Function("FLOOR", ((y_expr - float(y_min)) / ((float(y_max) - float(y_min)) / int(y_bins)),))
+    in_range = all_of(x_expr >= float(x_min), x_expr <= float(x_max), y_expr >= float(y_min), y_expr <= float(y_max))
+    histogram_query = f"""SELECT {x_bin} AS x_bin, {y_bin} AS y_bin, COUNT(*) AS n FROM {from_clause}
+    WHERE ({where}) AND {in_range}
+    GROUP BY {x_bin}, {y_bin};"""
+
+    counts = np.zeros((int(x_bins), int(y_bins)), dtype=np.int64)
+    result = _cached_run_job(histogram_query, catalog, cache)
+    if result is not None and len(result) > 0:
+        table = _to_dataframe(result)
+        # values exactly at the upper limit fall in the last bin, as in numpy.histogram2d
+        x_index = np.clip(table['x_bin'].to_numpy(dtype=np.int64), 0, int(x_bins) - 1)
+        y_index = np.clip(table['y_bin'].to_numpy(dtype=np.int64), 0, int(y_bins) - 1)
+        np.add.at(counts, (x_index, y_index), table['n'].to_numpy(dtype=np.int64))
+    print(f"{class_name}: {counts.sum()} objects in {np.count_nonzero(counts)} bins")
+    return counts, x_edges, y_edges
+
+
+def _histogram_range(catalog, from_clause, where, x_expr, y_expr):
+    """
+    Returns [[xmin, xmax], [ymin, ymax]] of the rows matching where, from one synchronous MIN/MAX query. An axis without spread is
+    widened to [value - 0.5, value + 0.5], as in numpy.histogram2d.
+    """
+    range_query = f"""SELECT MIN({x_expr}) AS x_min, MAX({x_expr}) AS x_max, MIN({y_expr}) AS y_min, MAX({y_expr}) AS y_max FROM {from_clause}
+    WHERE {where};"""
+    limits = _to_dataframe(get_service(catalog).search(range_query)).iloc[0]
+    if limits.isna().any():
+        raise ValueError("No objects match the query, so there is no range to bin. Check input cutoffs.")
+    limits = [[float(limits['x_min']), float(limits['x_max'])], [float(limits['y_min']), float(limits['y_max'])]]
+    for axis in limits:
+        if axis[0] == axis[1]:
+            axis[0], axis[1] = axis[0] - 0.5, axis[1] + 0.5
+    return limits
+
+
+def _page_query(query_string, page_condition, limit):
+    """
+    Rewrites a make_query query to add page_condition to its WHERE clause, order by mpc.ssObjectId and apply limit.
+    """
+    select, from_clause, where, group_by = _split_query(query_string)
+    conditions = [f"({where})"] if where is not None else []
+    if page_condition is not None:
+        conditions.append(page_condition)
+
+    query = f"SELECT {select} FROM {from_clause}"
+    if conditions:
+        query += """
+    WHERE """ + " AND ".join(conditions)
+    if group_by is not None:
+        query += """
+    GROUP BY """ + group_by
+    query += """
+    ORDER BY mpc.ssObjectId"""
+    if limit is not None:
+        query += """
+    LIMIT """ + str(limit)
+    return query + ";"
+
+
+def _split_query(query_string):
+    """
+    Splits a make_query query into its select list, FROM clause (including any join), WHERE condition and GROUP BY clause
+    (None if there is none).
+    """
+    query = query_string.strip().rstrip(";")
+    match = re.match(r"SELECT\s+(.*?)\s+FROM\s+(.*)", query, flags=re.IGNORECASE | re.DOTALL)
+    if match is None:
+        raise ValueError("Query must be of the form 'SELECT ... FROM ...'.")
+    select, rest = match.groups()
+    rest, *group_by = re.split(r"\s+GROUP\s+BY\s+", rest, maxsplit=1, flags=re.IGNORECASE)
+    parts = re.split(r"\s+WHERE\s+", rest, maxsplit=1, flags=re.IGNORECASE)
+    return select, parts[0], parts[1] if len(parts) == 2 else None, group_by[0] if group_by else None
+
+
+def _run_partitioned(service, query_string, partitions, max_jobs, metrics = None, catalog = None, handle = None):
+    """
+    Runs query_string as up to `partitions` jobs over disjoint mpc.q ranges of about equal row counts and returns the merged result.
+    Boundaries come from a histogram of log10(q) computed server-side (one synchronous COUNT query).
+    """
+    if re.search(r"\bLIMIT\b", query_string, flags=re.IGNORECASE):
+        raise ValueError("Partitioned queries cannot have a LIMIT.")
+    if max_jobs < 1:
+        raise ValueError("max_jobs must be at least 1.")
+    select, from_clause, where, group_by = _split_query(query_string)
+    conditions = [f"({where})"] if where is not None else []
+
+    # preflight: row counts per log10(q) bin
+    q_bin = f"FLOOR({Q_BINS_PER_DEX} * LOG10(mpc.q))"
+    count_query = f"SELECT {q_bin} AS q_bin, COUNT(*) AS n FROM {from_clause}"
+    if conditions:
+        count_query += """
+    WHERE """ + " AND ".join(conditions)
+    count_query += f"""
+    GROUP BY {q_bin};"""
+    counts = service.search(count_query).to_table().to_pandas()
+    edges = _partition_edges(counts['q_bin'], counts['n'], partitions)
+    print(f"Running {len(edges) + 1} partitions on mpc.q, boundaries: {edges}")
+
+    bounds = [None] + edges + [None]
+    partition_queries = []
+    for low, high in zip(bounds[:-1], bounds[1:]):
+        partition_conditions = list(conditions)
+        if low is not None:
+            partition_conditions.append(f"mpc.q >= {low}")
+        if high is not None:
+            # the lowest partition also takes rows without a q, so no row is lost
+            partition_conditions.append(f"mpc.q < {high}" if low is not None else f"(mpc.q < {high} OR mpc.q IS NULL)")
+        query = f"SELECT {select} FROM {from_clause}"
+        if partition_conditions:
+            query += """
+    WHERE """ + " AND ".join(partition_conditions)
+        if group_by is not None: # groups never straddle partitions, since mpc.q is one of the grouped fields
+            query += """
+    GROUP BY """ + group_by
+        partition_queries.append(query + ";")
+
+    with ThreadPoolExecutor(max_workers=min(max_jobs, len(partition_queries))) as executor:
+        results = list(executor.map(lambda query: _run_job(service, query, metrics, catalog, handle), partition_queries))
+
+    frames = [_to_dataframe(result) for result in results if result is not None and len(result) > 0]
+    if len(frames) == 0:
+        return None
+    return pd.concat(frames, ignore_index=True)
+
+
+def _partition_edges(q_bins, counts, partitions):
+    """
+    Returns the mpc.q boundaries (bin edges of the log10(q) histogram) splitting the rows into `partitions` groups of about
+    equal size. Fewer boundaries are returned if the histogram is too coarse to split further.
+    """
+    order = np.argsort(np.asarray(q_bins, dtype=float))
+    q_bins = np.asarray(q_bins, dtype=float)[order]
+    cumulative = np.cumsum(np.asarray(counts, dtype=float)[order])
+    if len(cumulative) == 0:
+        return []
+
+    edges = []
+    targets = cumulative[-1] * np.arange(1, partitions) / partitions
+    for index in np.searchsorted(cumulative, targets):
+        if index >= len(q_bins) - 1: # no rows left above this edge
+            continue
+        edge = float(10 ** ((q_bins[index] + 1) / Q_BINS_PER_DEX))
+        if edge not in edges:
+            edges.append(edge)
+    return edges
+
+
+def _id_column(table):
+    """
+    Returns the name of the ssObjectId column of a result table (the case depends on how it was selected).
+    """
+    for column in table.columns:
+        if column.lower() == "ssobjectid":
+            return column
+    raise KeyError("No 'ssObjectID' column. Check query fields.")
+
+
+def _cached_run_job(query_string, catalog, cache, partitions = 1, max_jobs = 4, metrics = None, sync_threshold = None, handle = None):
+    """
+    Returns the raw result for query_string, from the result cache if enabled and fresh, otherwise by running the query (on the
+    sync endpoint if it is small, see _use_sync, else as a job split into partitions if asked) and storing a non-empty result
+    in the cache. Jobs are recorded in metrics if given.
+    """
+    if cache is True:
+        cache = result_cache
+    elif cache is False:
+        cache = None
+
+    if cache is not None:
+        result = cache.get(query_string, catalog)
+        if result is not None:
+            print('Loaded result from cache')
+            if metrics is not None:
+                metrics.cache_hit = True
+            return result
+
+    service = get_service(catalog)
+    result = None
+    if partitions > 1:
+        result = _run_partitioned(service, query_string, partitions, max_jobs, metrics, catalog, handle)
+    elif _use_sync(service, query_string, sync_threshold):
+        result = _run_sync(service, query_string, metrics, catalog)
+    if result is None and partitions <= 1: # async path, or a sync result cut short by the service's row limit
+        result = _run_job(service, query_string, metrics, catalog, handle)
+    if cache is not None and result is not None and len(result) > 0:
+        result = _to_dataframe(result)
+        cache.put(query_string, catalog, result)
+    return result
+
+
+def _use_sync(service, query_string, sync_threshold = None):
+    """
+    True if query_string is expected to return at most sync_threshold rows (default SYNC_ROW_LIMIT) and so should skip the async job.
+    The expected size is the query's LIMIT (or TOP) if that is small enough, else a COUNT(*) preflight of its FROM and WHERE
+    clauses on the sync endpoint. The preflight is only run for single-table queries: for a join it would cost the server a second
+    full scan before the job. Joins without a small LIMIT, GROUP BY queries (whose groups can't be counted that way) and failed
+    preflights go async.
+    """
+    threshold = SYNC_ROW_LIMIT if sync_threshold is None else sync_threshold
+    if threshold <= 0:
+        return False
+    limit = re.search(r"\bLIMIT\s+(\d+)\s*;?\s*$", query_string, flags=re.IGNORECASE) or \
+        re.match(r"\s*SELECT\s+TOP\s+(\d+)", query_string, flags=re.IGNORECASE)
+    if limit is not None and int(limit.group(1)) <= threshold:
+        return True
+    try:
+        select, from_clause, where, group_by = _split_query(query_string)
+    except ValueError:
+        return False
+    if group_by is not None or re.search(r"\bJOIN\b", from_clause, flags=re.IGNORECASE):
+        return False
+
+    count_query = f"SELECT COUNT(*) AS n FROM {from_clause}"
+    if where is not None:
+        count_query += """
+    WHERE """ + where
+    try:
+        rows = int(_to_dataframe(_with_retries(lambda: service.search(count_query + ";"))).iloc[0, 0])
+    except Exception: # the preflight only picks the faster path, so any failure just falls back to the async job
+        return False
+    print(f"Query returns {rows} rows, running it {'synchronously' if rows <= threshold else 'as an async job'}")
+    return rows <= threshold
+
+
+def _run_sync(service, query_string, metrics = None, catalog:str = None):
+    """
+    Runs query_string on the sync endpoint (service.search) and returns the raw result table, or None if the service cut the result
+    short at its row limit (VOTable QUERY_STATUS OVERFLOW), in which case the query has to run as an async job instead.
+    The request is recorded in metrics.jobs as a JobMetrics with sync=True, as in _run_job.
+    """
+    record = JobMetrics(query_string, sync=True)
+    try:
+        record.timestamps["submitted"] = time.time()
+        result = _with_retries(lambda: service.search(query_string))
+        record.timestamps["fetched"] = time.time()
+        record.download_seconds = record.timestamps["fetched"] - record.timestamps["submitted"]
+        status = getattr(result, "status", None)
+        if status is not None and str(status[0]).lower() == "overflow":
+            record.phase = "OVERFLOW"
+            print("Sync result hit the service's row limit, running the query as an async job")
+            return None
+        record.phase = "COMPLETED"
+        record.rows = len(result)
         return result
+    except Exception as e:
+        record.phase = "ERROR"
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if metrics is not None:
+            metrics.jobs.append(record)
+        else:
+            job_metrics = QueryMetrics(query_string, catalog, jobs=[record])
+            job_metrics.finish()
+            emit(job_metrics)
+
+
+def _run_job(service, query_string, metrics = None, catalog:str = None, handle = None):
+    """
+    Submits query_string as an async TAP job, waits for it to finish and returns the raw result table.
+    With a catalog, the URL of a job on a remote service is kept in job_journal until its result is fetched, and a later call with the
+    same query (e.g. after the kernel died) reattaches to that job if it is still pending, queued, executing or completed on the
+    server and no live caller is waiting on it (see JobJournal.owner_alive), instead of paying for it again. Transient HTTP failures are retried with exponential backoff, and finished jobs are
+    deleted from the server once their result (or error) has been read.
+    With a QueryHandle, the job's status is polled (see _poll_job) instead of waited on, so the handle can report and cancel it.
+    The job's lifecycle is recorded as a JobMetrics in metrics.jobs; without metrics it is reported to the hooks on its own.
+    """
+    record = JobMetrics(query_string)
+    try:
+        job = _reattach_journaled(service, query_string, catalog, record) if catalog is not None else None
+        if job is None:
+            record.timestamps["submitted"] = time.time()
+            job = _with_retries(lambda: service.submit_job(query_string))
+            record.job_url = getattr(job, "url", None)
+            if catalog is not None and _is_remote(record.job_url):
+                job_journal.record(query_string, catalog, record.job_url)
+            _with_retries(job.run)
+            record.timestamps["run"] = time.time()
+        if handle is not None:
+            record.phase = _poll_job(job, record, handle)
+        else:
+            _with_retries(lambda: job.wait(phases=['COMPLETED', 'ERROR']))
+            record.phase = _with_retries(lambda: job.phase)
+        record.timestamps["completed"] = time.time()
+        print('Job phase is', record.phase)
+        _server_times(job, record)
+        if record.phase == 'ABORTED' or (handle is not None and handle.cancelled()):
+            _forget_job(job, query_string, catalog)
+            raise CancelledError(f"Job {record.job_url} was aborted")
+        if record.phase == 'ERROR':
+            try:
+                job.raise_if_error()
+            finally:
+                _forget_job(job, query_string, catalog)
+
+        assert record.phase == 'COMPLETED'
+        result = _with_retries(lambda: _fetch_result(job, record))
+        record.timestamps["fetched"] = time.time()
+        record.rows = len(result)
+        _forget_job(job, query_string, catalog)
+        return result
+    except Exception as e:
+        record.error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        if record.job_url is not None:
+            job_journal.release(record.job_url)
+        if metrics is not None:
+            metrics.jobs.append(record)
+        else:
+            job_metrics = QueryMetrics(query_string, catalog, jobs=[record])
+            job_metrics.finish()
+            emit(job_metrics)
+
+
+def _poll_job(job, record, handle):
+    """
+    Polls the phase of a running job until it is final and returns that phase. The wait between polls grows with the time the job
+    has run (POLL_FRACTION of it, between POLL_MIN and POLL_MAX), so short jobs finish with little latency while long ones cost few
+    requests. The handle's progress callback sees every poll, and cancelling the handle ends the wait at once.
+    """
+    handle._add_job(job)
+    start = record.timestamps.get("submitted", time.time())
+    try:
+        while True:
+            phase = _with_retries(lambda: job.phase)
+            elapsed = time.time() - start
+            handle._report(phase, elapsed)
+            if phase in FINAL_PHASES:
+                return phase
+            if handle._cancel_event.wait(_poll_interval(elapsed)):
+                return "ABORTED"
+    finally:
+        handle._remove_job(job)
+
+
+def _poll_interval(elapsed):
+    """
+    Returns the seconds to wait before the next status poll of a job that has run for elapsed seconds.
+    """
+    return min(max(POLL_FRACTION * elapsed, POLL_MIN), POLL_MAX)
+
+
+def _reattach_journaled(service, query_string, catalog, record):
+    """
+    Returns the journaled job of a query if it can still deliver a result (running it if it was never started), else None,
+    dropping journal entries of jobs that failed, were aborted or no longer exist. Jobs another live caller is waiting on are left
+    alone, and a reattached job is journaled as owned by this process.
+    """
+    entry = job_journal.get(query_string, catalog)
+    if entry is None or job_journal.owner_alive(entry):
+        return None
+    try:
+        job = _reattach_job(service, entry["url"])
+        phase = _with_retries(lambda: job.phase)
+    except Exception: # destroyed on the server, or the journal is from another account
+        job_journal.remove(query_string, catalog, url=entry["url"])
+        return None
+    if phase not in ("PENDING", "QUEUED", "EXECUTING", "COMPLETED"):
+        _forget_job(job, query_string, catalog)
+        return None
+
+    print(f"Reattached to job {entry['url']} (phase {phase})")
+    job_journal.record(query_string, catalog, entry["url"], submitted=entry["submitted"])
+    record.job_url = entry["url"]
+    record.reattached = True
+    record.timestamps["submitted"] = entry["submitted"]
+    if phase == "PENDING":
+        _with_retries(job.run)
+        record.timestamps["run"] = time.time()
+    return job
+
+
+def _reattach_job(service, url):
+    """
+    Returns a client for the existing async job at url, using the service's authenticated session.
+    """
+    return AsyncTAPJob(url, session=getattr(service, "_session", None))
 
 
-    # turning results into pandas table
+def _forget_job(job, query_string, catalog):
+    """
+    Removes a job from the journal (unless the entry is already for another caller's job) and deletes it from the server (best
+    effort; the server destroys it eventually anyway).
+    """
+    if catalog is not None:
+        job_journal.remove(query_string, catalog, url=getattr(job, "url", None))
+    delete = getattr(job, "delete", None)
+    if delete is not None:
+        try:
+            delete()
+        except Exception:
+            pass
+
+
+def _is_remote(url):
+    """
+    True for job URLs on an HTTP service; jobs of in-process stand-ins (LocalTAPService) end with the process, so aren't journaled.
+    """
+    return url is not None and url.startswith(("http://", "https://"))
+
+
+def _is_transient(error):
+    """
+    True if an exception (or the exception it wraps) is a connection error, a timeout or an HTTP status in TRANSIENT_STATUS_CODES.
+    """
+    while error is not None:
+        if isinstance(error, (requests.ConnectionError, requests.Timeout)):
+            return True
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in TRANSIENT_STATUS_CODES
+        if isinstance(error, DALServiceError) and error.code in TRANSIENT_STATUS_CODES:
+            return True
+        error = getattr(error, "cause", None) or error.__cause__
+    return False
+
+
+def _with_retries(call):
+    """
+    Returns call(), retrying up to JOB_RETRIES times after transient failures with exponential backoff (JOB_BACKOFF, doubled each
+    time, with jitter so parallel jobs don't retry in lockstep).
+    """
+    for attempt in range(JOB_RETRIES + 1):
+        try:
+            return call()
+        except Exception as e:
+            if attempt == JOB_RETRIES or not _is_transient(e):
+                raise
+            delay = JOB_BACKOFF * 2 ** attempt * random.uniform(1.0, 1.5)
+            print(f"Transient error ({e}), retrying in {delay:.1f} s")
+            time.sleep(delay)
+
+
+def cleanup_jobs(max_age:float = JOB_JOURNAL_TTL):
+    """
+    Function deletes the journaled jobs submitted more than max_age seconds ago from the server and the journal. These are jobs whose
+    query was abandoned (never run again after the kernel or worker died), which would otherwise hold server storage until destroyed.
+    Args:
+        max_age = JOB_JOURNAL_TTL (float) (optional): Age in seconds past which a job counts as abandoned. 0 removes every job that
+            no live caller is waiting on.
+    Returns:
+        removed (int): Number of journal entries removed.
+    """
+    removed = 0
+    for key, entry in job_journal.entries().items():
+        if time.time() - entry["submitted"] < max_age or job_journal.owner_alive(entry):
+            continue
+        try:
+            _reattach_job(get_service(entry["catalog"]), entry["url"]).delete()
+        except Exception: # already destroyed on the server
+            pass
+        job_journal.remove(key=key)
+        removed += 1
+    print(f"Removed {removed} abandoned job(s)")
+    return removed
+
+
+def _server_times(job, record):
+    """
+    Copies the UWS creation, start and end times of a finished job into record.timestamps, where the server reports them.
+    """
+    summary = getattr(job, "job", None)
+    for name, attribute in (("created", "creationtime"), ("started", "starttime"), ("ended", "endtime")):
+        value = epoch_seconds(getattr(summary, attribute, None))
+        if value is not None:
+            record.timestamps[name] = value
+
+
+class _CountingReader:
+    """
+    Wraps a read function, counting the bytes it returns and the time spent in it.
+    """
+
+    def __init__(self, read):
+        self._read = read
+        self.bytes = 0
+        self.seconds = 0.0
+
+    def read(self, *args, **kwargs):
+        start = time.perf_counter()
+        data = self._read(*args, **kwargs)
+        self.seconds += time.perf_counter() - start
+        self.bytes += len(data)
+        return data
+
+
+def _fetch_result(job, record):
+    """
+    Fetches the result of a completed job. For pyvo jobs the VOTable is streamed into the parser as in AsyncTAPJob.fetch_result,
+    timing the download (reads from the connection) apart from the parsing and counting the bytes; other clients just fetch it.
+    """
+    result_uri = job.result_uri if isinstance(job, AsyncTAPJob) else None
+    start = time.perf_counter()
+    if result_uri is None:
+        result = job.fetch_result()
+        record.download_seconds = time.perf_counter() - start
+        return result
+
+    session = job._session
+    response = session.get(result_uri, stream=True)
+    response.raise_for_status()
+    reader = _CountingReader(partial(response.raw.read, decode_content=True))
+    result = TAPResults(votableparse(reader.read), url=result_uri, session=session)
+    record.bytes = reader.bytes
+    record.download_seconds = reader.seconds
+    record.parse_seconds = time.perf_counter() - start - reader.seconds
+    return result
+
+
+def _attach_metrics(table, metrics):
+    """
+    Attaches metrics.as_dict() to a returned table (pandas attrs, astropy meta or Arrow schema metadata) and returns the table.
+    """
+    values = metrics.as_dict()
+    if isinstance(table, pd.DataFrame):
+        table.attrs["metrics"] = values
+    elif isinstance(table, Table):
+        table.meta["metrics"] = values
+    elif isinstance(table, pa.Table):
+        table = table.replace_schema_metadata({**(table.schema.metadata or {}), b"sso_query.metrics": json.dumps(values)})
+    return table
+
+
+def _resolve_format(to_pandas, return_format):
+    """
+    Returns the output table type for run_query: return_format if given, otherwise "pandas" or "astropy" from to_pandas.
+    """
+    if return_format is None:
+        return "pandas" if to_pandas else "astropy"
+    if return_format not in RETURN_FORMATS:
+        raise ValueError(f"return_format must be one of {RETURN_FORMATS}.")
+    return return_format
+
+
+def _format_result(result, class_name, return_format):
+    """
+    Converts a raw job result (TAP results, astropy Table or pandas DataFrame) into the returned data table, adding the 'a' and
+    'class_name' columns. Columns are handed to pandas or Arrow as views of the fetched arrays where possible, instead of being
+    copied through intermediate tables.
+    """
+    if isinstance(result, pd.DataFrame):
+        if return_format == "pandas":
+            table = result
+        elif return_format == "arrow":
+            table = pa.Table.from_pandas(result, preserve_index=False)
+        else:
+            table = Table.from_pandas(result)
+    else:
+        table = result.to_table() if hasattr(result, "to_table") else result # astropy Table, columns are views of the VOTable arrays
+        if return_format == "pandas":
+            table = _astropy_to_pandas(table)
+        elif return_format == "arrow":
+            table = _astropy_to_arrow(table)
+
     # adding 'a' and 'class_name' columns
-    table = pd.DataFrame(result)
-    a = calc_semimajor_axis(table['q'], table['e'])
-    table['a'] = a
-    table['class_name'] = class_name
+    if return_format == "arrow":
+        a = calc_semimajor_axis(table['q'].to_numpy(zero_copy_only=False), table['e'].to_numpy(zero_copy_only=False))
+        table = table.append_column('a', pa.array(a))
+        if 'class_name' not in table.column_names: # multi-class queries label their rows server-side
+            table = table.append_column('class_name', pa.array([class_name] * len(table), type=pa.string()))
+        return table
 
-    if to_pandas is False: #AstroPy table
-        table = Table.from_pandas(table)
-        print(table[0:20]) # print first 20 rows 
-    else: #pandas table
-        display(table.head(20))  # Show just the first 20 rows
-    
+    table['a'] = calc_semimajor_axis(table['q'], table['e'])
+    if 'class_name' not in table.columns: # multi-class queries label their rows server-side
+        table['class_name'] = class_name
+    if return_format == "numpy-structured":
+        table = table.as_array()
     return table
 
 
+def compact_frame(df, float32:bool = False, report:bool = True):
+    """
+    Function returns a copy of a result table with smaller dtypes: CATEGORICAL_COLUMNS become categoricals, other string columns
+    (e.g. 'mpcDesignation') Arrow-backed strings, and integer columns (IDs, counts) the smallest integer type holding their values.
+    Args:
+        df (Pandas dataframe): Result table, e.g. from run_query(..., to_pandas=True).
+        float32 = False (bool) (optional): Also store float columns as float32 (about 7 significant digits), except times
+            (columns named like '*Mjd*' or '*Date*'), which need float64 to resolve seconds.
+        report = True (bool) (optional): Print the memory used before and after.
+    Returns:
+        compact (Pandas dataframe): Table with the same values in compact dtypes.
+    """
+    columns = {}
+    for name, column in df.items():
+        if isinstance(column.dtype, pd.CategoricalDtype):
+            columns[name] = column
+        elif name in CATEGORICAL_COLUMNS:
+            columns[name] = column.astype("category")
+        elif column.dtype == object and pd.api.types.infer_dtype(column, skipna=True) == "string": # str columns are Arrow-backed already
+            columns[name] = column.astype(pd.StringDtype("pyarrow"))
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            columns[name] = pd.to_numeric(column, downcast="integer")
+        elif float32 and pd.api.types.is_float_dtype(column.dtype) and not re.search(r"mjd|date", name, flags=re.IGNORECASE):
+            columns[name] = column.astype(np.float32)
+        else:
+            columns[name] = column
+    compact = pd.DataFrame(columns, index=df.index)
+
+    if report:
+        before, after = df.memory_usage(deep=True).sum(), compact.memory_usage(deep=True).sum()
+        print(f"Compact dtypes: {before / 1e6:.1f} MB -> {after / 1e6:.1f} MB ({before / max(after, 1):.1f}x smaller)")
+    return compact
+
+
+def _to_dataframe(result):
+    """
+    Returns a raw job result (TAP results or astropy Table) as a pandas DataFrame, leaving DataFrames as they are.
+    """
+    if isinstance(result, pd.DataFrame):
+        return result
+    return _astropy_to_pandas(result.to_table() if hasattr(result, "to_table") else result)
+
+
+def _astropy_columns(table):
+    """
+    Yields (name, data, mask) for each column of an astropy Table, where data is a view of the column values and mask is None
+    unless some entries are masked.
+    """
+    for name in table.colnames:
+        column = table[name].data
+        mask = None
+        if isinstance(column, np.ma.MaskedArray):
+            mask = np.ma.getmaskarray(column)
+            column = column.data
+            if not mask.any():
+                mask = None
+        if column.dtype.kind == "S":
+            column = np.char.decode(column, "utf-8")
+        yield name, column, mask
+
+
+def _astropy_to_pandas(table):
+    """
+    Builds a pandas DataFrame from an astropy Table without copying unmasked numeric columns. Masked floats become NaN and
+    masked integers use pandas' nullable integer type.
+    """
+    columns = {}
+    for name, data, mask in _astropy_columns(table):
+        if mask is None:
+            columns[name] = data
+        elif data.dtype.kind in "iu":
+            columns[name] = pd.arrays.IntegerArray(data, mask)
+        elif data.dtype.kind == "f":
+            columns[name] = np.where(mask, np.nan, data)
+        else:
+            columns[name] = pd.Series(data).mask(mask)
+    return pd.DataFrame(columns, copy=False)
+
+
+def _astropy_to_arrow(table):
+    """
+    Builds an Arrow table from an astropy Table. Numeric column buffers are shared rather than copied; masked entries become nulls.
+    """
+    arrays = [pa.array(data, mask=mask) for _, data, mask in _astropy_columns(table)]
+    return pa.Table.from_arrays(arrays, names=table.colnames)
+
+
+def classify_orbits(q, e, incl = None, classes:list = None):
+    """
+    Classifies orbits client-side against every class in ORBITAL_CLASS_CUTOFFS at once, with the same conditions (and the same
+    first-match labelling) as make_multiclass_query, so a broad MPCORB slice can be fetched once and labelled locally.
+    Args:
+        q (ndarray): Distance at perihelion, in au.
+        e (ndarray): Orbital eccentricity.
+        incl = None (ndarray) (optional): Inclination, in degrees. Needed for the Tisserand (JFC) condition.
+        classes = None (list) (optional): Names of orbital classes from ORBITAL_CLASS_CUTOFFS, in order of precedence. Default is all classes.
+    Returns:
+        labels (Pandas categorical): First matching class of each orbit (NaN if it matches none).
+        membership (ndarray): Bitmask of every matching class; bit i is set when the orbit is in classes[i].
+    """
+    if classes is None:
+        classes = list(ORBITAL_CLASS_CUTOFFS)
+    for class_name in classes:
+        if class_name not in ORBITAL_CLASS_CUTOFFS:
+            raise ValueError(f"Invalid class_name: {class_name}.")
+    uses_tisserand = any(ORBITAL_CLASS_CUTOFFS[class_name].get("tj_min") is not None for class_name in classes)
+    if uses_tisserand and incl is None:
+        raise ValueError("'incl' is needed to classify JFCs (Tisserand parameter).")
+
+    q = np.asarray(q, dtype=float)
+    e = np.asarray(e, dtype=float)
+    incl = None if incl is None else np.asarray(incl, dtype=float)
+    membership = np.zeros(q.shape, dtype=np.min_scalar_type(2 ** len(classes) - 1))
+    codes = np.full(q.shape, -1, dtype=np.int8)
+
+    # the same condition trees make_multiclass_query writes as ADQL, evaluated with NumPy
+    class_conditions = [all_of(*cutoff_conditions(ORBITAL_CLASS_CUTOFFS[class_name])) for class_name in classes]
+
+    # chunks keep the temporaries (1 - e, Tisserand, masks) small enough to stay in cache
+    for start in range(0, q.size, CLASSIFY_CHUNK_SIZE):
+        chunk = slice(start, start + CLASSIFY_CHUNK_SIZE)
+        values = {Q: q[chunk], E: e[chunk]} # shared by all classes, so common sub-expressions are computed once
+        if incl is not None:
+            values[INCL] = incl[chunk]
+        for bit in reversed(range(len(classes))): # earlier classes overwrite later ones in 'codes'
+            with np.errstate(divide="ignore", invalid="ignore"): # NaN orbits fail every comparison, as NULLs do in the query
+                member = class_conditions[bit].evaluate(values)
+            np.bitwise_or(membership[chunk], membership.dtype.type(1 << bit), out=membership[chunk], where=member)
+            np.copyto(codes[chunk], bit, where=member)
+
+    labels = pd.Categorical.from_codes(codes, categories=list(classes))
+    return labels, membership
+
+
 def calc_semimajor_axis(q, e):
     """
     Given a perihelion distance and orbital eccentricity,
@@ -4,6 +4,8 @@ import matplotlib.pyplot as plt
 import pandas as pd
 import numpy as np
 
+from sso_query.plots import class_groups, scatter_classes
+
 ##### Post-run data wrangling #####
 def combine_tables(df1, df2):
     """
@@ -29,10 +31,9 @@ def plot_data(data_table, log:bool = False):
     class_name = data_table['class_name'][0]
     
     # Orbital parameter plot (a vs e)
+    groups = class_groups(data_table) # row positions per class, found once for both plots
     fig, ax = plt.subplots()
-    for class_type in data_table["class_name"].unique():
-        class_data = data_table[data_table["class_name"] == class_type]
-        ax.scatter(class_data["a"], class_data["e"], s=0.1, label=class_type)
+    scatter_classes(ax, data_table["a"], data_table["e"], groups, s=0.1)
     if log is True:
         ax.set_xscale('log')
     ax.set_xlabel('semimajor axis (au)')
@@ -45,9 +46,7 @@ def plot_data(data_table, log:bool = False):
 
     # Orbital parameter plot (a vs i)
     fig, ax = plt.subplots()
-    for class_type in data_table["class_name"].unique():
-        class_data = data_table[data_table["class_name"] == class_type]
-        ax.scatter(class_data["a"], class_data["incl"], s=0.1, label=class_type)
+    scatter_classes(ax, data_table["a"], data_table["incl"], groups, s=0.1)
     if log is True:
         ax.set_xscale('log')
     ax.set_xlabel('semimajor axis (au)')
@@ -93,7 +92,7 @@ def data_grouped_mags(df):
         raise KeyError("ssObjectID is not a column.")
     
     # 1. Group observations by class name, by ssObjectID, get the min/max/mean magnitudes
-    grouped_obs_data = df.groupby(['class_name', 'ssObjectID']).agg(
+    grouped_obs_data = df.groupby(['class_name', 'ssObjectID'], observed=True).agg(
         mag_min = ('magTrueVband', 'min'), 
         mag_max = ('magTrueVband', 'max'), 
         mag_mean = ('magTrueVband', 'mean')
@@ -143,7 +142,7 @@ def obs_filter(df):
     observations_by_filter = df['band'].value_counts()
     
     # count of unique observations for each unique object in SSO_id within each filter
-    observations_by_object_filter = df.groupby(['ssObjectID', 'band']).size().reset_index(name='obs_filter_count')
+    observations_by_object_filter = df.groupby(['ssObjectID', 'band'], observed=True).size().reset_index(name='obs_filter_count')
 
     # print statements
     print(f"# of observations by Object:", observations_by_object)
@@ -0,0 +1,68 @@
+# Module holds the shared TAP service registry used by the query functions.
+
+import threading
+
+from lsst.rsp import get_tap_service
+
+#################### Global ####################
+CATALOG_SERVICES = {
+    "dp1": "tap",
+    "dp03_catalogs_10yr": "ssotap"
+}
+################################################
+
+_services = {}
+_services_lock = threading.Lock()
+
+
+def get_service(catalog:str):
+    """
+    Returns the TAP service client for a catalog, creating it the first time it is requested.
+    The client (and the authenticated HTTP session inside it) is shared by every later call, so
+    connections are kept alive between queries instead of being set up again each time.
+    Args:
+        catalog (str): Name of RSP catalog to query.
+            dp1, dp03_catalogs_10yr
+    Returns:
+        service (pyvo.dal.TAPService): TAP service client for the catalog.
+    """
+    if catalog not in CATALOG_SERVICES:
+        raise ValueError("Please enter a valid catalog.")
+    service_name = CATALOG_SERVICES[catalog]
+
+    service = _services.get(service_name)
+    if service is None:
+        with _services_lock:
+            # another thread may have created the client while we waited on the lock
+            service = _services.get(service_name)
+            if service is None:
+                service = get_tap_service(service_name)
+                assert service is not None
+                _services[service_name] = service
+    return service
+
+
+def register_service(catalog:str, service):
+    """
+    Function makes get_service(catalog) return the given service client, e.g. a LocalTAPService for offline runs.
+    Args:
+        catalog (str): Name of RSP catalog.
+        service: TAP service client (anything with the pyvo.dal.TAPService methods used by the query functions).
+    """
+    if catalog not in CATALOG_SERVICES:
+        raise ValueError("Please enter a valid catalog.")
+    with _services_lock:
+        _services[CATALOG_SERVICES[catalog]] = service
+
+
+def clear_services():
+    """
+    Function drops all cached TAP service clients, closing their HTTP sessions. The next call to
+    get_service() creates a fresh client (e.g. after the access token has changed).
+    """
+    with _services_lock:
+        for service in _services.values():
+            session = getattr(service, "_session", None)
+            if session is not None:
+                session.close()
+        _services.clear()
@@ -0,0 +1,143 @@
+# Module holds the analysis session, which computes the derived data the plotting and counting functions share once per result table.
+
+from functools import cached_property
+
+from astropy.time import Time
+import numpy as np
+import pandas as pd
+
+from sso_query.query import calc_magnitude
+
+#################### Global ####################
+TRIM_COLUMNS = ("a", "e", "incl") # columns whose outliers setup() / AnalysisSession.trimmed drop
+TRIM_PERCENTILES = (0.5, 99.5)
+################################################
+
+
+class AnalysisSession:
+    """
+    Wraps one query result for analysis. The derived data the plots and counts need (the trimmed view, percentiles, class codes
+    and groups, magnitudes, discovery dates) is computed on first use and kept, so a notebook drawing many figures from the same
+    table does the preprocessing once. Every function in sso_query.plots accepts a session wherever it accepts a table.
+    The session assumes the table is not modified after it is created.
+    Args:
+        df (Pandas dataframe or Astropy table): Results from query. Astropy tables are converted to Pandas once.
+    """
+
+    def __init__(self, df):
+        self.df = df if isinstance(df, pd.DataFrame) else df.to_pandas()
+        self._percentiles = {}
+        self._class_codes = {}
+        self._class_groups = {}
+        self._valid = {}
+
+    def __len__(self):
+        return len(self.df)
+
+    def percentiles(self, column:str, q = TRIM_PERCENTILES):
+        """
+        Returns np.percentile(df[column], q) as a tuple, computed once per column and q.
+        """
+        key = (column, tuple(q))
+        if key not in self._percentiles:
+            self._percentiles[key] = tuple(np.percentile(self.df[column], q))
+        return self._percentiles[key]
+
+    @cached_property
+    def trim_mask(self):
+        """
+        Boolean array selecting the rows with every TRIM_COLUMNS value inside its TRIM_PERCENTILES range.
+        """
+        mask = np.ones(len(self.df), dtype=bool)
+        for column in TRIM_COLUMNS:
+            low, high = self.percentiles(column)
+            values = self.df[column].to_numpy()
+            mask &= (values >= low) & (values <= high)
+        return mask
+
+    @cached_property
+    def trimmed(self):
+        """
+        Session over the rows selected by trim_mask (what setup() returns), so plots of the trimmed data share its caches as well.
+        A trimmed session is not trimmed again.
+        """
+        trimmed = AnalysisSession(self.df[self.trim_mask])
+        trimmed.__dict__["trimmed"] = trimmed # fills the cached_property
+        return trimmed
+
+    def valid(self, columns):
+        """
+        Returns the rows of df[columns] without NaNs (df[columns].dropna()), computed once per list of columns.
+        """
+        key = tuple(columns)
+        if key not in self._valid:
+            self._valid[key] = self.df[list(key)].dropna()
+        return self._valid[key]
+
+    def class_codes(self, column:str = "class_name", sort:bool = False):
+        """
+        Factorizes a class column once.
+        Args:
+            column = "class_name" (str) (optional): Name of the class column.
+            sort = False (bool) (optional): Order the classes by name instead of by first appearance.
+        Returns:
+            codes (ndarray): Integer code of each row's class, -1 for rows without a class.
+            classes (Index): Class of each code.
+        """
+        key = (column, sort)
+        if key not in self._class_codes:
+            self._class_codes[key] = pd.factorize(self.df[column], sort=sort)
+        return self._class_codes[key]
+
+    def class_groups(self, column:str = "class_name", sort:bool = False):
+        """
+        Groups the rows by class in a single pass: one stable sort of the class codes gives each class its row positions, so plots
+        can take every class's values from shared arrays instead of scanning the whole table with a boolean mask per class.
+        Args:
+            column = "class_name" (str) (optional): Name of the class column.
+            sort = False (bool) (optional): Order the classes by name instead of by first appearance.
+        Returns:
+            groups (dict): Array of row positions (for .iloc or NumPy arrays) per class, in increasing order. Rows without a class are left out.
+        """
+        key = (column, sort)
+        if key not in self._class_groups:
+            codes, classes = self.class_codes(column, sort)
+            order = np.argsort(codes, kind="stable")
+            bounds = np.searchsorted(codes[order], np.arange(len(classes) + 1)) # NaN classes (code -1) sort first and are skipped
+            self._class_groups[key] = {class_type: order[bounds[i]:bounds[i + 1]] for i, class_type in enumerate(classes)}
+        return self._class_groups[key]
+
+    @cached_property
+    def magnitudes(self):
+        """
+        Magnitude of each observation: 'magTrueVband' (dp03) if the table has it, else calc_magnitude('apFlux') (dp1), NaN for
+        non-positive fluxes.
+        """
+        if "magTrueVband" in self.df.columns:
+            return self.df["magTrueVband"]
+        if "apFlux" in self.df.columns:
+            flux = self.df["apFlux"].to_numpy(dtype=float)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                mags = np.where(flux > 0, calc_magnitude(flux), np.nan)
+            return pd.Series(mags, index=self.df.index, name="mag")
+        raise KeyError("No 'magTrueVband' or 'apFlux' column. Check that query joined with DiaSource.")
+
+    @cached_property
+    def discovery_dates(self):
+        """
+        'discoverySubmissionDate' (MJD) converted to datetimes, NaT where missing.
+        """
+        mjd = self.df["discoverySubmissionDate"].to_numpy(dtype=float)
+        mask = ~np.isnan(mjd)
+        dates = np.full(len(mjd), np.datetime64("NaT"), dtype="datetime64[ns]")
+        if mask.any():
+            dates[mask] = Time(mjd[mask], format="mjd").datetime64 # vectorized; to_datetime() builds one Python object per row
+        # rounded to microseconds like Time.to_datetime(), which it matches to within 1 us
+        return pd.Series(dates, index=self.df.index, name="discoverySubmissionDate").dt.round("us")
+
+
+def as_session(data):
+    """
+    Returns data if it is already an AnalysisSession, else a new session wrapping it.
+    """
+    return data if isinstance(data, AnalysisSession) else AnalysisSession(data)
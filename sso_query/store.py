@@ -0,0 +1,146 @@
+# Module holds the local columnar store, which keeps query results on disk as a partitioned Parquet dataset for re-analysis.
+
+import os
+
+from astropy.table import Table
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+
+from sso_query.adql import all_of, cutoff_conditions
+from sso_query.cache import get_cache_dir
+from sso_query.query import DEFAULT_CUTOFFS, _resolve_format
+
+#################### Global ####################
+PARTITION_COLUMNS = ["catalog", "class_name"] # directory levels of the dataset (hive style, e.g. catalog=dp1/class_name=NEO)
+ROW_GROUP_SIZE = 2 ** 16 # rows per Parquet row group; smaller groups prune more finely but add per-group overhead
+SORT_COLUMN = "q" # rows are written sorted on q, so row groups cover narrow q ranges and q cutoffs skip most of them
+################################################
+
+
+class LocalStore:
+    """
+    Parquet dataset of query results, partitioned by catalog and class_name, with row-group statistics (min/max) on every column.
+    Cutoffs given to read() are applied on disk: partitions of other catalogs and classes are never opened (partition pruning) and
+    row groups whose q, e or incl statistics rule out every row are skipped (predicate pushdown), so narrowing or re-slicing a
+    stored class reads only the relevant parts of it.
+    Args:
+        path = None (str) (optional): Directory holding the dataset. Default is store/ in get_cache_dir().
+    """
+
+    def __init__(self, path:str = None):
+        self.path = path
+
+    def _dir(self):
+        if self.path is None:
+            self.path = os.path.join(get_cache_dir(), "store")
+        os.makedirs(self.path, exist_ok=True)
+        return self.path
+
+    def _dataset(self):
+        return ds.dataset(self._dir(), format="parquet", partitioning="hive")
+
+    def write(self, table, catalog:str):
+        """
+        Function stores a query result, replacing whatever was stored for the same catalog and classes.
+        Args:
+            table (Pandas dataframe, Astropy table or pyarrow Table): Result of run_query / run_queries, with a 'class_name' column.
+            catalog (str): Name of RSP catalog the result came from.
+        """
+        if isinstance(table, pd.DataFrame):
+            table = pa.Table.from_pandas(table, preserve_index=False)
+        elif isinstance(table, Table):
+            table = pa.Table.from_pandas(table.to_pandas(), preserve_index=False)
+        if "class_name" not in table.column_names:
+            raise KeyError("No 'class_name' column. Store results of run_query or run_queries.")
+        if pa.types.is_dictionary(table.schema.field("class_name").type): # categorical class names
+            table = table.set_column(table.schema.get_field_index("class_name"), "class_name", table["class_name"].cast(pa.string()))
+        table = table.append_column("catalog", pa.array([catalog] * len(table), type=pa.string()))
+        if SORT_COLUMN in table.column_names:
+            table = table.sort_by([("class_name", "ascending"), (SORT_COLUMN, "ascending")])
+
+        ds.write_dataset(table, self._dir(), format="parquet", partitioning=PARTITION_COLUMNS, partitioning_flavor="hive",
+                         max_rows_per_group=ROW_GROUP_SIZE, min_rows_per_group=min(ROW_GROUP_SIZE, max(len(table), 1)),
+                         existing_data_behavior="delete_matching", basename_template="part-{i}.parquet")
+
+    def _filter(self, catalog, class_name, cutoffs):
+        """
+        Returns the dataset filter for read(): the partition conditions AND the cutoff conditions (built as in make_query).
+        """
+        terms = []
+        if catalog is not None:
+            terms.append(ds.field("catalog") == catalog)
+        if class_name is not None:
+            class_names = [class_name] if isinstance(class_name, str) else list(class_name)
+            terms.append(ds.field("class_name").isin(class_names))
+        if cutoffs is not None:
+            terms.append(all_of(*cutoff_conditions({**DEFAULT_CUTOFFS, **cutoffs})).to_arrow())
+        if not terms:
+            return None
+        expression = terms[0]
+        for term in terms[1:]:
+            expression = expression & term
+        return expression
+
+    def read(self, catalog:str = None, class_name = None, cutoffs:dict = None, columns:list = None, to_pandas = False,
+             return_format:str = None):
+        """
+        Function reads stored results, applying the partition and cutoff conditions on disk.
+        Args:
+            catalog = None (str) (optional): Catalog to read. Default is every stored catalog.
+            class_name = None (str or list) (optional): Class (or classes) to read. Default is every stored class.
+            cutoffs = None (dict) (optional): Orbital constraints, as in make_query, applied on top of the class selection.
+                Use a class's ORBITAL_CLASS_CUTOFFS entry with changed values to narrow or re-slice it.
+            columns = None (list) (optional): Names of the columns to read. Default is every stored column.
+            to_pandas = False (bool) (optional): Boolean representing whether or not to return a pandas table. Default is an AstroPy table.
+            return_format = None (str) (optional): Type of the returned table, overriding to_pandas: "pandas", "astropy" or "arrow".
+        Returns:
+            table: Stored rows matching the conditions.
+        """
+        return_format = _resolve_format(to_pandas, return_format)
+        if return_format == "numpy-structured":
+            raise ValueError("LocalStore.read returns 'pandas', 'astropy' or 'arrow' tables.")
+        dataset = self._dataset()
+        if columns is None:
+            columns = [name for name in dataset.schema.names if name != "catalog"]
+        table = dataset.to_table(columns=columns, filter=self._filter(catalog, class_name, cutoffs))
+
+        if return_format == "arrow":
+            return table
+        df = table.to_pandas()
+        return df if return_format == "pandas" else Table.from_pandas(df)
+
+    def scan_plan(self, catalog:str = None, class_name = None, cutoffs:dict = None):
+        """
+        Function reports how much of the dataset read() would open for the given conditions, without reading any rows.
+        Args:
+            catalog, class_name, cutoffs: As in read().
+        Returns:
+            plan (dict): 'files' and 'row_groups' in the dataset, and 'files_read' and 'row_groups_read' after pruning.
+        """
+        dataset = self._dataset()
+        expression = self._filter(catalog, class_name, cutoffs)
+        all_fragments = list(dataset.get_fragments())
+        fragments = list(dataset.get_fragments(filter=expression)) if expression is not None else all_fragments
+        return {
+            "files": len(all_fragments),
+            "row_groups": sum(fragment.num_row_groups for fragment in all_fragments),
+            "files_read": len(fragments),
+            "row_groups_read": sum(len(fragment.split_by_row_group(expression, schema=dataset.schema)) if expression is not None
+                                   else fragment.num_row_groups for fragment in fragments)
+        }
+
+    def classes(self):
+        """
+        Function lists what is stored.
+        Returns:
+            classes (Pandas dataframe): 'catalog', 'class_name' and 'rows' for each stored partition.
+        """
+        dataset = self._dataset()
+        if len(dataset.files) == 0:
+            return pd.DataFrame(columns=["catalog", "class_name", "rows"])
+        partitions = dataset.to_table(columns=["catalog", "class_name"]).to_pandas()
+        return partitions.groupby(["catalog", "class_name"]).size().reset_index(name="rows")
+
+
+local_store = LocalStore()
@@ -0,0 +1,171 @@
+# Module holds generators for synthetic MPCORB / DiaSource / SSObject-like tables, used for offline testing and benchmarks.
+
+import numpy as np
+import pandas as pd
+
+#################### Global ####################
+# rough share of each orbital class among catalogued small bodies
+CLASS_WEIGHTS = {
+    "MBA": 0.85,
+    "NEO": 0.03,
+    "Jtrojan": 0.04,
+    "JFC": 0.02,
+    "Centaur": 0.01,
+    "TNO": 0.03,
+    "Ntrojan": 0.002,
+    "LPC": 0.018
+}
+BANDS = np.array(["u", "g", "r", "i", "z", "y"])
+MJD_START = 60000.0 # survey window for synthetic observations
+MJD_END = 63650.0
+################################################
+
+
+def make_orbits(n_objects:int, seed:int = None, class_weights:dict = None):
+    """
+    Generates an MPCORB-like table of orbits drawn from realistic distributions for each orbital class.
+    Args:
+        n_objects (int): Number of objects to generate.
+        seed = None (int) (optional): Seed for the random number generator.
+        class_weights = CLASS_WEIGHTS (dict) (optional): Relative number of objects per class.
+    Returns:
+        orbits (Pandas dataframe): Columns 'ssObjectId', 'mpcDesignation', 'q', 'e', 'incl' and 'class_name' (the class each orbit was drawn from).
+    """
+    rng = np.random.default_rng(seed)
+    class_weights = CLASS_WEIGHTS if class_weights is None else class_weights
+    names = list(class_weights)
+    weights = np.array([class_weights[name] for name in names], dtype=float)
+    class_index = rng.choice(len(names), size=n_objects, p=weights / weights.sum())
+
+    q = np.empty(n_objects)
+    e = np.empty(n_objects)
+    incl = np.empty(n_objects)
+    for index, name in enumerate(names):
+        members = class_index == index
+        q[members], e[members], incl[members] = _draw_orbits(name, int(members.sum()), rng)
+
+    # unique, increasing ids with gaps, like the survey's 64-bit ids
+    ss_object_id = np.arange(n_objects, dtype=np.int64) * 1000 + rng.integers(0, 1000, n_objects)
+    return pd.DataFrame({
+        "ssObjectId": ss_object_id,
+        "mpcDesignation": np.char.add("SYN", ss_object_id.astype(str)),
+        "q": q,
+        "e": e,
+        "incl": incl,
+        "class_name": pd.Categorical.from_codes(class_index, names)
+    })
+
+
+def _draw_orbits(class_name, n, rng):
+    """
+    Returns (q, e, incl) arrays of n orbits typical of class_name.
+    """
+    if class_name == "MBA":
+        a = rng.uniform(2.1, 3.2, n)
+        e = np.clip(rng.rayleigh(0.1, n), 0.0, 0.3)
+        incl = rng.rayleigh(7.0, n)
+    elif class_name == "NEO":
+        q = rng.uniform(0.3, 1.3, n)
+        a = rng.uniform(np.maximum(q, 1.0), 4.0)
+        e = 1.0 - q / a
+        incl = rng.rayleigh(10.0, n)
+    elif class_name == "Jtrojan":
+        a = np.clip(rng.normal(5.2, 0.05, n), 4.85, 5.35)
+        e = np.clip(rng.rayleigh(0.07, n), 0.0, 0.29)
+        incl = rng.rayleigh(12.0, n)
+    elif class_name == "JFC":
+        q = rng.uniform(1.0, 5.0, n)
+        e = rng.uniform(0.2, 0.7, n)
+        a = q / (1.0 - e)
+        incl = rng.rayleigh(8.0, n)
+    elif class_name == "Centaur":
+        a = rng.uniform(5.5, 30.0, n)
+        e = rng.uniform(0.0, 0.6, n)
+        incl = rng.rayleigh(15.0, n)
+    elif class_name == "TNO":
+        a = rng.uniform(30.2, 49.9, n)
+        e = np.clip(rng.rayleigh(0.1, n), 0.0, 0.6)
+        incl = rng.rayleigh(10.0, n)
+    elif class_name == "Ntrojan":
+        a = np.clip(rng.normal(30.1, 0.1, n), 29.85, 30.35)
+        e = np.clip(rng.rayleigh(0.05, n), 0.0, 0.2)
+        incl = rng.rayleigh(10.0, n)
+    elif class_name == "LPC":
+        a = np.exp(rng.uniform(np.log(50.0), np.log(5000.0), n))
+        e = rng.uniform(0.9, 0.999, n)
+        incl = rng.uniform(0.0, 180.0, n)
+    else:
+        raise ValueError(f"Invalid class_name: {class_name}.")
+    return a * (1.0 - e), e, np.clip(incl, 0.0, 180.0)
+
+
+def make_observations(orbits, catalog:str = "dp1", obs_per_object:float = 20.0, seed:int = None):
+    """
+    Generates a DiaSource-like table of observations of the given orbits.
+    Args:
+        orbits (Pandas dataframe): Table from make_orbits.
+        catalog = "dp1" (str) (optional): Catalog whose DiaSource columns to mimic; dp1 has fluxes, dp03_catalogs_10yr has magTrueVband.
+        obs_per_object = 20.0 (float) (optional): Mean number of observations per object (at least one each).
+        seed = None (int) (optional): Seed for the random number generator.
+    Returns:
+        observations (Pandas dataframe): One row per observation, with 'diaSourceId', 'ssObjectId', 'band', 'midpointMjdTai' and
+            'apFlux', 'apFlux_flag', 'apFluxErr' (dp1) or 'magTrueVband' (dp03_catalogs_10yr).
+    """
+    rng = np.random.default_rng(seed)
+    counts = 1 + rng.poisson(max(obs_per_object - 1.0, 0.0), len(orbits))
+    rows = np.repeat(np.arange(len(orbits)), counts)
+    n_obs = len(rows)
+
+    a = (orbits["q"].to_numpy() / (1.0 - orbits["e"].to_numpy()))[rows]
+    # brightness fades with distance; H spread plus per-observation scatter
+    magnitude = 15.0 + 5.0 * np.log10(np.clip(a, 0.5, None)) + rng.normal(3.0, 1.5, len(orbits))[rows] + rng.normal(0.0, 0.3, n_obs)
+
+    observations = pd.DataFrame({
+        "diaSourceId": np.arange(n_obs, dtype=np.int64),
+        "ssObjectId": orbits["ssObjectId"].to_numpy()[rows],
+        "band": BANDS[rng.integers(0, len(BANDS), n_obs)],
+        "midpointMjdTai": rng.uniform(MJD_START, MJD_END, n_obs)
+    })
+    if catalog == "dp1":
+        flux = 10 ** ((31.4 - magnitude) / 2.5) # inverse of query.calc_magnitude
+        observations["apFlux"] = flux
+        observations["apFlux_flag"] = rng.random(n_obs) < 0.01
+        observations["apFluxErr"] = flux * 0.05
+    else:
+        observations["magTrueVband"] = magnitude
+    return observations
+
+
+def make_ssobjects(orbits, observations = None, catalog:str = "dp1", new_fraction:float = 0.3, seed:int = None):
+    """
+    Generates an SSObject-like table for the given orbits.
+    Args:
+        orbits (Pandas dataframe): Table from make_orbits.
+        observations = None (Pandas dataframe) (optional): Table from make_observations, used for 'numObs'.
+        catalog = "dp1" (str) (optional): Catalog whose SSObject columns to mimic; dp03_catalogs_10yr adds g_H, r_H and i_H.
+        new_fraction = 0.3 (float) (optional): Fraction of objects discovered by the survey (with a discoverySubmissionDate).
+        seed = None (int) (optional): Seed for the random number generator.
+    Returns:
+        ssobjects (Pandas dataframe): One row per object with 'ssObjectId', 'discoverySubmissionDate' (MJD, NaN for known objects) and 'numObs'.
+    """
+    rng = np.random.default_rng(seed)
+    n_objects = len(orbits)
+    discovery = rng.uniform(MJD_START, MJD_END, n_objects)
+    discovery[rng.random(n_objects) >= new_fraction] = np.nan
+
+    if observations is not None:
+        num_obs = observations["ssObjectId"].value_counts().reindex(orbits["ssObjectId"], fill_value=0).to_numpy()
+    else:
+        num_obs = rng.poisson(20.0, n_objects)
+
+    ssobjects = pd.DataFrame({
+        "ssObjectId": orbits["ssObjectId"].to_numpy(),
+        "discoverySubmissionDate": discovery,
+        "numObs": num_obs.astype(np.int64)
+    })
+    if catalog == "dp03_catalogs_10yr":
+        r_h = rng.normal(17.0, 2.0, n_objects)
+        ssobjects["g_H"] = r_h + rng.normal(0.6, 0.1, n_objects)
+        ssobjects["r_H"] = r_h
+        ssobjects["i_H"] = r_h - rng.normal(0.2, 0.1, n_objects)
+    return ssobjects
@@ -0,0 +1,28 @@
+import pytest
+import sso_query.cache as cache
+from sso_query import services
+from sso_query.local_tap import LocalTAPService
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    """
+    Keyword arguments of the module's LocalTAPService. Test modules override this fixture to size their synthetic catalogs.
+    """
+    return {}
+
+
+@pytest.fixture(scope="module")
+def local_tap(local_tap_options):
+    service = LocalTAPService(**local_tap_options).install()
+    yield service
+    services.clear_services()
+
+
+@pytest.fixture(autouse=True)
+def schema_cache_in_tmp(tmp_path, monkeypatch):
+    """
+    Keeps TAP_SCHEMA lookups out of the user's cache directory, and out of the other tests.
+    """
+    monkeypatch.setattr(cache.schema_cache, "path", str(tmp_path / "schema.json"))
+    monkeypatch.setattr(cache.schema_cache, "_entries", None)
@@ -0,0 +1,67 @@
+import numpy as np
+from sso_query.adql import E, INCL, Q, TISSERAND, all_of, any_of, cutoff_conditions
+from sso_query.query import ORBITAL_CLASS_CUTOFFS, make_query
+
+
+def adql(cutoffs):
+    return " AND ".join(condition.to_adql() for condition in cutoff_conditions(cutoffs))
+
+
+class TestExpressions:
+    def test_parentheses(self):
+        assert (Q / (1 - E) > 2.0).to_adql() == "mpc.q / (1 - mpc.e) > 2.0"
+        assert (Q > 2.0 * (1 - E)).to_adql() == "mpc.q > 2.0 * (1 - mpc.e)"
+        assert TISSERAND.to_adql() == ("5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * "
+                                       "SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e)))")
+
+    def test_and_or(self):
+        condition = any_of(all_of(Q > 1.0, E < 0.5, Q > 1.0), Q < 0.1)
+        assert condition.to_adql() == "(mpc.q > 1.0 AND mpc.e < 0.5) OR mpc.q < 0.1"
+
+    def test_evaluate_matches_numpy(self):
+        q, e, incl = np.array([1.0, 3.0]), np.array([0.5, 0.2]), np.array([10.0, 20.0])
+        tj = (5.204 * (1 - e)) / q + 2 * np.cos(np.radians(incl)) * np.sqrt((q * (1 - e)) / (5.204 * (1 + e)))
+
+        assert np.allclose(TISSERAND.evaluate({Q: q, E: e, INCL: incl}), tj)
+
+
+class TestCutoffConditions:
+    def test_sargable_class_queries(self):
+        query, _ = make_query("dp1", class_name = "Jtrojan")
+
+        assert "mpc.q/(1-mpc.e)" not in query
+        assert query.endswith("WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);")
+
+    def test_equivalent_inputs_same_adql(self):
+        assert adql({"a_max": 4, "e_max": 1, "q_max": 1.3}) == adql({"q_max": 1.3, "e_max": 1.0, "a_max": np.float64(4.0), "a_min": None})
+
+    def test_redundant_bounds_dropped(self):
+        # q < 4.0 follows from a < 4.0 but q < 1.3 is tighter; e < 1 is implied by e < 0.3
+        assert adql(ORBITAL_CLASS_CUTOFFS["NEO"]) == "mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e)"
+        assert adql({"e_max": 0.3, "a_min": 4.8}).count("mpc.e <") == 1
+
+    def test_unbound_orbits_keep_division(self):
+        # without e < 1, a < X also holds for hyperbolic orbits (a < 0), so it cannot be multiplied out
+        assert adql({"a_max": 4.0}) == "mpc.q / (1 - mpc.e) < 4.0"
+
+    def test_same_rows_as_semimajor_axis(self):
+        rng = np.random.default_rng(0)
+        q = np.concatenate([rng.uniform(0.01, 60.0, 200000), rng.choice([1.66, 3.36, 5.4, 30.1], 20000)])
+        e = np.concatenate([rng.uniform(0.0, 1.5, 200000), rng.choice([0.0, 0.3, 0.48125], 20000)])
+        a = q / (1 - e)
+
+        for class_name, cutoffs in ORBITAL_CLASS_CUTOFFS.items():
+            if "tj_min" in cutoffs:
+                continue
+            expected = np.ones(len(q), dtype=bool)
+            for key, value in cutoffs.items():
+                column = {"q": q, "e": e, "a": a}[key[0]]
+                expected &= column > value if key.endswith("min") else column < value
+            with np.errstate(divide="ignore", invalid="ignore"):
+                selected = all_of(*cutoff_conditions(cutoffs)).evaluate({Q: q, E: e})
+            # q > X * (1 - e) and q/(1-e) > X only disagree through rounding, right at an a boundary
+            near_boundary = np.zeros(len(q), dtype=bool)
+            for key in ("a_min", "a_max"):
+                if key in cutoffs:
+                    near_boundary |= np.isclose(a, cutoffs[key], rtol=1e-12)
+            assert not ((selected != expected) & ~near_boundary).any(), class_name
@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sso_query import plots
+from sso_query.query import calc_magnitude, make_query, run_query
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=500, obs_per_object=8.0, seed=4)
+
+
+def fetch(catalog, aggregate = None):
+    query, class_name = make_query(catalog, class_name = "MBA", join = "DiaSource", aggregate = aggregate)
+    return run_query(query, class_name, catalog, to_pandas = True)
+
+
+class TestAggregateQuery:
+    def test_query(self, local_tap):
+        query, _ = make_query("dp03_catalogs_10yr", class_name = "LPC", join = "DiaSource", aggregate = "band")
+
+        assert query.startswith("SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.band, COUNT(*) AS obs_count, "
+                                "MIN(dias.magTrueVband) AS mag_min, MAX(dias.magTrueVband) AS mag_max, AVG(dias.magTrueVband) AS mag_mean, ")
+        assert query.endswith("\n    GROUP BY mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.band;")
+
+    def test_needs_diasource_join(self):
+        with pytest.raises(ValueError):
+            make_query("dp1", class_name = "MBA", join = "SSObject", aggregate = "object")
+        with pytest.raises(ValueError):
+            make_query("dp1", class_name = "MBA", aggregate = "observation")
+
+    def test_dp1_magnitudes(self, local_tap):
+        raw = fetch("dp1")
+        aggregated = fetch("dp1", "object").set_index("ssObjectID").sort_index()
+
+        raw["mag"] = calc_magnitude(raw["apFlux"])
+        expected = raw.groupby("ssObjectID")["mag"].agg(["min", "max", "mean", "size"])
+        assert len(aggregated) == len(expected)
+        assert np.allclose(aggregated["mag_min"], expected["min"])
+        assert np.allclose(aggregated["mag_mean"], expected["mean"])
+        assert (aggregated["obs_count"] == expected["size"]).all()
+
+    def test_plots_functions(self, local_tap):
+        raw = fetch("dp03_catalogs_10yr")
+        per_band = fetch("dp03_catalogs_10yr", "band")
+
+        pd.testing.assert_frame_equal(plots.obs_filter(per_band), plots.obs_filter(raw), check_dtype=False)
+        pd.testing.assert_frame_equal(plots.type_counts(per_band), plots.type_counts(raw))
+        expected = plots.obs_unique_obj_counts(raw).sort_values("ssObjectID", ignore_index=True)
+        pd.testing.assert_frame_equal(plots.obs_unique_obj_counts(per_band), expected, check_dtype=False)
+
+        mags = plots.data_grouped_mags(per_band).sort_values("ssObjectID", ignore_index=True)
+        expected = plots.data_grouped_mags(raw).sort_values("ssObjectID", ignore_index=True)
+        pd.testing.assert_frame_equal(mags[expected.columns], expected, check_dtype=False)
@@ -0,0 +1,124 @@
+import pandas as pd
+import pytest
+import sso_query.cache as cache
+from sso_query.query import make_query
+
+DIASOURCE_COLUMNS = ["ssObjectId", "apFlux", "apFlux_flag", "apFluxErr", "band"]
+
+
+class FakeResults:
+    def __init__(self, columns):
+        self.columns = columns
+
+    def to_table(self):
+        return self
+
+    def to_pandas(self):
+        return pd.DataFrame({"column_name": self.columns})
+
+
+class FakeSchemaService:
+    def __init__(self):
+        self.searches = []
+
+    def search(self, query):
+        self.searches.append(query)
+        return FakeResults(DIASOURCE_COLUMNS)
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    service = FakeSchemaService()
+    monkeypatch.setattr(cache, "get_service", lambda catalog: service)
+    return service
+
+
+class TestSchemaCache:
+    def test_columns_looked_up_once(self, fake_service, tmp_path):
+        schema = cache.SchemaCache(path=str(tmp_path / "schema.json"))
+
+        assert schema.get_columns("dp1", "DiaSource") == DIASOURCE_COLUMNS
+        assert schema.get_columns("dp1", "DiaSource") == DIASOURCE_COLUMNS
+        assert len(fake_service.searches) == 1
+        assert "table_name = 'dp1.DiaSource'" in fake_service.searches[0]
+
+    def test_columns_persisted_to_disk(self, fake_service, tmp_path):
+        cache.SchemaCache(path=str(tmp_path / "schema.json")).get_columns("dp1", "DiaSource")
+        reloaded = cache.SchemaCache(path=str(tmp_path / "schema.json"))
+
+        assert reloaded.get_columns("dp1", "DiaSource") == DIASOURCE_COLUMNS
+        assert len(fake_service.searches) == 1
+
+    def test_expired_entry_refetched(self, fake_service, tmp_path):
+        schema = cache.SchemaCache(path=str(tmp_path / "schema.json"), ttl=0)
+        schema.get_columns("dp1", "DiaSource")
+        schema.get_columns("dp1", "DiaSource")
+
+        assert len(fake_service.searches) == 2
+
+    def test_invalidate(self, fake_service, tmp_path):
+        schema = cache.SchemaCache(path=str(tmp_path / "schema.json"))
+        schema.get_columns("dp1", "DiaSource")
+        schema.get_columns("dp1", "SSObject")
+        schema.invalidate(catalog="dp1", table="DiaSource")
+        schema.get_columns("dp1", "DiaSource")
+        schema.get_columns("dp1", "SSObject")
+
+        assert len(fake_service.searches) == 3
+
+    def test_make_query_uses_cache(self, fake_service):
+        expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
+    INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
+
+        for class_name in ["NEO", "NEO", "MBA"]:
+            query, _ = make_query("dp1", class_name = class_name, join = "DiaSource")
+
+        query, _ = make_query("dp1", class_name = "NEO", join = "DiaSource")
+        assert expected_query == query
+        assert len(fake_service.searches) == 1
+
+
+class TestResultCache:
+    def test_key_normalizes_whitespace(self):
+        key = cache.ResultCache.key("SELECT a FROM t\n    WHERE b > 1;", "dp1")
+
+        assert key == cache.ResultCache.key("SELECT a  FROM t WHERE b > 1", "dp1")
+        assert key != cache.ResultCache.key("SELECT a FROM t WHERE b > 1", "dp03_catalogs_10yr")
+
+    def test_put_get(self, tmp_path):
+        results = cache.ResultCache(path=str(tmp_path))
+        df = pd.DataFrame({"q": [1.0, 2.0], "e": [0.1, 0.2], "mpcDesignation": ["a", "b"]})
+
+        assert results.get("SELECT 1", "dp1") is None
+        results.put("SELECT 1", "dp1", df)
+        pd.testing.assert_frame_equal(results.get("SELECT 1", "dp1"), df)
+        assert results.stats()["hits"] == 1
+        assert results.stats()["misses"] == 1
+        assert results.stats()["entries"] == 1
+
+    def test_ttl(self, tmp_path):
+        results = cache.ResultCache(path=str(tmp_path), ttl=0)
+        results.put("SELECT 1", "dp1", pd.DataFrame({"q": [1.0]}))
+
+        assert results.get("SELECT 1", "dp1") is None
+        assert results.stats()["entries"] == 0
+
+    def test_lru_eviction(self, tmp_path):
+        results = cache.ResultCache(path=str(tmp_path))
+        df = pd.DataFrame({"q": range(1000)})
+        results.put("SELECT 1", "dp1", df)
+        results.max_bytes = 2.5 * results.stats()["bytes"]
+        results.put("SELECT 2", "dp1", df)
+        results.get("SELECT 1", "dp1") # query 2 is now the least recently used
+        results.put("SELECT 3", "dp1", df)
+
+        assert results.get("SELECT 2", "dp1") is None
+        assert results.get("SELECT 1", "dp1") is not None
+        assert results.get("SELECT 3", "dp1") is not None
+        assert results.stats()["evictions"] == 1
+
+    def test_persisted_index(self, tmp_path):
+        cache.ResultCache(path=str(tmp_path)).put("SELECT 1", "dp1", pd.DataFrame({"q": [1.0]}))
+
+        assert cache.ResultCache(path=str(tmp_path)).get("SELECT 1", "dp1") is not None
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from sso_query import services
+from sso_query.local_tap import LocalTAPService
+from sso_query.query import ORBITAL_CLASS_CUTOFFS, classify_orbits, make_multiclass_query, run_query
+from sso_query.synthetic import make_orbits
+
+
+class TestClassifyOrbits:
+    def test_matches_multiclass_query(self):
+        LocalTAPService(n_objects=3000, catalogs=["dp1"], seed=2).install()
+        try:
+            query, classes = make_multiclass_query("dp1")
+            table = run_query(query, None, "dp1", to_pandas = True)
+            orbits = make_orbits(3000, seed=2)
+        finally:
+            services.clear_services()
+
+        labels, membership = classify_orbits(orbits["q"], orbits["e"], orbits["incl"])
+        selected = orbits["ssObjectId"].isin(table["ssObjectID"]).to_numpy()
+        assert (selected == (membership != 0)).all()
+
+        table = table.set_index("ssObjectID").loc[orbits["ssObjectId"][selected]]
+        assert (np.asarray(labels[selected]) == table["class_name"].to_numpy()).all()
+        for bit, class_name in enumerate(classes):
+            assert ((membership[selected] >> bit) & 1 == table[f"is_{class_name}"].to_numpy()).all()
+
+    def test_overlapping_classes(self):
+        # a = 30.2: inside both the TNO and the Ntrojan bounds
+        labels, membership = classify_orbits(np.array([30.2, 1.0]), np.array([0.0, 0.5]), np.array([0.0, 0.0]))
+
+        assert list(labels) == ["TNO", "NEO"]
+        assert membership[0] == (1 << list(ORBITAL_CLASS_CUTOFFS).index("TNO")) | (1 << list(ORBITAL_CLASS_CUTOFFS).index("Ntrojan"))
+
+    def test_class_order_and_nan(self):
+        labels, membership = classify_orbits(np.array([30.2, np.nan]), np.array([0.0, 0.1]), classes = ["Ntrojan", "TNO"])
+
+        assert labels[0] == "Ntrojan"
+        assert membership.tolist() == [3, 0]
+        assert labels.isna()[1]
+
+    def test_incl_needed_for_jfc(self):
+        with pytest.raises(ValueError):
+            classify_orbits(np.array([3.0]), np.array([0.5]))
@@ -0,0 +1,73 @@
+import pytest
+import sso_query.query as query
+from sso_query.query import make_multiclass_query, make_query
+
+SCHEMAS = {
+    "MPCORB": ["ssObjectId", "mpcDesignation", "q", "e", "incl", "node", "peri"],
+    "DiaSource": ["ssObjectId", "apFlux", "apFlux_flag", "apFluxErr", "band", "midpointMjdTai"],
+    "SSObject": ["ssObjectId", "discoverySubmissionDate", "numObs"],
+}
+
+
+class FakeSchemaCache:
+    def __init__(self):
+        self.lookups = []
+
+    def get_columns(self, catalog, table):
+        self.lookups.append(table)
+        return SCHEMAS[table]
+
+
+@pytest.fixture
+def fake_schema(monkeypatch):
+    schema = FakeSchemaCache()
+    monkeypatch.setattr(query, "schema_cache", schema)
+    return schema
+
+
+class TestColumns:
+    def test_heatmap_preset(self, fake_schema):
+        expected_query = f"""SELECT mpc.q, mpc.e, mpc.incl FROM dp1.MPCORB AS mpc
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
+
+        query_string, class_name = make_query("dp1", class_name = "MBA", columns = "heatmap")
+        assert expected_query == query_string
+        assert fake_schema.lookups == []
+
+    def test_observations_preset_join(self, fake_schema):
+        query_string, _ = make_query("dp1", class_name = "MBA", join = "DiaSource", columns = "observations")
+
+        assert query_string.startswith("SELECT mpc.q, mpc.e, mpc.ssObjectID, dias.band FROM dp1.MPCORB AS mpc")
+
+    def test_preset_skips_unavailable(self, fake_schema):
+        query_string, _ = make_query("dp1", class_name = "MBA", columns = "color")
+
+        assert query_string.startswith("SELECT mpc.q, mpc.e, mpc.incl FROM")
+
+    def test_required_columns_added(self, fake_schema):
+        query_string, _ = make_query("dp1", class_name = "MBA", columns = ["incl"])
+
+        assert query_string.startswith("SELECT mpc.q, mpc.e, mpc.incl FROM")
+
+    def test_exclude(self, fake_schema):
+        query_string, _ = make_query("dp1", class_name = "MBA", join = "DiaSource", exclude = ["mpcDesignation", "apFluxErr"])
+
+        assert query_string.startswith("SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, dias.apFlux, dias.apFlux_flag, dias.band FROM")
+        with pytest.raises(ValueError):
+            make_query("dp1", class_name = "MBA", exclude = ["q"])
+
+    def test_schema_columns(self, fake_schema):
+        query_string, _ = make_query("dp1", class_name = "MBA", join = "DiaSource", columns = ["q", "e", "node", "midpointMjdTai"])
+
+        assert query_string.startswith("SELECT mpc.q, mpc.e, mpc.node, dias.midpointMjdTai FROM")
+        with pytest.raises(ValueError):
+            make_query("dp1", class_name = "MBA", columns = ["q", "e", "albedo"])
+
+    def test_unknown_preset(self, fake_schema):
+        with pytest.raises(ValueError):
+            make_query("dp1", class_name = "MBA", columns = "histogram")
+
+    def test_multiclass_columns(self, fake_schema):
+        query_string, _ = make_multiclass_query("dp1", classes = ["NEO", "MBA"], columns = "heatmap")
+
+        assert query_string.startswith("SELECT mpc.q, mpc.e, mpc.incl, CASE WHEN")
@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sso_query import plots
+from sso_query.query import compact_frame, run_query
+
+
+def results(class_name, n = 1000, seed = 0):
+    rng = np.random.default_rng(seed)
+    ids = rng.integers(0, 10 ** 6, n)
+    return pd.DataFrame({
+        "ssObjectID": ids,
+        "mpcDesignation": pd.Series([f"SYN{i}" for i in ids], dtype=object),
+        "q": rng.uniform(0.5, 5.0, n),
+        "e": rng.uniform(0.0, 0.5, n),
+        "midpointMjdTai": rng.uniform(60000.0, 61000.0, n),
+        "band": pd.Series(rng.choice(list("ugrizy"), n), dtype=object),
+        "class_name": pd.Series([class_name] * n, dtype=object)
+    })
+
+
+class TestCompactFrame:
+    def test_dtypes(self, capsys):
+        df = results("MBA")
+        compact = compact_frame(df)
+
+        assert isinstance(compact["class_name"].dtype, pd.CategoricalDtype)
+        assert isinstance(compact["band"].dtype, pd.CategoricalDtype)
+        assert compact["mpcDesignation"].dtype == pd.StringDtype("pyarrow")
+        assert compact["ssObjectID"].dtype == np.int32
+        assert compact["q"].dtype == np.float64
+        assert "smaller" in capsys.readouterr().out
+        pd.testing.assert_frame_equal(compact.astype(df.dtypes.to_dict()), df)
+
+    def test_float32_keeps_times(self):
+        compact = compact_frame(results("MBA"), float32=True, report=False)
+
+        assert compact["q"].dtype == np.float32
+        assert compact["midpointMjdTai"].dtype == np.float64
+
+
+class TestCombineCompact:
+    def test_combined_categories(self):
+        dfs = [results(class_name, seed=seed) for seed, class_name in enumerate(["NEO", "MBA", "TNO"])]
+        combined = plots.combine_tables(*dfs, compact=True)
+
+        assert isinstance(combined["class_name"].dtype, pd.CategoricalDtype)
+        assert combined["class_name"].value_counts().to_dict() == {"NEO": 1000, "MBA": 1000, "TNO": 1000}
+        expected = plots.combine_tables(*dfs)
+        pd.testing.assert_frame_equal(combined.astype(expected.dtypes.to_dict()), expected)
+        assert combined.memory_usage(deep=True).sum() * 3 < expected.memory_usage(deep=True).sum()
+
+    def test_run_query_needs_pandas(self):
+        with pytest.raises(ValueError):
+            run_query("SELECT mpc.q FROM dp1.MPCORB AS mpc;", "NEO", "dp1", compact=True)
+
+
+def observations(class_name, first_id, n_objects = 50, n_obs = 10, seed = 0):
+    rng = np.random.default_rng(seed)
+    n = n_objects * n_obs
+    return pd.DataFrame({
+        "ssObjectID": np.repeat(np.arange(first_id, first_id + n_objects), n_obs),
+        "band": pd.Series(rng.choice(list("ugrizy"), n), dtype=object),
+        "magTrueVband": rng.uniform(18.0, 24.0, n),
+        "discoverySubmissionDate": rng.uniform(60000.0, 61000.0, n),
+        "numObs": rng.integers(1, 100, n),
+        "class_name": pd.Series([class_name] * n, dtype=object)
+    })
+
+
+@pytest.mark.filterwarnings("error::FutureWarning")
+class TestCompactPlotHelpers:
+    @pytest.fixture
+    def tables(self):
+        dfs = [observations(class_name, 1000 * seed, seed=seed) for seed, class_name in enumerate(["NEO", "MBA", "TNO"])]
+        return plots.combine_tables(*dfs), plots.combine_tables(*dfs, compact=True)
+
+    def test_obs_filter(self, tables):
+        df, compact = tables
+        counts = plots.obs_filter(compact)
+
+        assert len(counts) == len(df[["ssObjectID", "band"]].drop_duplicates())
+        assert (counts["obs_filter_count"] > 0).all()
+        assert len(counts) == len(plots.obs_filter(df))
+
+    def test_data_grouped_mags(self, tables):
+        df, compact = tables
+        ranges = plots.data_grouped_mags(compact)
+
+        assert len(ranges) == len(plots.data_grouped_mags(df))
+        assert ranges["ssObjectID"].nunique() == len(ranges)
+
+    def test_class_counts(self, tables):
+        df, compact = tables
+        counts = plots.type_counts(compact)
+        discovered = plots.discovery_cutoff_counts(compact, "2000-01-01")
+
+        assert len(counts) == 3
+        assert counts["object_count"].tolist() == [50, 50, 50]
+        assert discovered["object_count"].sum() == df["ssObjectID"].nunique()
+        assert len(plots.obs_unique_obj_counts(compact)) == df["ssObjectID"].nunique()
@@ -0,0 +1,33 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from sso_query import plots
+
+
+class TestClassGroups:
+    def test_groups_match_masks(self):
+        rng = np.random.default_rng(0)
+        df = pd.DataFrame({"class_name": rng.choice(["NEO", "MBA", "TNO", None], 1000)})
+
+        groups = plots.class_groups(df)
+        assert list(groups) == list(df["class_name"].dropna().unique())
+        for class_type, rows in groups.items():
+            assert np.array_equal(rows, np.flatnonzero(df["class_name"] == class_type))
+        assert sum(len(rows) for rows in groups.values()) == df["class_name"].notna().sum()
+
+    def test_sorted_and_categorical(self):
+        df = pd.DataFrame({"class_name": pd.Categorical(["NEO", "MBA", "NEO"])})
+
+        groups = plots.class_groups(df, sort=True)
+        assert list(groups) == ["MBA", "NEO"]
+        assert groups["NEO"].tolist() == [0, 2]
+
+    def test_scatter_skips_nan(self):
+        fig, ax = plt.subplots()
+        df = pd.DataFrame({"a": [1.0, np.nan, 3.0], "e": [0.1, 0.2, np.nan], "class_name": ["MBA", "MBA", "NEO"]})
+
+        plots.scatter_classes(ax, df["a"], df["e"], plots.class_groups(df), None, s=1)
+        assert [len(collection.get_offsets()) for collection in ax.collections] == [1, 0]
+        plt.close(fig)
@@ -0,0 +1,70 @@
+from concurrent.futures import CancelledError
+import pytest
+import sso_query.query as query
+from sso_query.query import POLL_MAX, POLL_MIN, _poll_interval, make_query, run_query, submit_query
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=500, obs_per_object=2.0, catalogs=["dp1"], seed=1)
+
+
+@pytest.fixture
+def jobs(local_tap, monkeypatch):
+    monkeypatch.setattr(query, "POLL_MIN", 0.01)
+    submitted = []
+    submit_job = local_tap.submit_job
+    def recording_submit(query_string, **kwargs):
+        submitted.append(submit_job(query_string, **kwargs))
+        return submitted[-1]
+    monkeypatch.setattr(local_tap, "submit_job", recording_submit)
+    return submitted
+
+
+class TestSubmitQuery:
+    def test_result_matches_run_query(self, local_tap, jobs):
+        polls = []
+        query_string, class_name = make_query("dp1", class_name="MBA")
+        handle = submit_query(query_string, class_name, "dp1", to_pandas=True, sync_threshold=0,
+                              progress=lambda phase, elapsed: polls.append(phase))
+        table = handle.result(timeout=30)
+        assert handle.done() and not handle.cancelled()
+        assert polls[-1] == "COMPLETED" and handle.phase == "COMPLETED"
+        expected = run_query(query_string, class_name, "dp1", to_pandas=True)
+        assert table.sort_values("ssObjectID").reset_index(drop=True).equals(
+            expected.sort_values("ssObjectID").reset_index(drop=True))
+
+    def test_cancel_aborts_job(self, local_tap, jobs, monkeypatch):
+        monkeypatch.setattr(local_tap, "latency", 2.0)
+        finished = []
+        query_string, class_name = make_query("dp1", class_name="MBA")
+        handle = submit_query(query_string, class_name, "dp1", sync_threshold=0)
+        handle.add_done_callback(finished.append)
+        with pytest.raises(TimeoutError):
+            handle.result(timeout=0.2)
+        assert not handle.done()
+
+        assert handle.cancel()
+        assert handle.done() and handle.cancelled()
+        assert finished == [handle]
+        with pytest.raises(CancelledError):
+            handle.result()
+        assert jobs[0].phase == "ABORTED"
+        assert not handle.cancel() # already done
+
+    def test_errors_are_raised_by_result(self, local_tap, jobs):
+        handle = submit_query("SELECT missing FROM dp1.MPCORB", "MBA", "dp1")
+        with pytest.raises(Exception):
+            handle.result(timeout=30)
+        assert handle.done() and not handle.cancelled()
+
+    def test_compact_needs_pandas(self, local_tap):
+        with pytest.raises(ValueError):
+            submit_query("SELECT 1", "MBA", "dp1", compact=True)
+
+
+class TestPollInterval:
+    def test_grows_with_elapsed_time(self):
+        assert _poll_interval(0.0) == POLL_MIN
+        assert POLL_MIN < _poll_interval(20.0) < POLL_MAX
+        assert _poll_interval(3600.0) == POLL_MAX
@@ -0,0 +1,64 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pytest
+from sso_query import plots
+from sso_query.query import make_query, run_histogram2d, run_query
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=5000, obs_per_object=1.0, catalogs=["dp1"], seed=5)
+
+
+class TestHistogram2d:
+    def test_matches_numpy(self, local_tap):
+        query, _ = make_query("dp1", class_name = "MBA")
+        objects = run_query(query, "MBA", "dp1", to_pandas = True)
+
+        counts, x_edges, y_edges = run_histogram2d("dp1", "MBA", x = "a", y = "e", bins = [30, 20])
+        expected, _, _ = np.histogram2d(objects["a"], objects["e"], bins = [x_edges, y_edges])
+
+        assert counts.shape == (30, 20)
+        assert x_edges[0] == objects["a"].min() and x_edges[-1] == objects["a"].max()
+        assert (counts == expected).all()
+
+    def test_range(self, local_tap):
+        query, _ = make_query("dp1", class_name = "MBA")
+        objects = run_query(query, "MBA", "dp1", to_pandas = True)
+
+        counts, _, _ = run_histogram2d("dp1", "MBA", x = "a", y = "incl", bins = 10, range = [[2.0, 3.0], [0.0, 10.0]])
+        expected, _, _ = np.histogram2d(objects["a"], objects["incl"], bins = 10, range = [[2.0, 3.0], [0.0, 10.0]])
+        assert (counts == expected).all()
+
+    def test_invalid_axis(self):
+        with pytest.raises(ValueError):
+            run_histogram2d("dp1", "MBA", x = "H")
+
+    @pytest.mark.parametrize("bins, range", [(0, None), ([10, -1], None), (10, [[2.0, 2.0], [0.0, 1.0]]), (10, [[2.0, 3.0], [1.0, 0.0]])])
+    def test_invalid_bins_and_range(self, bins, range):
+        with pytest.raises(ValueError):
+            run_histogram2d("dp1", "MBA", bins = bins, range = range)
+
+    def test_single_object_range(self, local_tap):
+        query, _ = make_query("dp1", class_name = "MBA")
+        q = np.sort(run_query(query, "MBA", "dp1", to_pandas = True)["q"].to_numpy())
+        q0 = q[np.argmax(np.minimum(np.diff(q)[:-1], np.diff(q)[1:])) + 1] # the most isolated perihelion
+        objects = run_query(make_query("dp1", cutoffs = {"q_min": q0 - 1e-6, "q_max": q0 + 1e-6})[0], "single", "dp1", to_pandas = True)
+        assert len(objects) == 1
+
+        counts, x_edges, y_edges = run_histogram2d("dp1", cutoffs = {"q_min": q0 - 1e-6, "q_max": q0 + 1e-6}, x = "a", y = "e", bins = 4)
+        expected, expected_x, expected_y = np.histogram2d(objects["a"], objects["e"], bins = 4)
+        assert counts.sum() == 1
+        assert np.allclose(x_edges, expected_x) and np.allclose(y_edges, expected_y)
+        assert (counts == expected).all()
+
+    def test_heat_map_counts(self):
+        counts = np.array([[0, 2], [5, 1]])
+        fig, ax = plt.subplots()
+
+        mesh = plots.heat_map_counts(counts, np.array([0.0, 1.0, 2.0]), np.array([0.0, 0.5, 1.0]), ax = ax)
+        assert mesh.get_array().count() == 3 # the empty bin is left blank
+        assert ax.get_xlabel() == "Semi-major Axis (AU)"
+        plt.close(fig)
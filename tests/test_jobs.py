@@ -0,0 +1,172 @@
+from concurrent.futures import ThreadPoolExecutor
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+import pytest
+import requests
+from astropy.table import Table
+import sso_query.cache as cache
+import sso_query.query as query
+from sso_query import services
+from sso_query.query import _run_job, cleanup_jobs
+
+
+class FakeJob:
+    def __init__(self, service, number):
+        self.service = service
+        self.url = f"https://example.org/tap/async/{number}"
+        self.phase = "PENDING"
+        self.deleted = False
+
+    def run(self):
+        self.phase = "EXECUTING"
+
+    def wait(self, phases = None):
+        self.service.gate.wait(5)
+        if self.service.interrupt:
+            self.service.interrupt = False
+            raise KeyboardInterrupt
+        self.phase = "COMPLETED"
+
+    def raise_if_error(self):
+        pass
+
+    def fetch_result(self):
+        if self.deleted:
+            raise requests.HTTPError("404 job not found")
+        if self.service.failures:
+            self.service.failures -= 1
+            raise requests.ConnectionError("connection reset")
+        return Table({"ssObjectId": [1, 2, 3]})
+
+    def delete(self):
+        self.deleted = True
+
+
+class FakeRemoteService:
+    def __init__(self):
+        self.jobs = {}
+        self.interrupt = False
+        self.failures = 0
+        self.gate = threading.Event() # jobs finish once set
+        self.gate.set()
+        self._lock = threading.Lock()
+
+    def submit_job(self, query_string):
+        with self._lock:
+            job = FakeJob(self, len(self.jobs))
+            self.jobs[job.url] = job
+        return job
+
+
+def wait_for(condition, timeout = 5.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def set_owner(pid):
+    """
+    Rewrites the owner pid of every journal entry, as if another process had submitted the jobs.
+    """
+    with open(cache.job_journal.path) as f:
+        entries = json.load(f)
+    for entry in entries.values():
+        entry["pid"] = pid
+    with open(cache.job_journal.path, "w") as f:
+        json.dump(entries, f)
+
+
+@pytest.fixture
+def remote(tmp_path, monkeypatch):
+    service = FakeRemoteService()
+    monkeypatch.setattr(cache.job_journal, "path", str(tmp_path / "jobs.json"))
+    monkeypatch.setattr(query, "_reattach_job", lambda service, url: service.jobs[url])
+    monkeypatch.setattr(query, "JOB_BACKOFF", 0.0)
+    services.register_service("dp1", service)
+    yield service
+    services.clear_services()
+
+
+class TestJobJournal:
+    def test_interrupted_job_is_reattached(self, remote):
+        remote.interrupt = True
+        with pytest.raises(KeyboardInterrupt):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+        entry = cache.job_journal.get("SELECT 1", "dp1")
+        assert entry["url"] in remote.jobs
+
+        result = _run_job(remote, "SELECT 1", catalog="dp1")
+        assert len(result) == 3
+        assert len(remote.jobs) == 1 # not submitted again
+        assert remote.jobs[entry["url"]].deleted
+        assert cache.job_journal.get("SELECT 1", "dp1") is None
+
+    def test_failed_job_is_not_reattached(self, remote):
+        remote.interrupt = True
+        with pytest.raises(KeyboardInterrupt):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+        next(iter(remote.jobs.values())).phase = "ABORTED"
+        _run_job(remote, "SELECT 1", catalog="dp1")
+        assert len(remote.jobs) == 2
+
+    def test_transient_errors_are_retried(self, remote):
+        remote.failures = 2
+        assert len(_run_job(remote, "SELECT 1", catalog="dp1")) == 3
+        remote.failures = query.JOB_RETRIES + 1
+        with pytest.raises(requests.ConnectionError):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+
+    def test_concurrent_identical_queries(self, remote):
+        remote.gate.clear()
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            first = executor.submit(_run_job, remote, "SELECT 1", catalog="dp1")
+            assert wait_for(lambda: cache.job_journal.get("SELECT 1", "dp1") is not None)
+            second = executor.submit(_run_job, remote, "SELECT 1", catalog="dp1")
+            assert wait_for(lambda: len(remote.jobs) == 2) # its own job, not the first one's
+            remote.gate.set()
+            assert len(first.result()) == 3
+            assert len(second.result()) == 3
+        assert all(job.deleted for job in remote.jobs.values())
+        assert cache.job_journal.get("SELECT 1", "dp1") is None
+
+    def test_jobs_of_live_processes_are_not_reattached(self, remote):
+        remote.interrupt = True
+        with pytest.raises(KeyboardInterrupt):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+        url = cache.job_journal.get("SELECT 1", "dp1")["url"]
+
+        set_owner(os.getppid()) # still running
+        assert cleanup_jobs(max_age=0) == 0
+        remote.interrupt = True
+        with pytest.raises(KeyboardInterrupt):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+        assert len(remote.jobs) == 2
+        assert not remote.jobs[url].deleted
+
+        finished = subprocess.run([sys.executable, "-c", "import os; print(os.getpid())"], capture_output=True, text=True)
+        set_owner(int(finished.stdout)) # gone
+        assert len(_run_job(remote, "SELECT 1", catalog="dp1")) == 3
+        assert len(remote.jobs) == 2
+
+    def test_cleanup_jobs(self, remote):
+        remote.interrupt = True
+        with pytest.raises(KeyboardInterrupt):
+            _run_job(remote, "SELECT 1", catalog="dp1")
+        assert cleanup_jobs() == 0 # still fresh
+        assert cleanup_jobs(max_age=0) == 1
+        assert next(iter(remote.jobs.values())).deleted
+        assert cache.job_journal.entries() == {}
+
+    def test_local_jobs_are_not_journaled(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(cache.job_journal, "path", str(tmp_path / "jobs.json"))
+        remote = FakeRemoteService()
+        job = remote.submit_job("SELECT 1")
+        job.url = None
+        remote.submit_job = lambda query_string: job
+        assert len(_run_job(remote, "SELECT 1", catalog="dp1")) == 3
+        assert cache.job_journal.entries() == {}
@@ -0,0 +1,96 @@
+import numpy as np
+import pandas as pd
+import pytest
+from pyvo.dal import DALQueryError
+import sso_query.cache as cache
+from sso_query.query import ORBITAL_CLASS_CUTOFFS, calc_semimajor_axis, make_multiclass_query, make_query, run_queries, run_query
+from sso_query.synthetic import make_observations, make_orbits
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=3000, obs_per_object=5.0, seed=1)
+
+
+def in_class(orbits, class_name):
+    """
+    Boolean mask of the orbits matching a class, evaluated in pandas from ORBITAL_CLASS_CUTOFFS.
+    """
+    cutoffs = ORBITAL_CLASS_CUTOFFS[class_name]
+    q, e, incl = orbits["q"], orbits["e"], orbits["incl"]
+    a = calc_semimajor_axis(q, e)
+    mask = pd.Series(True, index=orbits.index)
+    if "q_min" in cutoffs:
+        mask &= q > cutoffs["q_min"]
+    if "q_max" in cutoffs:
+        mask &= q < cutoffs["q_max"]
+    if "e_max" in cutoffs:
+        mask &= e < cutoffs["e_max"]
+    if "a_min" in cutoffs:
+        mask &= a > cutoffs["a_min"]
+    if "a_max" in cutoffs:
+        mask &= a < cutoffs["a_max"]
+    if "tj_min" in cutoffs:
+        tj = (5.204 * (1 - e)) / q + 2 * np.cos(np.radians(incl)) * np.sqrt((q * (1 - e)) / (5.204 * (1 + e)))
+        mask &= (tj >= cutoffs["tj_min"]) & (tj <= cutoffs["tj_max"])
+    return mask
+
+
+class TestSynthetic:
+    def test_orbits_match_their_class(self):
+        orbits = make_orbits(5000, seed=3)
+
+        for class_name in ["MBA", "NEO", "TNO", "LPC", "Jtrojan", "Centaur"]:
+            members = orbits[orbits["class_name"] == class_name]
+            assert len(members) > 0
+            assert in_class(members, class_name).mean() > 0.95
+
+    def test_observations_dp1(self):
+        orbits = make_orbits(100, seed=3)
+        observations = make_observations(orbits, catalog="dp1", obs_per_object=10.0, seed=3)
+
+        assert set(observations["ssObjectId"]) == set(orbits["ssObjectId"])
+        assert {"apFlux", "apFlux_flag", "apFluxErr", "band"} <= set(observations.columns)
+        assert (observations["apFlux"] > 0).all()
+
+
+class TestLocalTAP:
+    @pytest.mark.parametrize("class_name", list(ORBITAL_CLASS_CUTOFFS))
+    def test_class_query(self, local_tap, class_name):
+        orbits = local_tap.tables[("dp1", "MPCORB")]
+        query, _ = make_query("dp1", class_name = class_name)
+        table = run_query(query, class_name, "dp1", to_pandas = True)
+
+        expected = orbits[in_class(orbits, class_name)]
+        assert sorted(table["ssObjectID"]) == sorted(expected["ssObjectId"])
+
+    def test_join_query(self, local_tap):
+        observations = local_tap.tables[("dp03_catalogs_10yr", "DiaSource")]
+        orbits = local_tap.tables[("dp03_catalogs_10yr", "MPCORB")]
+        query, _ = make_query("dp03_catalogs_10yr", class_name = "NEO", join = "DiaSource")
+        table = run_query(query, "NEO", "dp03_catalogs_10yr", to_pandas = True)
+
+        neo_ids = orbits[in_class(orbits, "NEO")]["ssObjectId"]
+        assert len(table) == observations["ssObjectId"].isin(neo_ids).sum()
+        assert {"magTrueVband", "band", "a", "class_name"} <= set(table.columns)
+
+    def test_multiclass_query(self, local_tap):
+        orbits = local_tap.tables[("dp1", "MPCORB")]
+        query, classes = make_multiclass_query("dp1")
+        table = run_query(query, None, "dp1", to_pandas = True)
+
+        for class_name in classes:
+            assert table[f"is_{class_name}"].sum() == in_class(orbits, class_name).sum()
+
+    def test_run_queries(self, local_tap):
+        queries = [make_query("dp1", class_name = class_name, limit = 10) for class_name in ["NEO", "MBA"]]
+        results = run_queries(queries, "dp1", to_pandas = True)
+
+        assert len(results["MBA"]) == 10
+
+    def test_schema_lookup(self, local_tap):
+        assert "apFlux" in cache.schema_cache.get_columns("dp1", "DiaSource")
+
+    def test_query_error(self, local_tap):
+        with pytest.raises(DALQueryError):
+            run_query("SELECT nonexistent FROM dp1.MPCORB;", "NEO", "dp1")
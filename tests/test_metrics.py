@@ -0,0 +1,100 @@
+import io
+import json
+import numpy as np
+import pytest
+from astropy.table import Table
+from pyvo.dal.tap import AsyncTAPJob
+from sso_query import metrics
+from sso_query.metrics import JobMetrics, JsonLinesHook
+from sso_query.query import _fetch_result, make_query, run_query
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=500, obs_per_object=2.0, catalogs=["dp1"], seed=1)
+
+
+@pytest.fixture(autouse=True)
+def isolated():
+    yield
+    metrics.clear_hooks()
+
+
+class FakeResponse:
+    def __init__(self, content):
+        self.raw = self
+        self._buffer = io.BytesIO(content)
+
+    def raise_for_status(self):
+        pass
+
+    def read(self, size = -1, decode_content = True):
+        return self._buffer.read(size)
+
+
+class FakeSession:
+    def __init__(self, content):
+        self.content = content
+
+    def get(self, url, stream = False):
+        return FakeResponse(self.content)
+
+
+class FakePyvoJob(AsyncTAPJob):
+    def __init__(self, session):
+        self._session = session
+
+    @property
+    def result_uri(self):
+        return "https://example.org/tap/async/1/results/result"
+
+
+class TestRunQueryMetrics:
+    def test_hooks_and_attached_metrics(self, local_tap, tmp_path):
+        seen = []
+        metrics.add_hook(seen.append)
+        metrics.add_hook(JsonLinesHook(str(tmp_path / "metrics.jsonl")))
+        query, _ = make_query("dp1", class_name="MBA", join="DiaSource")
+        table = run_query(query, "MBA", "dp1", to_pandas=True, partitions=2)
+
+        assert len(seen) == 1
+        query_metrics = seen[0]
+        assert query_metrics.rows == len(table)
+        assert len(query_metrics.jobs) == 2
+        assert all(job.phase == "COMPLETED" and job.executing_seconds is not None for job in query_metrics.jobs)
+        assert sum(job.rows for job in query_metrics.jobs) == len(table)
+        assert set(query_metrics.breakdown()) == {"queued", "executing", "download", "parse", "convert", "total"}
+        assert table.attrs["metrics"]["rows"] == len(table)
+        line = json.loads((tmp_path / "metrics.jsonl").read_text().splitlines()[0])
+        assert line["breakdown"]["total"] == query_metrics.total_seconds
+
+    def test_failed_job_is_reported(self, local_tap):
+        seen = []
+        metrics.add_hook(seen.append)
+        with pytest.raises(Exception):
+            run_query("SELECT nonexistent FROM dp1.MPCORB;", "NEO", "dp1")
+
+        assert seen[0].jobs[0].phase == "ERROR"
+        assert seen[0].jobs[0].error is not None
+
+    def test_failing_hook_warns(self, local_tap):
+        def broken(query_metrics):
+            raise RuntimeError("no disk")
+        metrics.add_hook(broken)
+        query, _ = make_query("dp1", class_name="NEO", limit=5)
+
+        with pytest.warns(UserWarning, match="no disk"):
+            table = run_query(query, "NEO", "dp1")
+        assert len(table) == 5
+
+
+class TestFetchResult:
+    def test_pyvo_download_and_parse_split(self):
+        content = io.BytesIO()
+        Table({"q": np.arange(100.0), "e": np.zeros(100)}).write(content, format="votable")
+        record = JobMetrics("SELECT q, e FROM MPCORB")
+
+        result = _fetch_result(FakePyvoJob(FakeSession(content.getvalue())), record)
+        assert len(result) == 100
+        assert record.bytes == len(content.getvalue())
+        assert record.download_seconds >= 0 and record.parse_seconds > 0
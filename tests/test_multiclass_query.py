@@ -0,0 +1,30 @@
+import pytest
+from sso_query.query import ORBITAL_CLASS_CUTOFFS, make_multiclass_query
+
+
+class TestMulticlassQuery:
+    def test_two_classes(self):
+        expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, CASE WHEN mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e) THEN 'NEO' WHEN mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e) THEN 'MBA' END AS class_name, CASE WHEN mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e) THEN 1 ELSE 0 END AS is_NEO, CASE WHEN mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e) THEN 1 ELSE 0 END AS is_MBA FROM dp03_catalogs_10yr.MPCORB AS mpc
+    WHERE (mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e)) OR (mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e));"""
+
+        query, classes = make_multiclass_query("dp03_catalogs_10yr", classes = ["NEO", "MBA"])
+        assert expected_query == query
+        assert classes == ["NEO", "MBA"]
+
+    def test_all_classes_default(self):
+        query, classes = make_multiclass_query("dp1", limit = 10)
+
+        assert classes == list(ORBITAL_CLASS_CUTOFFS)
+        assert query.count("FROM dp1.MPCORB") == 1
+        for class_name in ORBITAL_CLASS_CUTOFFS:
+            assert f"AS is_{class_name}" in query
+        assert "COS(RADIANS(mpc.incl))" in query
+        assert query.endswith("\n    LIMIT 10;")
+
+    def test_invalid_class(self):
+        with pytest.raises(ValueError):
+            make_multiclass_query("dp1", classes = ["NEO", "Vulcanoid"])
+
+    def test_invalid_catalog(self):
+        with pytest.raises(ValueError):
+            make_multiclass_query("dp02", classes = ["NEO"])
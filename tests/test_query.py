@@ -15,56 +15,56 @@ class TestQuery_DP03:
     ############### TYPE GIVEN, NO JOIN ###############
     def test_neo_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "NEO")
         assert expected_query == query
 
     def test_MBA_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "MBA")
         assert expected_query == query
 
     def test_jfc_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "JFC")
         assert expected_query == query
 
     def test_lpc_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "LPC")
         assert expected_query == query
 
     def test_centaurs_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Centaur")
         assert expected_query == query
 
     def test_tno_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "TNO")
         assert expected_query == query
 
     def test_jtrojan_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Jtrojan")
         assert expected_query == query
 
     def test_ntrojan_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Ntrojan")
         assert expected_query == query
@@ -75,7 +75,7 @@ class TestQuery_DP03:
     ############### PARAMS GIVEN, NO JOIN ###############
     def test_neos_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
         expected_class_name = "NEO"
 
         cutoffs = {"q_max": 1.3, "a_max": 4.0, "e_max": 1.0}
@@ -86,7 +86,7 @@ class TestQuery_DP03:
 
     def test_MBA_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
         expected_class_name = "MBA"
 
         cutoffs = {"q_min": 1.66, "a_min": 2.0, "a_max": 3.2}
@@ -97,7 +97,7 @@ class TestQuery_DP03:
 
     def test_jfc_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
         expected_class_name = "JFC"
 
         cutoffs = {"tj_min": 2.0, "tj_max": 3.0}
@@ -108,7 +108,7 @@ class TestQuery_DP03:
 
     def test_lpc_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
         expected_class_name = "LPC"
 
         cutoffs = {"a_min": 50.0}
@@ -119,7 +119,7 @@ class TestQuery_DP03:
 
     def test_centaurs_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
         expected_class_name = "Centaur"
 
         cutoffs = {"a_min": 5.5, "a_max": 30.1}
@@ -131,7 +131,7 @@ class TestQuery_DP03:
 
     def test_tno_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
         expected_class_name = "TNO"
 
         cutoffs = {"a_min": 30.1, "a_max": 50.0}
@@ -143,7 +143,7 @@ class TestQuery_DP03:
 
     def test_jtrojans_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
         expected_class_name = "Jtrojan"
 
         cutoffs = {"a_min": 4.8, "a_max": 5.4, "e_max": 0.3}
@@ -154,7 +154,7 @@ class TestQuery_DP03:
 
     def test_ntrojans_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp03_catalogs_10yr.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
         expected_class_name = "Ntrojan"
 
         cutoffs = {"a_min": 29.8, "a_max": 30.4}
@@ -170,7 +170,7 @@ class TestQuery_DP03:
     def test_neo_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "NEO", join = 'DiaSource')
         assert expected_query == query
@@ -178,7 +178,7 @@ class TestQuery_DP03:
     def test_MBA_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "MBA", join = 'DiaSource')
         assert expected_query == query
@@ -186,7 +186,7 @@ class TestQuery_DP03:
     def test_jfc_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "JFC", join = 'DiaSource')
         assert expected_query == query
@@ -194,7 +194,7 @@ class TestQuery_DP03:
     def test_lpc_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "LPC", join = 'DiaSource')
         assert expected_query == query
@@ -202,7 +202,7 @@ class TestQuery_DP03:
     def test_centaur_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Centaur", join = 'DiaSource')
         assert expected_query == query
@@ -210,7 +210,7 @@ class TestQuery_DP03:
     def test_tno_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "TNO", join = 'DiaSource')
         assert expected_query == query
@@ -218,7 +218,7 @@ class TestQuery_DP03:
     def test_jtrojan_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Jtrojan", join = 'DiaSource')
         assert expected_query == query
@@ -226,7 +226,7 @@ class TestQuery_DP03:
     def test_ntrojan_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp03_catalogs_10yr", class_name = "Ntrojan", join = 'DiaSource')
         assert expected_query == query
@@ -238,7 +238,7 @@ class TestQuery_DP03:
     def test_neos_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
 
         expected_class_name = "NEO"
 
@@ -251,7 +251,7 @@ class TestQuery_DP03:
     def test_MBA_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
         expected_class_name = "MBA"
 
         cutoffs = {"q_min": 1.66, "a_min": 2.0, "a_max": 3.2}
@@ -263,7 +263,7 @@ class TestQuery_DP03:
     def test_jfc_param_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         expected_class_name = "JFC"
 
@@ -276,7 +276,7 @@ class TestQuery_DP03:
     def test_lpc_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, dias.magTrueVband, dias.band FROM dp03_catalogs_10yr.MPCORB as mpc
     INNER JOIN dp03_catalogs_10yr.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 50;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
         expected_object_type = "LPC"
 
         cutoffs = {"a_min": 50.0}
@@ -288,7 +288,7 @@ class TestQuery_DP03:
         def test_centaurs_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
         expected_class_name = "Centaur"
 
         cutoffs = {"a_min": 5.5, "a_max": 30.1}
@@ -300,7 +300,7 @@ class TestQuery_DP03:
     def test_tno_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
         expected_class_name = "TNO"
 
         cutoffs = {"a_min": 30.1, "a_max": 50.0}
@@ -312,7 +312,7 @@ class TestQuery_DP03:
     def test_jtrojans_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
         expected_class_name = "Jtrojan"
 
         cutoffs = {"a_min": 4.8, "a_max": 5.4, "e_max": 0.3}
@@ -324,7 +324,7 @@ class TestQuery_DP03:
     def test_ntrojans_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.g_H, sso.r_H, sso.i_H, sso.discoverySubmissionDate, sso.numObs, (sso.g_H - sso.r_H) AS g_r_color, (sso.r_H - sso.i_H) AS r_i_color FROM dp03_catalogs_10yr.MPCORB AS mpc
     INNER JOIN dp03_catalogs_10yr.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
         expected_class_name = "Ntrojan"
 
         cutoffs = {"a_min": 29.8, "a_max": 30.4}
@@ -340,56 +340,56 @@ class TestQuery_DP1:
     ############### TYPE GIVEN, NO JOIN ###############
     def test_DP1_neo_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "NEO")
         assert expected_query == query
 
     def test_DP1_MBA_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "MBA")
         assert expected_query == query
 
     def test_DP1_jfc_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         query, class_name = make_query("dp1", class_name = "JFC")
         assert expected_query == query
 
     def test_DP1_lpc_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "LPC")
         assert expected_query == query
     
     def test_DP1_centaurs_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Centaur")
         assert expected_query == query
 
     def test_DP1_tno_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "TNO")
         assert expected_query == query
 
     def test_DP1_jtrojan_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Jtrojan")
         assert expected_query == query
 
     def test_DP1_ntrojan_type_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Ntrojan")
         assert expected_query == query
@@ -399,7 +399,7 @@ class TestQuery_DP1:
     ############### PARAMS GIVEN, NO JOIN ###############
     def test_DP1_neos_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
         expected_class_name = "NEO"
 
         cutoffs = {"q_max": 1.3, "a_max": 4.0, "e_max": 1.0}
@@ -410,7 +410,7 @@ class TestQuery_DP1:
 
     def test_DP1_MBA_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
         expected_class_name = "MBA"
 
         cutoffs = {"q_min": 1.66, "a_min": 2.0, "a_max": 3.2}
@@ -421,7 +421,7 @@ class TestQuery_DP1:
 
     def test_DP1_jfc_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
         expected_class_name = "JFC"
 
         cutoffs = {"tj_min": 2.0, "tj_max": 3.0}
@@ -432,7 +432,7 @@ class TestQuery_DP1:
 
     def test_DP1_lpc_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
         expected_class_name = "LPC"
 
         cutoffs = {"a_min": 50.0}
@@ -443,7 +443,7 @@ class TestQuery_DP1:
         
     def test_DP1_centaurs_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
         expected_class_name = "Centaur"
 
         cutoffs = {"a_min": 5.5, "a_max": 30.1}
@@ -455,7 +455,7 @@ class TestQuery_DP1:
         
     def test_DP1_tno_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
         expected_class_name = "TNO"
 
         cutoffs = {"a_min": 30.1, "a_max": 50.0}
@@ -467,7 +467,7 @@ class TestQuery_DP1:
 
     def test_DP1_jtrojans_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
         expected_class_name = "Jtrojan"
 
         cutoffs = {"a_min": 4.8, "a_max": 5.4, "e_max": 0.3}
@@ -478,7 +478,7 @@ class TestQuery_DP1:
 
     def test_DP1_ntrojans_params_no_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation FROM dp1.MPCORB AS mpc
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
         expected_class_name = "Ntrojan"
 
         cutoffs = {"a_min": 29.8, "a_max": 30.4}
@@ -493,7 +493,7 @@ class TestQuery_DP1:
     def test_DP1_neos_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
         expected_class_name = "NEO"
 
         cutoffs = {"q_max": 1.3, "a_max": 4.0, "e_max": 1.0}
@@ -505,7 +505,7 @@ class TestQuery_DP1:
     def test_DP1_MBA_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
         expected_class_name = "MBA"
 
         cutoffs = {"q_min": 1.66, "a_min": 2.0, "a_max": 3.2}
@@ -517,7 +517,7 @@ class TestQuery_DP1:
     def test_DP1_jfc_param_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         expected_class_name = "JFC"
 
@@ -530,7 +530,7 @@ class TestQuery_DP1:
     def test_DP1_lpc_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
         expected_class_name = "LPC"
 
         cutoffs = {"a_min": 50.0}
@@ -542,7 +542,7 @@ class TestQuery_DP1:
     def test_DP1_centaurs_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
         expected_class_name = "Centaur"
 
         cutoffs = {"a_min": 5.5, "a_max": 30.1}
@@ -554,7 +554,7 @@ class TestQuery_DP1:
     def test_DP1_tno_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
         expected_class_name = "TNO"
 
         cutoffs = {"a_min": 30.1, "a_max": 50.0}
@@ -566,7 +566,7 @@ class TestQuery_DP1:
     def test_DP1_jtrojans_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
         expected_class_name = "Jtrojan"
 
         cutoffs = {"a_min": 4.8, "a_max": 5.4, "e_max": 0.3}
@@ -578,7 +578,7 @@ class TestQuery_DP1:
     def test_DP1_ntrojans_params_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, dias.apFlux, dias.apFlux_flag, dias.apFluxErr, dias.band FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.DiaSource AS dias ON mpc.ssObjectId = dias.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
         expected_class_name = "Ntrojan"
 
         cutoffs = {"a_min": 29.8, "a_max": 30.4}
@@ -592,7 +592,7 @@ class TestQuery_DP1:
     def test_DP1_neo_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q/(1-mpc.e) < 4.0;"""
+    WHERE mpc.q < 1.3 AND mpc.e < 1.0 AND mpc.q < 4.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "NEO", cutoffs = None, join = 'SSObject')
         assert expected_query == query
@@ -600,7 +600,7 @@ class TestQuery_DP1:
     def test_DP1_MBA_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q > 1.66 AND mpc.q/(1-mpc.e) > 2.0 AND mpc.q/(1-mpc.e) < 3.2;"""
+    WHERE mpc.q > 1.66 AND mpc.q < 3.2 AND mpc.e < 0.481251 AND mpc.q > 2.0 * (1 - mpc.e) AND mpc.q < 3.2 * (1 - mpc.e);"""
         
         query, class_name = make_query("dp1", class_name = "MBA", join = 'SSObject')
         assert expected_query == query
@@ -608,7 +608,7 @@ class TestQuery_DP1:
     def test_DP1_jfc_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE (mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e)) >= 0 AND (5.204 * (1 - mpc.e)) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT((mpc.q * (1 - mpc.e)) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
+    WHERE mpc.e <= 1.0 AND 5.204 * (1 - mpc.e) / mpc.q + 2 * COS(RADIANS(mpc.incl)) * SQRT(mpc.q * (1 - mpc.e) / (5.204 * (1 + mpc.e))) BETWEEN 2.0 AND 3.0;"""
 
         query, class_name = make_query("dp1", class_name = "JFC", join = 'SSObject')
         assert expected_query == query
@@ -616,7 +616,7 @@ class TestQuery_DP1:
     def test_DP1_lpc_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 50.0;"""
+    WHERE mpc.e < 1.0 AND mpc.q > 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "LPC", join = 'SSObject')
         assert expected_query == query
@@ -624,7 +624,7 @@ class TestQuery_DP1:
     def test_DP1_centaur_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 5.5 AND mpc.q/(1-mpc.e) < 30.1;"""
+    WHERE mpc.q < 30.1 AND mpc.e < 1.0 AND mpc.q > 5.5 * (1 - mpc.e) AND mpc.q < 30.1 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Centaur", join = 'SSObject')
         assert expected_query == query
@@ -632,7 +632,7 @@ class TestQuery_DP1:
     def test_DP1_tno_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 30.1 AND mpc.q/(1-mpc.e) < 50.0;"""
+    WHERE mpc.q < 50.0 AND mpc.e < 1.0 AND mpc.q > 30.1 * (1 - mpc.e) AND mpc.q < 50.0 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "TNO", join = 'SSObject')
         assert expected_query == query
@@ -640,7 +640,7 @@ class TestQuery_DP1:
     def test_DP1_jtrojan_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.e < 0.3 AND mpc.q/(1-mpc.e) > 4.8 AND mpc.q/(1-mpc.e) < 5.4;"""
+    WHERE mpc.q > 3.36 AND mpc.q < 5.4 AND mpc.e < 0.3 AND mpc.q > 4.8 * (1 - mpc.e) AND mpc.q < 5.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Jtrojan", join = 'SSObject')
         assert expected_query == query
@@ -648,7 +648,7 @@ class TestQuery_DP1:
     def test_DP1_ntrojan_type_join(self):
         expected_query = f"""SELECT mpc.incl, mpc.q, mpc.e, mpc.ssObjectID, mpc.mpcDesignation, sso.discoverySubmissionDate, sso.numObs FROM dp1.MPCORB AS mpc
     INNER JOIN dp1.SSObject AS sso ON mpc.ssObjectId = sso.ssObjectId
-    WHERE mpc.q/(1-mpc.e) > 29.8 AND mpc.q/(1-mpc.e) < 30.4;"""
+    WHERE mpc.q < 30.4 AND mpc.e < 1.0 AND mpc.q > 29.8 * (1 - mpc.e) AND mpc.q < 30.4 * (1 - mpc.e);"""
 
         query, class_name = make_query("dp1", class_name = "Ntrojan", join = 'SSObject')
         assert expected_query == query
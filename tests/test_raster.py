@@ -0,0 +1,41 @@
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from sso_query import plots
+
+
+def orbits(n):
+    rng = np.random.default_rng(0)
+    return pd.DataFrame({
+        "a": rng.uniform(2.0, 3.0, n),
+        "e": rng.uniform(0.0, 0.3, n),
+        "incl": rng.uniform(0.0, 20.0, n),
+        "class_name": rng.choice(["MBA", "NEO"], n)
+    })
+
+
+class TestRasterPanel:
+    def test_counts_and_colors(self):
+        fig, ax = plt.subplots()
+        colors = {"MBA": (1.0, 0.0, 0.0), "NEO": (0.0, 0.0, 1.0)}
+        x, y = np.array([0.1, 0.1, 0.9, np.nan]), np.array([0.1, 0.1, 0.9, 0.5])
+
+        plots._raster_panel(ax, x, y, ["MBA", "MBA", "NEO", "NEO"], colors, extent=(0, 1, 0, 1), size=(2, 2))
+        image = ax.get_images()[0].get_array()
+        assert np.isclose(image[0, 0, 3], 0.75) # two overlapping points of alpha 0.5
+        assert np.allclose(image[1, 1], [0.0, 0.0, 1.0, 0.5])
+        assert image[0, 1, 3] == 0.0
+        assert [text.get_text() for text in ax.legend().get_texts()] == ["MBA", "NEO"]
+        plt.close(fig)
+
+    def test_automatic_threshold(self, monkeypatch):
+        monkeypatch.setattr(plots, "RASTER_THRESHOLD", 1000)
+        monkeypatch.setattr(plt, "show", lambda: None)
+
+        plots.scatter_plots(orbits(500))
+        assert all(len(ax.get_images()) == 0 for ax in plt.gcf().axes)
+        plots.scatter_plots(orbits(5000))
+        assert all(len(ax.get_images()) == 1 for ax in plt.gcf().axes)
+        plt.close("all")
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from sso_query import services
+from sso_query.cache import ResultCache
+from sso_query.local_tap import LocalTAPService
+from sso_query.query import make_query, refresh_query, run_query
+from sso_query.synthetic import make_observations, make_orbits, make_ssobjects
+
+
+@pytest.fixture
+def local_tap(): # per test, since the tests grow the catalog
+    service = LocalTAPService(n_objects=1000, obs_per_object=3.0, catalogs=["dp03_catalogs_10yr"], seed=2).install()
+    yield service
+    services.clear_services()
+
+
+def grow(service, n_objects, seed):
+    """
+    Appends n_objects new objects (with higher ids and later discovery dates) to the local catalog.
+    """
+    catalog = "dp03_catalogs_10yr"
+    orbits = make_orbits(n_objects, seed=seed)
+    orbits["ssObjectId"] += service.tables[(catalog, "MPCORB")]["ssObjectId"].max() + 1000
+    observations = make_observations(orbits, catalog=catalog, obs_per_object=3.0, seed=seed)
+    ssobjects = make_ssobjects(orbits, observations, catalog=catalog, seed=seed)
+    ssobjects["discoverySubmissionDate"] += service.tables[(catalog, "SSObject")]["discoverySubmissionDate"].max()
+    for table, new_rows in (("MPCORB", orbits.drop(columns="class_name")), ("DiaSource", observations), ("SSObject", ssobjects)):
+        service.load_table(catalog, table, pd.concat([service.tables[(catalog, table)], new_rows], ignore_index=True))
+
+
+class TestRefreshQuery:
+    @pytest.mark.parametrize("join", ["DiaSource", "SSObject"])
+    def test_refresh_matches_full_run(self, local_tap, tmp_path, capsys, join):
+        cache = ResultCache(path=str(tmp_path))
+        query, _ = make_query("dp03_catalogs_10yr", class_name="MBA", join=join)
+        first = refresh_query(query, "MBA", "dp03_catalogs_10yr", to_pandas=True, cache=cache)
+        watermark = cache.watermark(query, "dp03_catalogs_10yr")
+        assert watermark["column"] == ("discoverySubmissionDate" if join == "SSObject" else "ssObjectId")
+
+        grow(local_tap, 200, seed=5)
+        capsys.readouterr()
+        refreshed = refresh_query(query, "MBA", "dp03_catalogs_10yr", to_pandas=True, cache=cache)
+        expected = run_query(query, "MBA", "dp03_catalogs_10yr", to_pandas=True)
+
+        columns = list(expected.columns)
+        assert len(refreshed) > len(first)
+        pd.testing.assert_frame_equal(refreshed[columns].sort_values(columns, ignore_index=True),
+                                      expected.sort_values(columns, ignore_index=True), check_dtype=False)
+        fetched = int(capsys.readouterr().out.split("Fetched ")[1].split()[0])
+        assert fetched < len(expected) / 2 # only the rows past the watermark
+        assert cache.watermark(query, "dp03_catalogs_10yr")["value"] > watermark["value"]
+        if join == "SSObject": # objects without a discovery date are tracked on their ssObjectId
+            assert cache.watermark(query, "dp03_catalogs_10yr")["undated_id"] > watermark["undated_id"]
+
+    def test_refresh_without_changes(self, local_tap, tmp_path):
+        cache = ResultCache(path=str(tmp_path))
+        query, _ = make_query("dp03_catalogs_10yr", class_name="NEO")
+        first = refresh_query(query, "NEO", "dp03_catalogs_10yr", to_pandas=True, cache=cache)
+        again = refresh_query(query, "NEO", "dp03_catalogs_10yr", to_pandas=True, cache=cache)
+
+        assert sorted(again["ssObjectID"]) == sorted(first["ssObjectID"])
+
+    def test_needs_cache(self, local_tap):
+        query, _ = make_query("dp03_catalogs_10yr", class_name="NEO")
+        with pytest.raises(ValueError):
+            refresh_query(query, "NEO", "dp03_catalogs_10yr", cache=False)
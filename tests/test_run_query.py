@@ -0,0 +1,263 @@
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pytest
+from astropy.io.votable import from_table
+from astropy.table import Table
+from pyvo.dal import TAPResults
+import sso_query.query as query
+from sso_query.cache import ResultCache
+from sso_query.query import iter_query, run_queries, run_query
+
+
+class FakeJob:
+    def __init__(self, service, query_string):
+        self.service = service
+        self.query_string = query_string
+        self.phase = "PENDING"
+
+    def run(self):
+        with self.service.lock:
+            self.service.running += 1
+            self.service.max_running = max(self.service.max_running, self.service.running)
+        self.phase = "EXECUTING"
+
+    def wait(self, phases=None):
+        time.sleep(self.service.delay)
+        with self.service.lock:
+            self.service.running -= 1
+        self.phase = "COMPLETED"
+
+    def raise_if_error(self):
+        pass
+
+    def fetch_result(self):
+        return TAPResults(from_table(Table({"incl": [1.0, 2.0], "q": [1.0, 2.0], "e": [0.5, 0.0], "ssObjectID": [1, 2]})))
+
+
+class FakeJobService:
+    def __init__(self, delay=0.0):
+        self.delay = delay
+        self.lock = threading.Lock()
+        self.running = 0
+        self.max_running = 0
+        self.submitted = []
+
+    def submit_job(self, query_string):
+        self.submitted.append(query_string)
+        return FakeJob(self, query_string)
+
+
+@pytest.fixture
+def fake_service(monkeypatch):
+    service = FakeJobService(delay=0.2)
+    monkeypatch.setattr(query, "get_service", lambda catalog: service)
+    return service
+
+
+class TestRunQuery:
+    def test_run_query_adds_columns(self, fake_service):
+        table = run_query("SELECT 1", "MBA", "dp1", to_pandas = True)
+
+        assert isinstance(table, pd.DataFrame)
+        assert table['a'].tolist() == [2.0, 2.0]
+        assert table['class_name'].tolist() == ["MBA", "MBA"]
+
+    def test_run_queries_keyed_by_class(self, fake_service):
+        queries = [(f"SELECT {i}", class_name) for i, class_name in enumerate(["NEO", "MBA", "TNO"])]
+        results = run_queries(queries, "dp1")
+
+        assert sorted(results) == ["MBA", "NEO", "TNO"]
+        assert isinstance(results["NEO"], Table)
+        assert list(results["TNO"]['class_name']) == ["TNO", "TNO"]
+        assert sorted(fake_service.submitted) == ["SELECT 0", "SELECT 1", "SELECT 2"]
+
+    def test_run_queries_concurrent(self, fake_service):
+        queries = [(f"SELECT {i}", f"class_{i}") for i in range(4)]
+        start = time.perf_counter()
+        run_queries(queries, "dp1", max_jobs = 4)
+
+        assert time.perf_counter() - start < 4 * fake_service.delay
+        assert fake_service.max_running > 1
+
+    def test_run_queries_limit(self, fake_service):
+        queries = [(f"SELECT {i}", f"class_{i}") for i in range(6)]
+        run_queries(queries, "dp1", max_jobs = 2)
+
+        assert fake_service.max_running <= 2
+
+    def test_run_queries_duplicate_class(self, fake_service):
+        with pytest.raises(ValueError):
+            run_queries([("SELECT 1", "NEO"), ("SELECT 2", "NEO")], "dp1")
+
+    def test_run_query_cache(self, fake_service, tmp_path):
+        results = ResultCache(path=str(tmp_path))
+        first = run_query("SELECT 1", "MBA", "dp1", to_pandas = True, cache = results)
+        second = run_query("SELECT 1", "MBA", "dp1", to_pandas = True, cache = results)
+
+        pd.testing.assert_frame_equal(first, second)
+        assert fake_service.submitted == ["SELECT 1"]
+        assert results.stats()["hits"] == 1
+
+
+class FakePagingService:
+    """
+    Serves pages of a DiaSource-like table (several rows per object) for the queries written by iter_query.
+    """
+    def __init__(self, rows_per_object):
+        ids = [object_id for object_id, count in enumerate(rows_per_object) for _ in range(count)]
+        self.table = pd.DataFrame({"incl": 1.0, "q": 1.0, "e": 0.5, "ssObjectID": ids, "band": "r"})
+        self.submitted = []
+
+    def submit_job(self, query_string):
+        self.submitted.append(query_string)
+        rows = self.table
+        if match := re.search(r"mpc.ssObjectId >= (\d+)", query_string):
+            rows = rows[rows["ssObjectID"] >= int(match.group(1))]
+        if match := re.search(r"mpc.ssObjectId = (\d+)", query_string):
+            rows = rows[rows["ssObjectID"] == int(match.group(1))]
+        if match := re.search(r"LIMIT (\d+)", query_string):
+            rows = rows.iloc[:int(match.group(1))]
+        return FakeDoneJob(TAPResults(from_table(Table.from_pandas(rows))))
+
+
+class FakeDoneJob:
+    def __init__(self, result):
+        self.result = result
+        self.phase = "PENDING"
+
+    def run(self):
+        pass
+
+    def wait(self, phases=None):
+        self.phase = "COMPLETED"
+
+    def fetch_result(self):
+        return self.result
+
+
+class TestIterQuery:
+    def test_chunks_keep_objects_whole(self, monkeypatch):
+        service = FakePagingService([3, 1, 4, 2, 2, 5, 1])
+        monkeypatch.setattr(query, "get_service", lambda catalog: service)
+        chunks = list(iter_query("SELECT mpc.ssObjectID FROM dp1.MPCORB AS mpc\n    WHERE mpc.q < 1.3;", "NEO", chunk_size = 5))
+
+        combined = pd.concat(chunks, ignore_index=True)
+        assert all(len(chunk) <= 5 for chunk in chunks)
+        assert combined["ssObjectID"].tolist() == service.table["ssObjectID"].tolist()
+        assert set(combined["class_name"]) == {"NEO"}
+        assert "a" in combined.columns
+        for first, second in zip(chunks, chunks[1:]):
+            assert first["ssObjectID"].max() < second["ssObjectID"].min()
+        assert "WHERE (mpc.q < 1.3) AND mpc.ssObjectId >= " in service.submitted[1]
+
+    def test_object_larger_than_chunk(self, monkeypatch):
+        service = FakePagingService([2, 7, 1])
+        monkeypatch.setattr(query, "get_service", lambda catalog: service)
+        chunks = list(iter_query("SELECT mpc.ssObjectID FROM dp1.MPCORB AS mpc\n    WHERE mpc.q < 1.3;", "NEO", chunk_size = 4))
+
+        combined = pd.concat(chunks, ignore_index=True)
+        assert combined["ssObjectID"].tolist() == service.table["ssObjectID"].tolist()
+
+    def test_limit_rejected(self):
+        with pytest.raises(ValueError):
+            next(iter_query("SELECT mpc.q FROM dp1.MPCORB AS mpc\n    WHERE mpc.q < 1.3\n    LIMIT 5;", "NEO"))
+
+
+class FakePartitionService:
+    """
+    Answers the log10(q) COUNT preflight and the mpc.q range jobs written for partitioned run_query calls.
+    """
+    def __init__(self, q_values):
+        self.table = pd.DataFrame({"incl": 1.0, "q": q_values, "e": 0.1, "ssObjectID": range(len(q_values))})
+        self.searches = []
+        self.submitted = []
+        self.returned = []
+
+    def search(self, query_string):
+        self.searches.append(query_string)
+        q_bin = np.floor(query.Q_BINS_PER_DEX * np.log10(self.table["q"]))
+        counts = q_bin.value_counts().rename_axis("q_bin").reset_index(name="n")
+        return TAPResults(from_table(Table.from_pandas(counts)))
+
+    def submit_job(self, query_string):
+        self.submitted.append(query_string)
+        rows = self.table
+        if match := re.search(r"mpc.q >= ([\d.e+-]+)", query_string):
+            rows = rows[rows["q"] >= float(match.group(1))]
+        if match := re.search(r"mpc.q < ([\d.e+-]+)", query_string):
+            rows = rows[rows["q"] < float(match.group(1))]
+        self.returned.append(len(rows))
+        return FakeDoneJob(TAPResults(from_table(Table.from_pandas(rows))))
+
+
+class TestPartitionedQuery:
+    def test_partition_edges_balanced(self):
+        q_bins = np.arange(10)
+        counts = np.full(10, 100)
+        edges = query._partition_edges(q_bins, counts, 4)
+
+        assert len(edges) == 3
+        assert edges == sorted(edges)
+        assert edges[0] == pytest.approx(10 ** (3 / query.Q_BINS_PER_DEX))
+
+    def test_partition_edges_coarse(self):
+        assert query._partition_edges([0], [100], 4) == []
+
+    def test_partitioned_run_query(self, monkeypatch):
+        rng = np.random.default_rng(42)
+        service = FakePartitionService(10 ** rng.uniform(-0.5, 2.0, 2000))
+        monkeypatch.setattr(query, "get_service", lambda catalog: service)
+        table = run_query("SELECT mpc.q, mpc.e FROM dp1.MPCORB AS mpc\n    WHERE mpc.q > 0.1;", "MBA", "dp1", to_pandas = True, partitions = 4)
+
+        assert len(service.searches) == 1
+        assert len(service.submitted) == 4
+        assert sorted(table["ssObjectID"]) == list(range(2000))
+        assert max(service.returned) < 1.5 * 2000 / 4
+        assert table["class_name"].unique().tolist() == ["MBA"]
+
+
+class TestReturnFormat:
+    def make_result(self):
+        return Table({"q": np.ma.array([1.0, 2.0, 3.0], mask=[False, True, False]), "e": [0.5, 0.0, 0.25],
+                      "ssObjectID": np.ma.array([1, 2, 3], mask=[False, False, True]), "band": ["g", "r", "i"]})
+
+    def test_pandas(self):
+        table = query._format_result(self.make_result(), "MBA", "pandas")
+
+        assert isinstance(table, pd.DataFrame)
+        assert table['a'].tolist()[0] == 2.0
+        assert np.isnan(table['q'][1])
+        assert table['ssObjectID'].isna().tolist() == [False, False, True]
+        assert table['band'].tolist() == ["g", "r", "i"]
+
+    def test_pandas_shares_memory(self):
+        result = Table({"q": [1.0, 2.0], "e": [0.5, 0.0]})
+        table = query._format_result(result, "MBA", "pandas")
+
+        assert np.shares_memory(table['e'].to_numpy(), result['e'].data)
+        table.loc[0, 'e'] = 0.1 # still writable
+
+    def test_arrow(self):
+        table = query._format_result(self.make_result(), "MBA", "arrow")
+
+        assert isinstance(table, pa.Table)
+        assert table.column('q').null_count == 1
+        assert table.column('class_name').to_pylist() == ["MBA"] * 3
+
+    def test_astropy_and_numpy(self):
+        table = query._format_result(self.make_result(), "MBA", "astropy")
+        array = query._format_result(self.make_result(), "MBA", "numpy-structured")
+
+        assert isinstance(table, Table)
+        assert list(table['class_name']) == ["MBA"] * 3
+        assert isinstance(array, np.ndarray)
+        assert array.dtype.names[-2:] == ('a', 'class_name')
+
+    def test_invalid_format(self, fake_service):
+        with pytest.raises(ValueError):
+            run_query("SELECT 1", "MBA", "dp1", return_format = "csv")
@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+import sso_query.services as services
+
+
+class FakeService:
+    def __init__(self, name):
+        self.name = name
+
+
+@pytest.fixture
+def fake_tap(monkeypatch):
+    created = []
+
+    def fake_get_tap_service(name):
+        created.append(name)
+        return FakeService(name)
+
+    monkeypatch.setattr(services, "get_tap_service", fake_get_tap_service)
+    services.clear_services()
+    yield created
+    services.clear_services()
+
+
+class TestServiceRegistry:
+    def test_service_created_once(self, fake_tap):
+        first = services.get_service("dp1")
+        second = services.get_service("dp1")
+
+        assert first is second
+        assert fake_tap == ["tap"]
+
+    def test_service_per_catalog(self, fake_tap):
+        dp1 = services.get_service("dp1")
+        dp03 = services.get_service("dp03_catalogs_10yr")
+
+        assert dp1.name == "tap"
+        assert dp03.name == "ssotap"
+        assert sorted(fake_tap) == ["ssotap", "tap"]
+
+    def test_invalid_catalog(self, fake_tap):
+        with pytest.raises(ValueError):
+            services.get_service("dp02")
+
+    def test_threads_share_service(self, fake_tap):
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(services.get_service("dp1"))) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(results) == 8
+        assert all(result is results[0] for result in results)
+        assert fake_tap == ["tap"]
+
+    def test_clear_services(self, fake_tap):
+        first = services.get_service("dp1")
+        services.clear_services()
+        second = services.get_service("dp1")
+
+        assert first is not second
+        assert fake_tap == ["tap", "tap"]
@@ -0,0 +1,70 @@
+import matplotlib
+matplotlib.use("Agg")
+import numpy as np
+import pandas as pd
+from astropy.table import Table
+from astropy.time import Time
+from sso_query import plots
+from sso_query.query import calc_magnitude
+from sso_query.session import AnalysisSession
+
+
+def results(n = 2000):
+    rng = np.random.default_rng(0)
+    discovered = rng.uniform(60000.0, 61000.0, n)
+    discovered[::7] = np.nan
+    return pd.DataFrame({
+        "ssObjectID": rng.integers(0, n // 4, n),
+        "a": rng.lognormal(1.0, 0.5, n),
+        "e": rng.uniform(0.0, 0.9, n),
+        "incl": rng.uniform(0.0, 40.0, n),
+        "class_name": rng.choice(["MBA", "NEO", "TNO"], n),
+        "apFlux": rng.uniform(-10.0, 1e4, n),
+        "discoverySubmissionDate": discovered,
+        "numObs": rng.integers(1, 100, n)
+    })
+
+
+class TestAnalysisSession:
+    def test_trimmed_matches_percentile_filter(self):
+        df = results()
+        a_min, a_max = np.percentile(df['a'], [0.5, 99.5])
+        e_min, e_max = np.percentile(df['e'], [0.5, 99.5])
+        i_min, i_max = np.percentile(df['incl'], [0.5, 99.5])
+        expected = df[(df['a'] >= a_min) & (df['a'] <= a_max) & (df['e'] >= e_min) & (df['e'] <= e_max) & (df['incl'] >= i_min) & (df['incl'] <= i_max)]
+
+        session = AnalysisSession(Table.from_pandas(df))
+        pd.testing.assert_frame_equal(session.trimmed.df.reset_index(drop=True), expected.reset_index(drop=True))
+        pd.testing.assert_frame_equal(plots.setup(df), expected)
+
+    def test_derived_data_is_cached(self):
+        session = AnalysisSession(results())
+
+        assert session.trimmed is session.trimmed
+        assert session.trimmed.trimmed is session.trimmed
+        assert session.class_groups() is session.class_groups()
+        assert session.valid(["a", "e"]) is session.valid(["a", "e"])
+        assert session.magnitudes is session.magnitudes
+        assert plots.class_groups(session) is session.class_groups()
+
+    def test_magnitudes_from_flux(self):
+        df = results()
+        mags = AnalysisSession(df).magnitudes
+
+        positive = df["apFlux"] > 0
+        assert np.allclose(mags[positive], calc_magnitude(df.loc[positive, "apFlux"]))
+        assert mags[~positive].isna().all()
+
+    def test_discovery_dates(self):
+        df = results()
+        session = AnalysisSession(df)
+        dates = session.discovery_dates
+
+        mask = df["discoverySubmissionDate"].notna()
+        expected = pd.to_datetime(Time(df.loc[mask, "discoverySubmissionDate"], format="mjd").to_datetime())
+        assert (np.abs(dates[mask].to_numpy() - expected.to_numpy()) <= np.timedelta64(1, "us")).all()
+        assert dates[~mask].isna().all()
+
+        counts = plots.discovery_cutoff_counts(session, "2024-01-01")
+        recent = df[mask & (df["discoverySubmissionDate"] >= Time("2024-01-01").mjd)]
+        assert counts.set_index("class_name")["object_count"].to_dict() == recent.groupby("class_name")["ssObjectID"].nunique().to_dict()
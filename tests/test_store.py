@@ -0,0 +1,68 @@
+import numpy as np
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pytest
+from sso_query.adql import E, INCL, Q, TISSERAND, all_of, cutoff_conditions
+from sso_query.query import DEFAULT_CUTOFFS, ORBITAL_CLASS_CUTOFFS, calc_semimajor_axis
+from sso_query.store import LocalStore
+from sso_query.synthetic import make_orbits
+
+
+@pytest.fixture(scope="module")
+def orbits():
+    orbits = make_orbits(200000, seed=4).rename(columns={"ssObjectId": "ssObjectID"})
+    orbits["a"] = calc_semimajor_axis(orbits["q"], orbits["e"])
+    return orbits
+
+
+@pytest.fixture
+def store(tmp_path, orbits):
+    store = LocalStore(str(tmp_path))
+    store.write(orbits, "dp1")
+    return store
+
+
+class TestToArrow:
+    @pytest.mark.parametrize("class_name", list(ORBITAL_CLASS_CUTOFFS))
+    def test_matches_numpy(self, orbits, class_name):
+        expr = all_of(*cutoff_conditions({**DEFAULT_CUTOFFS, **ORBITAL_CLASS_CUTOFFS[class_name]}))
+        table = pa.Table.from_pandas(orbits[["q", "e", "incl"]])
+
+        with np.errstate(all="ignore"):
+            expected = expr.evaluate({Q: orbits["q"].to_numpy(), E: orbits["e"].to_numpy(), INCL: orbits["incl"].to_numpy()})
+        assert len(table.filter(expr.to_arrow())) == expected.sum()
+
+    def test_functions(self):
+        table = pa.table({"q": [1.0, 5.0], "e": [0.1, 0.5], "incl": [10.0, 60.0]})
+        result = ds.dataset(table).to_table(columns={"tj": TISSERAND.to_arrow()})["tj"].to_numpy()
+
+        expected = TISSERAND.evaluate({Q: table["q"].to_numpy(), E: table["e"].to_numpy(), INCL: table["incl"].to_numpy()})
+        assert np.allclose(result, expected)
+
+
+class TestLocalStore:
+    def test_round_trip(self, store, orbits):
+        table = store.read("dp1", "NEO", to_pandas=True)
+
+        expected = orbits[orbits["class_name"] == "NEO"]
+        assert sorted(table["ssObjectID"]) == sorted(expected["ssObjectID"])
+        assert set(store.classes()["class_name"]) == set(orbits["class_name"])
+
+    def test_cutoffs_pushdown(self, store, orbits):
+        cutoffs = {**ORBITAL_CLASS_CUTOFFS["MBA"], "q_max": 1.9}
+        table = store.read("dp1", "MBA", cutoffs, to_pandas=True)
+
+        mba = orbits[orbits["class_name"] == "MBA"]
+        expected = mba[(mba["q"] > 1.66) & (mba["q"] < 1.9) & (mba["a"] > 2.0) & (mba["a"] < 3.2)]
+        assert sorted(table["ssObjectID"]) == sorted(expected["ssObjectID"])
+
+        plan = store.scan_plan("dp1", "MBA", cutoffs)
+        assert plan["files_read"] == 1
+        assert plan["row_groups_read"] < store.scan_plan("dp1", "MBA")["row_groups_read"]
+
+    def test_write_replaces_partitions(self, store, orbits):
+        store.write(orbits[orbits["class_name"] == "NEO"].iloc[:10], "dp1")
+
+        assert len(store.read("dp1", "NEO", return_format="arrow")) == 10
+        assert len(store.read("dp1", "TNO", return_format="arrow")) == (orbits["class_name"] == "TNO").sum()
+        assert len(store.read("dp03_catalogs_10yr", return_format="arrow")) == 0
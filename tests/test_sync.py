@@ -0,0 +1,83 @@
+import pytest
+from sso_query.local_tap import LocalTAPResults
+from sso_query.query import _use_sync, make_query, run_queries, run_query
+
+
+@pytest.fixture(scope="module")
+def local_tap_options():
+    return dict(n_objects=500, obs_per_object=2.0, catalogs=["dp1"], seed=1)
+
+
+@pytest.fixture
+def submitted(local_tap, monkeypatch):
+    queries = []
+    submit_job = local_tap.submit_job
+    def recording_submit(query_string, **kwargs):
+        queries.append(query_string)
+        return submit_job(query_string, **kwargs)
+    monkeypatch.setattr(local_tap, "submit_job", recording_submit)
+    return queries
+
+
+class OverflowResults(LocalTAPResults):
+    status = ("OVERFLOW", "row limit reached")
+
+
+class TestSyncSelection:
+    def test_small_limit_skips_job(self, local_tap, submitted):
+        query_string, class_name = make_query("dp1", class_name="MBA", limit=20)
+        table = run_query(query_string, class_name, "dp1", to_pandas=True)
+        assert len(table) == 20
+        assert submitted == []
+        assert table.attrs["metrics"]["jobs"][0]["sync"]
+
+    def test_count_preflight(self, local_tap, submitted):
+        query_string, class_name = make_query("dp1", class_name="MBA")
+        rows = len(run_query(query_string, class_name, "dp1", to_pandas=True))
+        assert submitted == []
+
+        table = run_query(query_string, class_name, "dp1", to_pandas=True, sync_threshold=rows - 1)
+        assert len(table) == rows
+        assert len(submitted) == 1
+        assert not table.attrs["metrics"]["jobs"][0]["sync"]
+
+    def test_threshold_zero_and_group_by_go_async(self, local_tap, submitted):
+        assert not _use_sync(local_tap, "SELECT mpc.q FROM dp1.MPCORB AS mpc LIMIT 5;", 0)
+        assert _use_sync(local_tap, "SELECT TOP 5 mpc.q FROM dp1.MPCORB AS mpc;", 10)
+        assert not _use_sync(local_tap, "SELECT mpc.q, COUNT(*) FROM dp1.MPCORB AS mpc GROUP BY mpc.q;", 10 ** 6)
+        assert not _use_sync(object(), "SELECT mpc.q FROM dp1.MPCORB AS mpc;", 10 ** 6) # failed preflight
+
+    def test_join_skips_preflight(self, local_tap, submitted, monkeypatch):
+        query_string, class_name = make_query("dp1", class_name="MBA", join="DiaSource")
+        limited, _ = make_query("dp1", class_name="MBA", join="DiaSource", limit=20)
+        searched = []
+        search = local_tap.search
+        def recording_search(query_string, **kwargs):
+            searched.append(query_string)
+            return search(query_string, **kwargs)
+        monkeypatch.setattr(local_tap, "search", recording_search)
+
+        run_query(query_string, class_name, "dp1", to_pandas=True)
+        assert searched == []
+        assert len(submitted) == 1
+
+        assert len(run_query(limited, class_name, "dp1", to_pandas=True)) == 20
+        assert searched == [limited]
+
+    def test_run_queries_threshold(self, local_tap, submitted):
+        queries = [make_query("dp1", class_name=class_name) for class_name in ["MBA", "NEO"]]
+        run_queries(queries, "dp1", to_pandas=True)
+        assert submitted == []
+
+        results = run_queries(queries, "dp1", to_pandas=True, sync_threshold=0)
+        assert len(submitted) == 2
+        assert not any(table.attrs["metrics"]["jobs"][0]["sync"] for table in results.values())
+
+    def test_overflow_falls_back_to_job(self, local_tap, submitted, monkeypatch):
+        overflow = lambda query_string, **kwargs: OverflowResults(local_tap.execute(query_string).to_table())
+        monkeypatch.setattr(local_tap, "search", overflow)
+        query_string, class_name = make_query("dp1", class_name="MBA", limit=20)
+        table = run_query(query_string, class_name, "dp1", to_pandas=True)
+        assert len(table) == 20
+        assert len(submitted) == 1
+        assert [job["phase"] for job in table.attrs["metrics"]["jobs"]] == ["OVERFLOW", "COMPLETED"]